@@ -0,0 +1,413 @@
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from bitcoinstrat import LadderQuoter
+from marketdata import CatalogView
+from orderbook import NUM_LEVELS, OrderBook, OrderBookEngine
+from pricing import binary_option_prices
+from recorder import BOOK_DTYPE, BTC_DTYPE, SIDE_CODES, MarketDataReader
+from trade import Quote, QuoteManager, RestingOrder
+
+SIDE_NAMES = {code: side for side, code in SIDE_CODES.items()}
+NS_PER_SECOND = 1_000_000_000
+
+
+class BacktestMarket(NamedTuple):
+    """Static description of one KXBTCD contract."""
+    ticker: str
+    strike: float
+    expiry_ts: float  # UNIX seconds
+    volume_24h: int = 0  # for LadderQuoter's max_volume_24h filter
+
+
+class ReplayData(NamedTuple):
+    """Everything a replay needs, as plain arrays so it pickles cheaply to workers."""
+    markets: List[BacktestMarket]
+    tickers: List[str]   # ticker_id -> ticker for the book records
+    btc: np.ndarray      # BTC_DTYPE records sorted by ts_ns
+    book: np.ndarray     # BOOK_DTYPE records sorted by ts_ns
+
+
+class BacktestResult(NamedTuple):
+    IV_percent: float
+    spread: float
+    pnl: float                    # dollars, settled contracts plus open ones marked at fair value
+    fills: int                    # contracts bought
+    quotes_placed: int
+    max_abs_inventory: int        # largest |YES - NO| held in any market
+    inventory: Dict[str, int]     # final YES - NO per market still open
+
+
+def load_recording(root: str, markets: List[BacktestMarket],
+                   start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> ReplayData:
+    """Loads BTC prices and book events written by recorder.MarketDataRecorder."""
+    reader = MarketDataReader(root)
+    return ReplayData(
+        markets=markets,
+        tickers=reader.tickers,
+        btc=reader.load("btc", start_ns, end_ns),
+        book=reader.load("book", start_ns, end_ns),
+    )
+
+
+def synthetic_data(
+    S0: float = 100000.0,
+    hours: float = 6.0,
+    true_IV_percent: float = 50.0,
+    strike_step: float = 250.0,
+    num_strikes: int = 20,
+    tick_seconds: float = 1.0,
+    book_seconds: float = 5.0,
+    book_spread: int = 4,
+    seed: Optional[int] = 0,
+) -> ReplayData:
+    """
+    Generates a GBM BTC path and a KXBTCD-style strike ladder with books quoted by
+    a market maker who prices at the true volatility.
+
+    Parameters:
+    S0 (float): Starting BTC price.
+    hours (float): Length of the session; every market expires at its end.
+    true_IV_percent (float): Volatility of the simulated path and of the book maker's pricing.
+    strike_step (float): Distance between strikes.
+    num_strikes (int): Number of strikes, centred on S0.
+    tick_seconds (float): Seconds between BTC price updates.
+    book_seconds (float): Seconds between book snapshots.
+    book_spread (int): Width in cents of the book maker's market.
+    seed (int): RNG seed.
+    """
+    rng = np.random.default_rng(seed)
+    start_ns = 1_700_000_000 * NS_PER_SECOND
+    steps = int(hours * 3600 / tick_seconds)
+    sigma = true_IV_percent / 100
+    dt = tick_seconds / (365 * 24 * 3600)
+    log_returns = rng.normal(-0.5 * sigma**2 * dt, sigma * math.sqrt(dt), steps)
+    prices = S0 * np.exp(np.concatenate(([0.0], np.cumsum(log_returns))))
+    btc = np.zeros(steps + 1, dtype=BTC_DTYPE)
+    btc["ts_ns"] = start_ns + (np.arange(steps + 1) * tick_seconds * NS_PER_SECOND).astype(np.int64)
+    btc["price"] = prices
+
+    expiry_ts = start_ns / NS_PER_SECOND + hours * 3600
+    strikes = S0 + strike_step * (np.arange(num_strikes) - num_strikes // 2)
+    markets = [BacktestMarket(f"KXBTCD-SIM-T{strike:.2f}", float(strike), expiry_ts) for strike in strikes]
+
+    rows = []
+    every = max(int(book_seconds / tick_seconds), 1)
+    seq = 0
+    for i in range(0, steps, every):
+        ts_ns = int(btc["ts_ns"][i])
+        hours_left = (expiry_ts - ts_ns / NS_PER_SECOND) / 3600
+        fair = binary_option_prices(prices[i], strikes, hours_left, true_IV_percent).price
+        for ticker_id, value in enumerate(fair):
+            seq += 1
+            mid = int(round(value * 100))
+            bid = min(max(mid - book_spread // 2, 1), 98)
+            ask = min(max(mid + book_spread // 2, bid + 1), 99)
+            size = int(rng.integers(1, 50))
+            rows.append((ts_ns, seq, ticker_id, bid, SIDE_CODES["yes"], 1, size))
+            rows.append((ts_ns, seq, ticker_id, 100 - ask, SIDE_CODES["no"], 1, size))
+    book = np.array(rows, dtype=BOOK_DTYPE)
+    return ReplayData(markets, [market.ticker for market in markets], btc, book)
+
+
+class SimulatedQuoteManager(QuoteManager):
+    """QuoteManager whose orders rest in a backtest instead of on the exchange.
+
+    update() diffs target quotes exactly as it does live; creates, amends,
+    decreases and cancels then take effect at once and never fail. Orders
+    placed or amended are collected in `placed` so the backtest can match
+    them against the book as they arrive.
+    """
+    def __init__(self):
+        super().__init__(client=None, ttl=None)
+        self.placed = set()
+        self._order_ids = itertools.count(1)
+
+    def _create(self, quotes: List[Quote]) -> int:
+        for quote in quotes:
+            order_id = str(next(self._order_ids))
+            self.orders[(quote.ticker, quote.side)] = RestingOrder(
+                order_id, order_id, quote.ticker, quote.side, quote.price, quote.count,
+            )
+            self.placed.add((quote.ticker, quote.side))
+        return len(quotes)
+
+    def _amend(self, order: RestingOrder, quote: Quote) -> bool:
+        order.price = quote.price
+        order.count = quote.count
+        self.placed.add((order.ticker, order.side))
+        return True
+
+    def _decrease(self, order: RestingOrder, count: int) -> bool:
+        order.count = count
+        return True
+
+    def _cancel(self, orders: List[RestingOrder]) -> int:
+        for order in orders:
+            self.orders.pop((order.ticker, order.side), None)
+        return len(orders)
+
+
+class Backtest:
+    """Replays BTC prices and book events through bitcoinstrat's LadderQuoter.
+
+    Each event is handled the way one wake-up of the live loop handles it:
+    every `refresh_seconds` of simulated time the live markets are reset and
+    fully repriced (set_markets); otherwise the quoter sees the BTC price
+    (on_btc) and the markets whose book changed or that we traded in
+    (on_book). The reprice thresholds, best_excluding_own and the
+    max_volume_24h filter therefore behave as they do live. Orders go
+    through a SimulatedQuoteManager.
+
+    A resting YES bid fills at its own price when YES asks trade down to
+    it (a NO bid mirrors this), and a quote that is marketable when placed
+    fills at the ask levels it crosses. Markets settle on the last BTC price
+    at their expiry.
+
+    The recorded book does not know about our orders, so the contracts we
+    take are remembered per price level and are not filled again. A level
+    only gives them back when the recording removes that much from it (taken
+    to be the same contracts trading) or when a new snapshot replaces the
+    book. Queue position is not modelled: a resting quote fills as soon as
+    the book crosses it, which is optimistic for quotes that join a level.
+    """
+    def __init__(self, data: ReplayData, IV_percent: float, spread: float,
+                 refresh_seconds: float = 10.0, order_size: int = 1, **quoter_options):
+        """
+        quoter_options are passed to LadderQuoter (max_volume_24h, reprice_threshold, ...).
+        """
+        self.data = data
+        self.IV_percent = IV_percent
+        self.spread = spread
+        self.refresh_ns = int(refresh_seconds * NS_PER_SECOND)
+        self.order_size = order_size
+
+        self.markets = {market.ticker: market for market in data.markets}
+        ordered = sorted(data.markets, key=lambda market: market.expiry_ts)
+        expiry_ts = np.array([market.expiry_ts for market in ordered], dtype=np.float64)
+        self.view = CatalogView(
+            tickers=[market.ticker for market in ordered],
+            markets=[{"ticker": market.ticker, "volume_24h": market.volume_24h} for market in ordered],
+            strikes=np.array([market.strike for market in ordered], dtype=np.float64),
+            expiry_ts=expiry_ts,
+            close_ts=expiry_ts,
+        )
+        self.engine = OrderBookEngine()
+        self.books: Dict[str, OrderBook] = self.engine.books
+        self.quotes = SimulatedQuoteManager()
+        self.quoter = LadderQuoter(self.quotes, IV_percent, spread, books=self.engine, order_size=order_size,
+                                   clock=lambda: self.now, **quoter_options)
+        self.consumed: Dict[str, Dict[Tuple[str, int], int]] = {}  # ticker -> {(book side, price): contracts we took}
+        self.pending = set()  # markets to requote on the next event, like the live loop's dirty_books
+        self.position = {market.ticker: [0, 0] for market in data.markets}  # [yes, no] contracts
+        self.settled = set()
+        self.cash = 0  # cents
+        self.fills = 0
+        self.max_abs_inventory = 0
+        self.btc_price = None
+        self.now = 0.0
+
+    @property
+    def quotes_placed(self) -> int:
+        return self.quotes.counts["created"] + self.quotes.counts["amended"]
+
+    def _fill(self, ticker: str, side: str, price: int, count: int) -> None:
+        position = self.position[ticker]
+        position[SIDE_CODES[side]] += count
+        self.cash -= price * count
+        self.fills += count
+        self.max_abs_inventory = max(self.max_abs_inventory, abs(position[0] - position[1]))
+        self.quotes.on_fill(ticker, side, count)
+        self.pending.add(ticker)
+
+    def _check_fills(self, ticker: str, sides=("yes", "no"), at_touch: bool = False) -> None:
+        """Fills our bids in a market against asks at or through them.
+
+        at_touch: the orders were just placed, so they take the asks at the
+        asks' prices; otherwise they were resting and fill at their own price.
+        """
+        book = self.books.get(ticker)
+        if book is None:
+            return
+        consumed = self.consumed.setdefault(ticker, {})
+        for side in sides:
+            order = self.quotes.resting(ticker, side)
+            if order is None:
+                continue
+            price = order.price
+            other = "no" if side == "yes" else "yes"
+            # An ask at p for our side is a bid at 100 - p on the other side, best first
+            for level, quantity in book.depth(other, NUM_LEVELS):
+                if 100 - level > price or order.count <= 0:
+                    break
+                available = quantity - consumed.get((other, level), 0)
+                if available <= 0:
+                    continue
+                filled = min(order.count, available)
+                consumed[(other, level)] = consumed.get((other, level), 0) + filled
+                self._fill(ticker, side, 100 - level if at_touch else price, filled)
+
+    def _live_view(self, now: float) -> CatalogView:
+        """Markets that have not expired, as MarketCatalog.expiring_within returns them."""
+        lo = int(np.searchsorted(self.view.expiry_ts, now, side="right"))
+        return CatalogView(
+            tickers=self.view.tickers[lo:],
+            markets=self.view.markets[lo:],
+            strikes=self.view.strikes[lo:],
+            expiry_ts=self.view.expiry_ts[lo:],
+            close_ts=self.view.close_ts[lo:],
+        )
+
+    def _wake(self, refresh: bool) -> None:
+        """One pass of the live strategy loop at the current simulated time."""
+        if self.btc_price is None:
+            return
+        tickers = list(self.pending)
+        self.pending.clear()
+        if refresh:
+            self._settle(self.now)
+            self.quoter.set_markets(self._live_view(self.now), self.btc_price)
+        else:
+            self.quoter.on_btc(self.btc_price)
+            if tickers:
+                self.quoter.on_book(tickers)
+        # Orders that are marketable on arrival take liquidity straight away
+        placed = sorted(self.quotes.placed)
+        self.quotes.placed.clear()
+        for ticker, side in placed:
+            self._check_fills(ticker, (side,), at_touch=True)
+
+    def _settle(self, now: float) -> None:
+        for market in self.data.markets:
+            if market.ticker in self.settled or market.expiry_ts > now or self.btc_price is None:
+                continue
+            yes, no = self.position[market.ticker]
+            self.cash += 100 * (yes if self.btc_price >= market.strike else no)
+            self.position[market.ticker] = [0, 0]
+            self.settled.add(market.ticker)
+            self.quotes.forget(market.ticker, "yes")
+            self.quotes.forget(market.ticker, "no")
+
+    def _apply_book(self, book_rows: np.ndarray, start: int) -> int:
+        """Applies one book event (a delta, or every level of a snapshot). Returns the next row."""
+        row = book_rows[start]
+        ticker = self.data.tickers[row["ticker_id"]]
+        book = self.books.get(ticker)
+        if book is None:
+            book = self.books[ticker] = OrderBook(ticker)
+        if not row["snapshot"]:
+            side, price = SIDE_NAMES[int(row["side"])], int(row["price"])
+            book.apply_delta(side, price, int(row["delta"]))
+            consumed = self.consumed.get(ticker)
+            if consumed and consumed.get((side, price), 0) > book.quantity(side, price):
+                # The recording removed contracts we had already taken; they are the same ones
+                consumed[(side, price)] = book.quantity(side, price)
+            end = start + 1
+        else:
+            end = start
+            levels = {"yes": [], "no": []}
+            while (end < len(book_rows) and book_rows[end]["snapshot"]
+                   and book_rows[end]["ts_ns"] == row["ts_ns"] and book_rows[end]["ticker_id"] == row["ticker_id"]):
+                levels[SIDE_NAMES[int(book_rows[end]["side"])]].append((int(book_rows[end]["price"]), int(book_rows[end]["delta"])))
+                end += 1
+            book.apply_snapshot(levels["yes"], levels["no"])
+            self.consumed.pop(ticker, None)
+        if ticker in self.markets:
+            self._check_fills(ticker)
+            self.pending.add(ticker)
+        return end
+
+    def run(self) -> BacktestResult:
+        btc_ts = self.data.btc["ts_ns"]
+        btc_price = self.data.btc["price"]
+        book = self.data.book
+        book_ts = book["ts_ns"]
+        i = j = 0
+        next_refresh = None
+        while i < len(btc_ts) or j < len(book_ts):
+            if j >= len(book_ts) or (i < len(btc_ts) and btc_ts[i] <= book_ts[j]):
+                ts_ns = int(btc_ts[i])
+                self.btc_price = float(btc_price[i])
+                i += 1
+            else:
+                ts_ns = int(book_ts[j])
+                j = self._apply_book(book, j)
+            self.now = ts_ns / NS_PER_SECOND
+            refresh = self.btc_price is not None and (next_refresh is None or ts_ns >= next_refresh)
+            self._wake(refresh)
+            if refresh:
+                next_refresh = ts_ns + self.refresh_ns
+
+        last_ts = max(int(btc_ts[-1]) if len(btc_ts) else 0, int(book_ts[-1]) if len(book_ts) else 0)
+        now = last_ts / NS_PER_SECOND
+        self._settle(now)
+        return self._result(now)
+
+    def _result(self, now: float) -> BacktestResult:
+        value = self.cash
+        inventory = {}
+        open_markets = [market for market in self.data.markets if market.ticker not in self.settled]
+        if open_markets and self.btc_price is not None:
+            hours = np.array([(market.expiry_ts - now) / 3600 for market in open_markets])
+            fair = binary_option_prices(self.btc_price, [market.strike for market in open_markets], hours, self.IV_percent).price
+            for market, fair_price in zip(open_markets, fair):
+                yes, no = self.position[market.ticker]
+                value += 100 * (yes * fair_price + no * (1 - fair_price))
+                if yes or no:
+                    inventory[market.ticker] = yes - no
+        return BacktestResult(
+            IV_percent=self.IV_percent,
+            spread=self.spread,
+            pnl=value / 100,
+            fills=self.fills,
+            quotes_placed=self.quotes_placed,
+            max_abs_inventory=self.max_abs_inventory,
+            inventory=inventory,
+        )
+
+
+_worker_data: Optional[ReplayData] = None
+
+
+def _init_worker(data: ReplayData) -> None:
+    global _worker_data
+    _worker_data = data
+
+
+def _run_one(args) -> BacktestResult:
+    IV_percent, spread, refresh_seconds = args
+    return Backtest(_worker_data, IV_percent, spread, refresh_seconds).run()
+
+
+def sweep(
+    data: ReplayData,
+    IV_percents: Iterable[float],
+    spreads: Iterable[float],
+    refresh_seconds: float = 10.0,
+    max_workers: Optional[int] = None,
+) -> List[BacktestResult]:
+    """
+    Runs a backtest for every (IV_percent, spread) combination across CPU cores.
+
+    The replay data is sent to each worker process once, not once per combination.
+
+    Returns:
+    list: BacktestResult per combination, best PnL first.
+    """
+    grid = [(iv, spread, refresh_seconds) for iv, spread in itertools.product(IV_percents, spreads)]
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             initializer=_init_worker, initargs=(data,)) as pool:
+        results = list(pool.map(_run_one, grid))
+    return sorted(results, key=lambda result: result.pnl, reverse=True)
+
+
+if __name__ == "__main__":
+    data = synthetic_data()
+    for result in sweep(data, IV_percents=[40, 50, 60], spreads=[0.02, 0.03, 0.05]):
+        print(f"IV {result.IV_percent:>4}%  spread {result.spread:.2f}  PnL ${result.pnl:8.2f}  "
+              f"fills {result.fills:5d}  max inventory {result.max_abs_inventory}")
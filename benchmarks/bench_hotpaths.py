@@ -0,0 +1,196 @@
+"""Hot-path microbenchmarks.
+
+Times the signing, pricing, decoding and orderbook code on the quote path
+against offline fixtures, reports ops/sec with p50/p90/p99 latency, and
+optionally saves the results and compares them with a stored baseline.
+
+    python benchmarks/bench_hotpaths.py --save benchmarks/baseline.json
+    python benchmarks/bench_hotpaths.py --baseline benchmarks/baseline.json --tolerance 0.15
+
+Exits with status 1 when any benchmark is slower than the baseline by more
+than the tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import fixtures
+from bitcoinstrat import binary_option_price, build_quotes, get_time_to_expiry
+from clients import KalshiBaseClient
+from dispatch import loads
+from dynamic_liquidity import get_best_prices
+from orderbook import OrderBook
+from pricing import binary_option_prices
+
+# Each timed sample runs the operation enough times to last at least this long,
+# so timer resolution does not dominate nanosecond-scale operations
+MIN_SAMPLE_SECONDS = 20e-6
+
+
+def build_benchmarks():
+    """Returns {name: zero-argument callable}. Setup happens here, outside the timed region."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    client = KalshiBaseClient("bench-key-id", private_key)
+
+    markets_raw = fixtures.markets_json()
+    book_payload = fixtures.orderbook()
+    strikes, hours = fixtures.ladder()
+    strikes, hours = np.array(strikes), np.array(hours)
+    expiration_time = fixtures.markets_page(1)["markets"][0]["expiration_time"]
+
+    snapshot = OrderBook("KXBTCD-BENCH")
+    snapshot_yes = book_payload["orderbook"]["yes"]
+    snapshot_no = book_payload["orderbook"]["no"]
+    delta_book = OrderBook("KXBTCD-BENCH")
+    delta_book.apply_snapshot(snapshot_yes, snapshot_no)
+    deltas = fixtures.orderbook_deltas()
+    delta_index = [0]
+
+    def apply_delta():
+        side, price, delta = deltas[delta_index[0] % len(deltas)]
+        delta_index[0] += 1
+        if delta < 0 and delta_book.quantity(side, price) < -delta:
+            delta = -delta
+        delta_book.apply_delta(side, price, delta)
+        return delta_book.best_bid_ask()
+
+    def apply_snapshot():
+        snapshot.apply_snapshot(snapshot_yes, snapshot_no)
+        return snapshot.best_bid_ask()
+
+    return {
+        "sign_pss_text": lambda: client.sign_pss_text("1700000000000GET/trade-api/v2/portfolio/balance"),
+        "request_headers": lambda: client.request_headers("POST", "/trade-api/v2/portfolio/orders"),
+        "binary_option_price": lambda: binary_option_price(fixtures.BTC_PRICE, 97500.0, 6.0, 52),
+        "binary_option_prices[160]": lambda: binary_option_prices(fixtures.BTC_PRICE, strikes, hours, 52),
+        "get_time_to_expiry": lambda: get_time_to_expiry(expiration_time),
+        "json.loads markets[1000]": lambda: json.loads(markets_raw),
+        "dispatch.loads markets[1000]": lambda: loads(markets_raw),
+        "get_best_prices": lambda: get_best_prices(book_payload),
+        "OrderBook.apply_snapshot": apply_snapshot,
+        "OrderBook.apply_delta": apply_delta,
+        "build_quotes": lambda: build_quotes("KXBTCD-BENCH", 0.55, 0.03, 50, 58),
+    }
+
+
+def calibrate(fn):
+    """Number of calls per sample so that one sample takes at least MIN_SAMPLE_SECONDS."""
+    inner = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        if time.perf_counter() - start >= MIN_SAMPLE_SECONDS:
+            return inner
+        inner *= 2
+
+
+def run_benchmark(fn, seconds, warmup):
+    """Times fn for roughly `seconds` and returns ops/sec and per-call latency percentiles in ns."""
+    end = time.perf_counter() + warmup
+    while time.perf_counter() < end:
+        fn()
+    inner = calibrate(fn)
+    samples = []
+    total_calls = 0
+    perf_counter_ns = time.perf_counter_ns
+    start = time.perf_counter()
+    end = start + seconds
+    while True:
+        t0 = perf_counter_ns()
+        for _ in range(inner):
+            fn()
+        samples.append((perf_counter_ns() - t0) / inner)
+        total_calls += inner
+        if time.perf_counter() >= end and len(samples) >= 5:
+            break
+    elapsed = time.perf_counter() - start
+    p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+    return {
+        "ops_per_sec": total_calls / elapsed,
+        "p50_ns": float(p50),
+        "p90_ns": float(p90),
+        "p99_ns": float(p99),
+        "calls": total_calls,
+        "calls_per_sample": inner,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Prints the change against the baseline and returns the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<30} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<30} {'-':>14} {result['ops_per_sec']:14,.0f} {'new':>8}")
+            continue
+        change = result["ops_per_sec"] / before["ops_per_sec"] - 1
+        flag = ""
+        if change < -tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30} {before['ops_per_sec']:14,.0f} {result['ops_per_sec']:14,.0f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def format_ns(ns):
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f}ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f}us"
+    return f"{ns:.0f}ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=1.0, help="timed duration per benchmark")
+    parser.add_argument("--warmup", type=float, default=0.2, help="untimed warm-up per benchmark")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", default=None, help="write results as JSON to this path")
+    parser.add_argument("--baseline", default=None, help="compare against results saved earlier with --save")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed ops/sec drop before flagging")
+    args = parser.parse_args()
+
+    benchmarks = build_benchmarks()
+    results = {}
+    print(f"{'benchmark':<30} {'ops/sec':>14} {'p50':>10} {'p90':>10} {'p99':>10}")
+    for name, fn in benchmarks.items():
+        if args.filter and args.filter not in name:
+            continue
+        result = results[name] = run_benchmark(fn, args.seconds, args.warmup)
+        print(f"{name:<30} {result['ops_per_sec']:14,.0f} {format_ns(result['p50_ns']):>10} "
+              f"{format_ns(result['p90_ns']):>10} {format_ns(result['p99_ns']):>10}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "numpy": np.__version__,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.tolerance:.0%}: "
+                  f"{', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
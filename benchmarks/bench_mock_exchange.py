@@ -0,0 +1,94 @@
+"""End-to-end order throughput against the local mock exchange.
+
+Starts mockexchange.MockKalshiServer in-process on a free port, then pushes
+signed orders through the real clients and reports orders per second for
+single posts, batched creates and concurrent async posts.
+
+    python benchmarks/bench_mock_exchange.py --orders 5000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from clients import AsyncKalshiHttpClient, KalshiHttpClient
+from mockexchange import MockExchange, MockKalshiServer, btc_ladder, seed_ladder
+from ratelimit import RateLimiter
+from signing import ThreadPoolSigner
+
+
+def random_orders(tickers, n, seed=0):
+    rng = random.Random(seed)
+    orders = []
+    for _ in range(n):
+        side = rng.choice(("yes", "no"))
+        orders.append(dict(
+            ticker=rng.choice(tickers),
+            client_order_id=str(uuid.uuid4()),
+            action="buy",
+            type="limit",
+            side=side,
+            count=rng.randint(1, 5),
+            **{f"{side}_price": rng.randint(1, 99)},
+        ))
+    return orders
+
+
+def report(label, n, elapsed):
+    print(f"{label:>22}: {n / elapsed:10,.0f} orders/s  ({n} orders in {elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000, help="orders per scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="in-flight requests for the async client")
+    parser.add_argument("--no-verify", action="store_true", help="skip signature verification on the server")
+    args = parser.parse_args()
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    exchange = MockExchange(btc_ladder(100000.0, 20), starting_balance=10**12)
+    seed_ladder(exchange, 100000.0)
+    server = MockKalshiServer(exchange, {"bench": private_key.public_key()}, verify_signatures=not args.no_verify)
+    base_url = server.start_background()
+    tickers = list(exchange.markets)
+    unlimited = RateLimiter(read_rate=1e9, write_rate=1e9)
+    print(f"Mock exchange on {base_url}: {len(tickers)} markets, signature checks {'off' if args.no_verify else 'on'}")
+
+    with KalshiHttpClient("bench", private_key, base_url=base_url, rate_limiter=unlimited) as client:
+        orders = random_orders(tickers, min(args.orders, 500), seed=1)
+        start = time.perf_counter()
+        for order in orders:
+            client.post(client.portfolio_url + '/orders', client.order_payload(**order))
+        report("PostOrder", len(orders), time.perf_counter() - start)
+
+        orders = random_orders(tickers, args.orders, seed=2)
+        start = time.perf_counter()
+        results = client.batch_create_orders(orders)
+        report("batch_create_orders", len(orders), time.perf_counter() - start)
+        rejected = sum(1 for result in results if result.get("error"))
+        if rejected:
+            print(f"{rejected} orders rejected")
+
+    async def concurrent():
+        signer = ThreadPoolSigner(private_key)
+        async with AsyncKalshiHttpClient("bench", private_key, base_url=base_url, max_concurrency=args.concurrency,
+                                         rate_limiter=unlimited, signer=signer) as client:
+            orders = random_orders(tickers, args.orders, seed=3)
+            start = time.perf_counter()
+            await client.post_orders(orders)
+            report("async post_orders", len(orders), time.perf_counter() - start)
+        signer.close()
+
+    asyncio.run(concurrent())
+    print(f"{len(exchange.trades)} trades, {server.requests} requests served")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Memory and access-speed benchmark for the market record forms.
+
+Compares the raw market dicts get_markets returns by default with the
+slotted MarketRecord list and the NumPy structured array in records.py:
+memory retained per form, the one-off conversion cost, and the time to
+scan and filter the whole set.
+
+    python benchmarks/bench_records.py --markets 20000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures
+from records import COLUMNS, DICT, RECORDS, convert_markets
+
+
+def retained_bytes(build):
+    """Bytes still allocated once build() returns, counting only what its result keeps alive."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def workloads(form, markets, strike):
+    """{name: callable} computing the same answers over one form."""
+    if form == DICT:
+        return {
+            "sum yes_ask": lambda: sum(m["yes_ask"] for m in markets),
+            "filter": lambda: [m["ticker"] for m in markets if m["yes_ask"] >= 90 and m["floor_strike"] > strike],
+            "max volume": lambda: max(markets, key=lambda m: m["volume"])["ticker"],
+        }
+    if form == RECORDS:
+        return {
+            "sum yes_ask": lambda: sum(m.yes_ask for m in markets),
+            "filter": lambda: [m.ticker for m in markets if m.yes_ask >= 90 and m.floor_strike > strike],
+            "max volume": lambda: max(markets, key=lambda m: m.volume).ticker,
+        }
+    return {
+        "sum yes_ask": lambda: int(markets["yes_ask"].sum()),
+        "filter": lambda: markets["ticker"][(markets["yes_ask"] >= 90) & (markets["floor_strike"] > strike)],
+        "max volume": lambda: markets["ticker"][markets["volume"].argmax()],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--markets", type=int, default=20000, help="markets in the set")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per workload (best is reported)")
+    args = parser.parse_args()
+
+    body = fixtures.markets_json(args.markets)
+    strike = fixtures.BTC_PRICE
+
+    forms = {}
+    print(f"{args.markets} markets")
+    print(f"{'form':>8} {'retained':>12} {'bytes/market':>13} {'decode+convert':>15}")
+    for form in (DICT, RECORDS, COLUMNS):
+        decode = lambda: convert_markets(json.loads(body)["markets"], form)
+        # The dict form is what json decoding leaves behind; the others keep only their own result
+        forms[form], size = retained_bytes(decode)
+        convert = best_of(decode, max(1, args.repeat // 4))
+        ratio = f"  ({base_size / size:.1f}x smaller)" if form != DICT else ""
+        base_size = size if form == DICT else base_size
+        print(f"{form:>8} {size / 2**20:10.2f}MB {size / args.markets:13.0f} {convert * 1e3:13.1f}ms{ratio}")
+
+    print(f"\n{'workload':>12} " + " ".join(f"{form:>14}" for form in forms))
+    timings = {form: {name: best_of(fn, args.repeat) for name, fn in workloads(form, data, strike).items()}
+               for form, data in forms.items()}
+    for name in timings[DICT]:
+        base = timings[DICT][name]
+        cells = [f"{timings[form][name] * 1e6:9.0f}us" + (f" {base / timings[form][name]:4.0f}x" if form != DICT else "     ")
+                 for form in forms]
+        print(f"{name:>12} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
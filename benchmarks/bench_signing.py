@@ -0,0 +1,60 @@
+"""Signing throughput benchmark.
+
+Reports RSA-PSS signatures per second for each signer backend in signing.py.
+
+    python benchmarks/bench_signing.py --messages 2000 --batch 50 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from signing import Signer, ThreadPoolSigner, ProcessPoolSigner
+
+
+def make_messages(n):
+    timestamp = str(int(time.time() * 1000))
+    return [(timestamp, "POST", f"/trade-api/v2/portfolio/orders?i={i}") for i in range(n)]
+
+
+def bench_backend(signer, messages, batch):
+    # Warm the pool (worker start-up, key loading) before timing
+    signer.sign_requests(messages[:batch])
+    start = time.perf_counter()
+    for i in range(0, len(messages), batch):
+        signer.sign_requests(messages[i:i + batch])
+    elapsed = time.perf_counter() - start
+    return len(messages) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000, help="messages signed per backend")
+    parser.add_argument("--batch", type=int, default=50, help="messages per sign_requests call")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="pool size for pooled backends")
+    parser.add_argument("--key-size", type=int, default=2048)
+    args = parser.parse_args()
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=args.key_size)
+    messages = make_messages(args.messages)
+
+    backends = [
+        lambda: Signer(private_key),
+        lambda: ThreadPoolSigner(private_key, max_workers=args.workers),
+        lambda: ProcessPoolSigner(private_key, max_workers=args.workers),
+    ]
+    print(f"{args.messages} messages, batch {args.batch}, {args.workers} workers, RSA-{args.key_size}")
+    baseline = None
+    for make_signer in backends:
+        with make_signer() as signer:
+            rate = bench_backend(signer, messages, args.batch)
+        baseline = baseline or rate
+        print(f"{signer.name:>10}: {rate:10.0f} sig/s  ({rate / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
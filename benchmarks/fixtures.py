@@ -0,0 +1,82 @@
+"""Deterministic offline payloads for the benchmarks.
+
+Shapes follow the Kalshi REST responses the clients consume, so decoding
+and parsing costs match production without touching the network.
+"""
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+SEED = 1234
+BTC_PRICE = 97250.0
+
+
+def markets_page(n=1000, seed=SEED):
+    """A GET /markets response body with n KXBTCD-style markets."""
+    rng = random.Random(seed)
+    close = datetime(2030, 1, 1, 17, tzinfo=timezone.utc)
+    markets = []
+    for i in range(n):
+        strike = 80000 + 250 * (i % 160)
+        expiry = close + timedelta(hours=i // 160)
+        yes_bid = rng.randint(1, 97)
+        markets.append({
+            "ticker": f"KXBTCD-30JAN{expiry:%d%H}-T{strike - 0.01:.2f}",
+            "event_ticker": f"KXBTCD-30JAN{expiry:%d%H}",
+            "market_type": "binary",
+            "title": f"Bitcoin price on Jan {expiry:%d, %Y} at {expiry:%H}:00 UTC?",
+            "subtitle": f"${strike:,} or above",
+            "yes_sub_title": f"${strike:,} or above",
+            "no_sub_title": f"${strike:,} or above",
+            "open_time": (expiry - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "close_time": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "expiration_time": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "latest_expiration_time": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "status": "active",
+            "yes_bid": yes_bid,
+            "yes_ask": yes_bid + rng.randint(1, 3),
+            "no_bid": 100 - yes_bid - rng.randint(1, 3),
+            "no_ask": 100 - yes_bid,
+            "last_price": yes_bid,
+            "previous_yes_bid": yes_bid,
+            "previous_yes_ask": yes_bid + 2,
+            "previous_price": yes_bid,
+            "volume": rng.randint(0, 50000),
+            "volume_24h": rng.randint(0, 5000),
+            "liquidity": rng.randint(0, 10**7),
+            "open_interest": rng.randint(0, 20000),
+            "result": "",
+            "can_close_early": True,
+            "cap_strike": None,
+            "floor_strike": strike - 0.01,
+            "strike_type": "greater",
+            "rules_primary": "If the price of Bitcoin is above the strike at expiration, the market resolves to Yes.",
+        })
+    return {"markets": markets, "cursor": "CgsI2M3xvQYQ8LO7MxIHS1hCVENELQ"}
+
+
+def markets_json(n=1000, seed=SEED):
+    return json.dumps(markets_page(n, seed)).encode()
+
+
+def orderbook(levels=25, seed=SEED):
+    """A GET /markets/{ticker}/orderbook response body with `levels` price levels per side."""
+    rng = random.Random(seed)
+    yes = sorted(rng.sample(range(1, 50), levels))
+    no = sorted(rng.sample(range(1, 50), levels))
+    return {"orderbook": {
+        "yes": [[price, rng.randint(1, 500)] for price in yes],
+        "no": [[price, rng.randint(1, 500)] for price in no],
+    }}
+
+
+def orderbook_deltas(n=10000, seed=SEED):
+    """A stream of (side, price, delta) orderbook_delta updates."""
+    rng = random.Random(seed)
+    return [(rng.choice(("yes", "no")), rng.randint(1, 99), rng.choice((-5, -1, 1, 5, 20))) for _ in range(n)]
+
+
+def ladder(n=160):
+    """Strikes and expiry hours for vectorized pricing, centred on BTC_PRICE."""
+    strikes = [BTC_PRICE - 20000 + 250 * i for i in range(n)]
+    return strikes, [1.0 + (i % 24) for i in range(n)]
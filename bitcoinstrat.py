@@ -1,9 +1,17 @@
 import numpy as np
 import requests
+import threading
 import time
 import math
 from scipy.stats import norm
 from clients import KalshiBaseClient, KalshiHttpClient
+from dispatch import INLINE
+from orderbook import OrderBookWebSocketClient
+from pricing import binary_option_prices
+from marketdata import MarketCatalog
+from metrics import METRICS
+from pricefeed import BtcPriceFeed
+from trade import Quote, QuoteManager
 from datetime import datetime, timezone
 
 def get_time_to_expiry(expiration_time):
@@ -48,10 +56,13 @@ def binary_option_price(S0, K, T_hours, IV_percent, r=0.0):
     # Compute binary option price using N(d2)
     return norm.cdf(d2)
 
-# Function to get live Bitcoin price from Binance
-def get_bitcoin_price():
+_binance_session = requests.Session()
+
+# Function to get live Bitcoin price from Binance (REST fallback for when the streaming feed is stale)
+def get_bitcoin_price(timeout=2.0):
     url = "https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT"
-    response = requests.get(url)
+    response = _binance_session.get(url, timeout=timeout)
+    response.raise_for_status()
     data = response.json()
     return float(data["price"])
 
@@ -68,70 +79,415 @@ def get_bitcoin_markets(client):
     return btc_markets
 
 
+def quote_prices(fair_price, spread):
+    """
+    Converts a fair probability into bid and ask prices in cents.
+
+    Parameters:
+    fair_price (float): Fair probability of the contract (0-1).
+    spread (float): Spread around the fair probability.
+
+    Returns:
+    tuple: (bid, ask) in cents, clamped to the tradable 1-99 range.
+    """
+    bid_price = min(max(int(math.floor((fair_price - spread / 2) * 100)), 1), 99)
+    ask_price = min(max(int(math.ceil((fair_price + spread / 2) * 100)), 1), 99)
+    return bid_price, ask_price
+
+
+def build_quotes(ticker, fair_price, spread, current_bid, current_ask, order_size=1):
+    """
+    Decides which quotes to rest in one market.
+
+    Market-making strategy: buy below fair price, sell above, but only where
+    that improves on the current market and away from the 10%/90% wings.
+
+    Parameters:
+    ticker (str): Market ticker.
+    fair_price (float): Fair probability of the contract (0-1).
+    spread (float): Spread around the fair probability.
+    current_bid (int): Current best YES bid in cents.
+    current_ask (int): Current best YES ask in cents.
+    order_size (int): Contracts per quote.
+
+    Returns:
+    list: Quote objects to rest (possibly empty).
+    """
+    if fair_price > 0.9 or fair_price < 0.1:
+        return []
+    bid_price, ask_price = quote_prices(fair_price, spread)
+    quotes = []
+    if current_bid < bid_price:
+        quotes.append(Quote(ticker, 'yes', bid_price, order_size))
+    if current_ask > ask_price:
+        # Selling YES at the ask is buying NO at 100 - ask
+        quotes.append(Quote(ticker, 'no', 100 - ask_price, order_size))
+    return quotes
+
+
+def quote_price_arrays(fair_prices, spread):
+    """
+    Vectorized quote_prices over a strike ladder.
+
+    Parameters:
+    fair_prices (np.ndarray): Fair probabilities (0-1).
+    spread (float): Spread around the fair probability.
+
+    Returns:
+    tuple: (bids, asks) as integer arrays in cents, clamped to 1-99.
+    """
+    bids = np.clip(np.floor((fair_prices - spread / 2) * 100), 1, 99).astype(np.int64)
+    asks = np.clip(np.ceil((fair_prices + spread / 2) * 100), 1, 99).astype(np.int64)
+    return bids, asks
+
+
+def best_excluding_own(book, side, own_order):
+    """
+    Best bid on one side of a local book, ignoring contracts that are our own resting order.
 
-def bitcoinstrat(client, IV_percent, spread, refresh_rate):
+    Parameters:
+    book (OrderBook): Local order book.
+    side (str): 'yes' or 'no'.
+    own_order (RestingOrder): Our resting order on that side, or None.
+
+    Returns:
+    int: Best bid in cents from other participants, 0 if there is none.
+    """
+    for price, count in book.depth(side, 2):
+        if own_order is not None and price == own_order.price:
+            count -= own_order.count
+        if count > 0:
+            return price
+    return 0
+
+
+def update_iv_surface(iv_surface, books, quotes_manager, tickers):
+    """
+    Pushes the other participants' yes bid/ask for each market into an IV surface.
+
+    Our own resting quotes are left out so the surface is fitted to the
+    market, not to the vols we quoted at.
+
+    Parameters:
+    iv_surface (IVSurface): Surface to update.
+    books (OrderBookEngine): Local order books.
+    quotes_manager (QuoteManager): Knows our resting orders.
+    tickers (iterable): Markets whose books changed.
+    """
+    for ticker in tickers:
+        book = books.book(ticker)
+        if book is None:
+            continue
+        yes_bid = best_excluding_own(book, "yes", quotes_manager.resting(ticker, "yes"))
+        best_no = best_excluding_own(book, "no", quotes_manager.resting(ticker, "no"))
+        iv_surface.update_quote(ticker, yes_bid, 100 - best_no if best_no else 100)
+
+
+class LadderQuoter:
+    """
+    Keeps quotes on a KXBTCD strike ladder in line with BTC and the books, event by event.
+
+    A BTC move first estimates every strike's new fair value from its delta
+    and gamma, and only strikes whose estimate moved by at least
+    `reprice_threshold` are repriced exactly. Quotes are then sent only for
+    markets whose bid or ask lands on a different cent, or whose book moved
+    through our quote. Everything else is left resting untouched.
+
+    With an IVSurface each strike is priced at its own fitted vol, and
+    on_vols() reprices only the strikes whose vol moved after a refit.
+    """
+    def __init__(self, quotes_manager, IV_percent, spread, books=None, order_size=1, max_volume_24h=1000,
+                 reprice_threshold=0.0025, iv_surface=None, vol_tolerance=0.5, clock=time.time):
+        """
+        Parameters:
+        quotes_manager (QuoteManager): Sends and tracks our resting orders.
+        IV_percent (float): Implied volatility in percentage, used for every strike without an IV surface.
+        spread (float): Spread around the fair probability.
+        books (OrderBookEngine): Local books; without them the catalog's yes_bid/yes_ask are used.
+        order_size (int): Contracts per quote.
+        max_volume_24h (int): Markets busier than this are not quoted.
+        reprice_threshold (float): Estimated fair-value move (in probability) that triggers an exact reprice.
+        iv_surface (IVSurface): Per-strike vols fitted from the ladder; IV_percent is its fallback.
+        vol_tolerance (float): Change in a strike's fitted vol, in vol points, that triggers a reprice.
+        clock (callable): Returns the current UNIX time; a backtest passes its simulated clock.
+        """
+        self.quotes_manager = quotes_manager
+        self.IV_percent = IV_percent
+        self.spread = spread
+        self.books = books
+        self.order_size = order_size
+        self.max_volume_24h = max_volume_24h
+        self.reprice_threshold = reprice_threshold
+        self.iv_surface = iv_surface
+        self.vol_tolerance = vol_tolerance
+        self.clock = clock
+        self.view = None
+        self.index = {}
+        self.btc_price = None
+        self.fair = self.delta = self.gamma = self.priced_at = self.iv = None
+        self.stats = {"btc_events": 0, "book_events": 0, "repriced": 0, "requoted": 0}
+
+    def set_markets(self, view, btc_price):
+        """Switches to a new set of live markets and reprices all of them (also refreshes time decay)."""
+        self.view = view
+        self.index = {ticker: i for i, ticker in enumerate(view.tickers)}
+        self.btc_price = btc_price
+        self.iv = self._vols(view.tickers)
+        greeks = binary_option_prices(btc_price, view.strikes, view.hours_to_expiry(self.clock()), self.iv)
+        self.fair = np.asarray(greeks.price, dtype=np.float64).copy()
+        self.delta = np.asarray(greeks.delta, dtype=np.float64).copy()
+        self.gamma = np.asarray(greeks.gamma, dtype=np.float64).copy()
+        self.priced_at = np.full(len(view.tickers), float(btc_price))
+        self.stats["repriced"] += len(view.tickers)
+
+        # Withdraw quotes on markets that dropped out of the live set
+        quotes = [Quote(ticker, side, 0, 0) for ticker, side in list(self.quotes_manager.orders)
+                  if ticker not in self.index]
+        return self._requote(range(len(view.tickers)), quotes)
+
+    def on_btc(self, btc_price):
+        """Reprices strikes the move affects and requotes those whose quotes changed."""
+        if self.view is None or not len(self.view.tickers):
+            return {}
+        self.stats["btc_events"] += 1
+        self.btc_price = btc_price
+        move = btc_price - self.priced_at
+        estimate = self.fair + self.delta * move + 0.5 * self.gamma * move * move
+        affected = np.flatnonzero(np.abs(estimate - self.fair) >= self.reprice_threshold)
+        if not len(affected):
+            return {}
+
+        greeks = binary_option_prices(btc_price, self.view.strikes[affected],
+                                      self.view.hours_to_expiry(self.clock())[affected], self.iv[affected])
+        return self._reprice(affected, greeks, btc_price)
+
+    def on_vols(self):
+        """Reprices strikes whose fitted vol moved by at least vol_tolerance since they were last priced."""
+        if self.view is None or self.iv_surface is None or not len(self.view.tickers):
+            return {}
+        iv = self._vols(self.view.tickers)
+        affected = np.flatnonzero(np.abs(iv - self.iv) >= self.vol_tolerance)
+        if not len(affected):
+            return {}
+        self.iv[affected] = iv[affected]
+        greeks = binary_option_prices(self.btc_price, self.view.strikes[affected],
+                                      self.view.hours_to_expiry(self.clock())[affected], self.iv[affected])
+        return self._reprice(affected, greeks, self.btc_price)
+
+    def on_book(self, tickers):
+        """Requotes markets whose book changed, if our quote decision for them changed."""
+        self.stats["book_events"] += 1
+        indices = [self.index[ticker] for ticker in tickers if ticker in self.index]
+        return self._requote(indices) if indices and self.fair is not None else {}
+
+    def _vols(self, tickers):
+        if self.iv_surface is None:
+            return np.full(len(tickers), float(self.IV_percent))
+        return self.iv_surface.vols_for(tickers)
+
+    def _reprice(self, affected, greeks, btc_price):
+        old_fair = self.fair[affected]
+        old_bids, old_asks = quote_price_arrays(old_fair, self.spread)
+        self.fair[affected] = greeks.price
+        self.delta[affected] = greeks.delta
+        self.gamma[affected] = greeks.gamma
+        self.priced_at[affected] = btc_price
+        self.stats["repriced"] += len(affected)
+
+        new_bids, new_asks = quote_price_arrays(self.fair[affected], self.spread)
+        # build_quotes stops quoting outside 10-90%, so crossing that band changes the quotes too
+        crossed_band = (np.abs(old_fair - 0.5) > 0.4) != (np.abs(self.fair[affected] - 0.5) > 0.4)
+        changed = affected[(new_bids != old_bids) | (new_asks != old_asks) | crossed_band]
+        return self._requote(changed)
+
+    def _current_market(self, i):
+        market = self.view.markets[i]
+        book = self.books.book(market["ticker"]) if self.books is not None else None
+        if book is None:
+            return market.get("yes_bid", 0), market.get("yes_ask", 100)
+        ticker = market["ticker"]
+        current_bid = best_excluding_own(book, "yes", self.quotes_manager.resting(ticker, "yes"))
+        best_no = best_excluding_own(book, "no", self.quotes_manager.resting(ticker, "no"))
+        return current_bid, 100 - best_no if best_no else 100
+
+    def _requote(self, indices, quotes=None):
+        quotes = list(quotes or [])
+        for i in indices:
+            market = self.view.markets[i]
+            ticker = market["ticker"]
+            wanted = {}
+            if market.get("volume_24h", 0) <= self.max_volume_24h:
+                current_bid, current_ask = self._current_market(i)
+                for quote in build_quotes(ticker, self.fair[i], self.spread, current_bid, current_ask, self.order_size):
+                    wanted[quote.side] = quote
+            for side in ("yes", "no"):
+                quote = wanted.get(side)
+                order = self.quotes_manager.resting(ticker, side)
+                if quote is None:
+                    if order is not None:
+                        quotes.append(Quote(ticker, side, 0, 0))
+                elif order is None or order.price != quote.price or order.count != quote.count:
+                    # Also re-places quotes that filled or expired since we last looked, and tops up partial fills
+                    quotes.append(quote)
+        if not quotes:
+            return {}
+        self.stats["requoted"] += len(quotes)
+        return self.quotes_manager.update(quotes)
+
+
+def bitcoinstrat(client, IV_percent, spread, refresh_rate, max_expiry_hours=None, quote_ttl=60, recorder=None, metrics_path=None,
+                 price_feed=None, book_client=None, iv_surface=None):
     """
     Implements a market-making strategy for Bitcoin binary contracts on Kalshi.
 
+    Quotes react to events rather than a timer: every BTC price update and
+    every orderbook change wakes the loop, and only the strikes they affect
+    are repriced and requoted. The market catalog and time decay are
+    refreshed every `refresh_rate` seconds.
+
+    With an IVSurface, strikes are priced at vols implied from the ladder
+    itself instead of one IV_percent, refit as the books change.
+
     Parameters:
     client (KalshiHttpClient): The Kalshi client to interact with the exchange.
-    IV_percent (float): Implied volatility in percentage (e.g., 50 for 50%).
+    IV_percent (float): Implied volatility in percentage (e.g., 50 for 50%); the fallback when iv_surface is given.
     spread (float): Spread around the fair probability (default is 2%).
-    refresh_rate (int): How often to refresh market data in seconds (default is 10s).
+    refresh_rate (int): How often to refresh the market catalog and reprice every strike, in seconds (default is 10s).
+    max_expiry_hours (float): Only quote markets expiring within this many hours (default: all live markets).
+    quote_ttl (int): Seconds before the exchange expires a resting quote if it is never updated (default is 60s).
+    recorder (MarketDataRecorder): Optional recorder that every new BTC price the strategy acts on is appended to,
+        with its source: the feed's combined price ("median", or the venue with LAST_GOOD) or "rest".
+    metrics_path (str): If set and metrics are enabled, the per-stage latency dump is rewritten here every refresh.
+    price_feed (BtcPriceFeed): Streaming BTC reference price. One is started if not given; the REST
+        endpoint is only used when the feed has no fresh price.
+    book_client (OrderBookWebSocketClient): Local orderbooks for the quoted markets. One is started
+        if not given, on the same account and host as `client`.
+    iv_surface (IVSurface): Per-strike implied vols fitted from the live yes bid/ask ladder.
     """
 
     print("Starting Bitcoin market-making strategy...")
-    
+    # Refetch the quoted markets every pass: LadderQuoter reads their yes_bid/yes_ask and volume_24h
+    catalog = MarketCatalog(client, series_ticker="KXBTCD", quote_hours=max_expiry_hours)
+    quotes_manager = QuoteManager(client, ttl=quote_ttl)
+    if price_feed is None:
+        price_feed = BtcPriceFeed()
+        price_feed.start_background()
+        if not price_feed.wait_ready(timeout=10):
+            print("BTC price feed has no price yet; falling back to REST until it does.")
+    catalog.refresh()
+    quoted_tickers = set(catalog.expiring_within(max_expiry_hours).tickers)
+    if book_client is None:
+        book_client = OrderBookWebSocketClient(
+            client.key_id, client.private_key, quoted_tickers, client.environment,
+            signer=client.signer, base_url=client.HTTP_BASE_URL,
+        )
+        book_client.subscriptions.want("fill")
+        book_client.start_background()
+    quoter = LadderQuoter(quotes_manager, IV_percent, spread, books=book_client.books, iv_surface=iv_surface)
+
+    # Feed and socket threads only mark what changed; the loop below does the work
+    wake = threading.Event()
+    dirty_books = set()
+    fills = []
+    dirty_lock = threading.Lock()
+
+    def on_btc(source, price):
+        wake.set()
+
+    def on_book(message):
+        ticker = message.get("msg", {}).get("market_ticker")
+        if ticker is not None:
+            with dirty_lock:
+                dirty_books.add(ticker)
+            wake.set()
+
+    def on_fill(message):
+        fill = message.get("msg", {})
+        with dirty_lock:
+            fills.append((fill["market_ticker"], fill["side"], fill["count"]))
+            dirty_books.add(fill["market_ticker"])
+        wake.set()
+
+    price_feed.on_price(on_btc)
+    book_client.on("orderbook_delta", on_book, policy=INLINE)
+    book_client.on("fill", on_fill, policy=INLINE)
+
+    def current_btc_price():
+        """(price, source, feed publish time in ns); the time is None for a REST price."""
+        btc_price, published_ns, source = price_feed.slot.read()
+        age = (time.monotonic_ns() - published_ns) / 1e9 if published_ns else float("inf")
+        if age > price_feed.max_age:
+            print(f"BTC price feed is stale ({age:.1f}s); fetching from REST...")
+            btc_price, source, published_ns = get_bitcoin_price(), "rest", None
+            age = 0.0
+        METRICS.record("btc_price_age", int(age * 1e9))
+        return btc_price, source, published_ns
+
+    next_refresh = 0.0
+    recorded_ns = 0
     while True:
         try:
-            print("\nFetching live Bitcoin price...")
-            btc_price = get_bitcoin_price()
-            print(f"Current Bitcoin price: ${btc_price:.2f}")
-
-            print("Fetching Bitcoin-related markets from Kalshi...")
-            btc_markets = get_bitcoin_markets(client)
-            print(f"Found {len(btc_markets)} Bitcoin markets.")
-
-            for market in btc_markets:
-                if market["volume_24h"] > 1000:
-                    print(f"Skipping {market['ticker']} due to high 24h volume ({market['volume_24h']}).")
-                    continue
-
-                strike_price = float(market["floor_strike"])
-                time_to_expiry = get_time_to_expiry(market["expiration_time"])
-                print(f"\nProcessing market {market['ticker']} - Strike Price: {strike_price}, Time to Expiry: {time_to_expiry:.2f} hours")
-
-                # Compute fair price
-                fair_price = binary_option_price(btc_price, strike_price, time_to_expiry, IV_percent)
-                print(f"Calculated fair probability: {fair_price:.4f}")
-
-
-                # Determine bid and ask prices with spread
-                bid_price = int(math.floor(max(0, (fair_price - spread / 2))* 100) / 100)
-                ask_price = int(math.ceil(min(1, (fair_price + spread / 2))* 100) / 100)
-                print(f"Placing orders - Bid: {bid_price:.4f}, Ask: {ask_price:.4f}")
-
-                # Get current order book prices
-                current_bid = market.get("yes_bid", 0)
-                current_ask = market.get("no_bid", 1)
-                order_size = 1
-                # Market-making strategy: buy below fair price, sell above
-
-                if fair_price > 0.9 or fair_price < 0.1:
-                    continue
-                if current_bid < bid_price:
-                    client_order_id = f"order_{int(time.time())}"
-                    print(f"Placing BUY order on {market['ticker']} at {bid_price:.4f}")
-                    client.PostOrder(ticker=market['ticker'], client_order_id=client_order_id, action="buy", type='limit', side='yes', yes_price=bid_price*100, count=order_size, expiration_ts=refresh_rate)
-
-                if current_ask > ask_price:
-                    client_order_id = f"order_{int(time.time())}"
-                    print(f"Placing SELL order on {market['ticker']} at {ask_price:.4f}")
-                    client.PostOrder(ticker=market['ticker'], client_order_id=client_order_id, action="buy", type='limit', side='no', no_price=ask_price*100, count=order_size, expiration_ts=refresh_rate)
-
-            print(f"Sleeping for {refresh_rate} seconds before next update...")
-            time.sleep(refresh_rate)
+            wake.wait(timeout=max(next_refresh - time.monotonic(), 0))
+            wake.clear()
+            t_tick = t0 = METRICS.clock()
+            btc_price, source, published_ns = current_btc_price()
+            METRICS.observe("btc_fetch", t0)
+            # Book updates wake the loop too; record a feed price only once
+            if recorder is not None and (published_ns is None or published_ns != recorded_ns):
+                recorder.record_btc(btc_price, source)
+                recorded_ns = published_ns
+
+            with dirty_lock:
+                tickers = list(dirty_books)
+                dirty_books.clear()
+                filled = fills[:]
+                fills.clear()
+            # Filled quotes are gone from the exchange; forget them so they get re-placed
+            for ticker, side, count in filled:
+                quotes_manager.on_fill(ticker, side, count)
+
+            if time.monotonic() >= next_refresh:
+                t0 = METRICS.clock()
+                catalog.refresh()
+                live = catalog.expiring_within(max_expiry_hours)
+                METRICS.observe("market_refresh", t0)
+                if iv_surface is not None:
+                    t0 = METRICS.clock()
+                    iv_surface.set_markets(live.tickers, live.strikes, live.expiry_ts)
+                    update_iv_surface(iv_surface, book_client.books, quotes_manager, live.tickers)
+                    iv_surface.refit(btc_price)
+                    METRICS.observe("iv_fit", t0)
+                live_tickers = set(live.tickers)
+                if live_tickers != quoted_tickers and book_client.loop is not None:
+                    if quoted_tickers - live_tickers:
+                        book_client.submit(book_client.unsubscribe("orderbook_delta", quoted_tickers - live_tickers))
+                    if live_tickers - quoted_tickers:
+                        book_client.submit(book_client.subscribe("orderbook_delta", live_tickers - quoted_tickers))
+                    quoted_tickers = live_tickers
+                t0 = METRICS.clock()
+                changes = quoter.set_markets(live, btc_price)
+                METRICS.observe("quote_update", t0)
+                print(f"BTC ${btc_price:.2f}: {len(live.tickers)} live markets, quote updates {changes}, totals {quoter.stats}")
+                if metrics_path and METRICS.enabled:
+                    METRICS.write_prometheus(metrics_path)
+                next_refresh = time.monotonic() + refresh_rate
+                # set_markets requoted every live market, including the dirty ones
+                continue
+
+            t0 = METRICS.clock()
+            changes = {}
+            if iv_surface is not None:
+                update_iv_surface(iv_surface, book_client.books, quotes_manager, tickers)
+                if iv_surface.refit(btc_price):
+                    changes = quoter.on_vols()
+                METRICS.observe("iv_fit", t0)
+            changes = quoter.on_btc(btc_price) or changes
+            if tickers:
+                changes = quoter.on_book(tickers) or changes
+            METRICS.observe("quote_update", t0)
+            if changes:
+                METRICS.observe("tick_to_ack", t_tick)
 
         except Exception as e:
             print(f"Error in strategy execution: {e}")
-            time.sleep(refresh_rate)
\ No newline at end of file
+            time.sleep(1)
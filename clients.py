@@ -1,20 +1,35 @@
+import asyncio
+import concurrent.futures
 import requests
 import base64
+import random
+import socket
+import threading
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 import json
 import uuid
 
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from cryptography.exceptions import InvalidSignature
 
+import aiohttp
 import websockets
 
+from metrics import METRICS
+from records import DICT, convert_markets, convert_orderbook, convert_positions
+from ratelimit import RateLimiter
+from signing import Signer
+from dispatch import Dispatcher, DROP_OLDEST, INLINE
+from subscriptions import SubscriptionManager
+from utils import paginate
+
 class Environment(Enum):
     DEMO = "demo"
     PROD = "prod"
@@ -26,6 +41,8 @@ class KalshiBaseClient:
         key_id: str,
         private_key: rsa.RSAPrivateKey,
         environment: Environment = Environment.DEMO,
+        signer: Optional[Signer] = None,
+        base_url: Optional[str] = None,
     ):
         """Initializes the client with the provided API key and private key.
 
@@ -33,11 +50,18 @@ class KalshiBaseClient:
             key_id (str): Your Kalshi API key ID.
             private_key (rsa.RSAPrivateKey): Your RSA private key.
             environment (Environment): The API environment to use (DEMO or PROD).
+            signer (Optional[Signer]): Signing backend, e.g. a ThreadPoolSigner or
+                ProcessPoolSigner from signing.py. Defaults to signing in the calling thread.
+                The async client signs every request on the signer's pool; the sync client
+                signs the chunks of batched order requests there in one batch.
+            base_url (Optional[str]): Overrides the environment's host, e.g.
+                "http://127.0.0.1:8080" for a local mock exchange. The WebSocket
+                host is derived from it (http -> ws, https -> wss).
         """
         self.key_id = key_id
         self.private_key = private_key
         self.environment = environment
-        self.last_api_call = datetime.now()
+        self.signer = signer if signer is not None else Signer(private_key)
 
         if self.environment == Environment.DEMO:
             self.HTTP_BASE_URL = "https://demo-api.kalshi.co"
@@ -48,6 +72,10 @@ class KalshiBaseClient:
         else:
             raise ValueError("Invalid environment")
 
+        if base_url is not None:
+            self.HTTP_BASE_URL = base_url.rstrip("/")
+            self.WS_BASE_URL = "ws" + self.HTTP_BASE_URL[len("http"):]
+
     def request_headers(self, method: str, path: str) -> Dict[str, Any]:
         """Generates the required authentication headers for API requests."""
         current_time_milliseconds = int(time.time() * 1000)
@@ -57,91 +85,265 @@ class KalshiBaseClient:
         path_parts = path.split('?')
 
         msg_string = timestamp_str + method + path_parts[0]
-        signature = self.sign_pss_text(msg_string)
+        t0 = METRICS.clock()
+        signature = self.signer.sign(msg_string)
+        METRICS.observe("sign", t0)
+
+        return self._auth_headers(timestamp_str, signature)
+
+    async def request_headers_async(self, method: str, path: str) -> Dict[str, Any]:
+        """Generates authentication headers, signing on the signer's worker pool."""
+        timestamp_str = str(int(time.time() * 1000))
+        msg_string = timestamp_str + method + path.split('?')[0]
+        t0 = METRICS.clock()
+        signature = await self.signer.sign_async(msg_string)
+        METRICS.observe("sign", t0)
+        return self._auth_headers(timestamp_str, signature)
 
-        headers = {
+    # Pre-signed headers older than this are re-signed rather than risk the exchange's clock-skew check
+    SIGNED_HEADERS_MAX_AGE = 30.0
+
+    def request_headers_batch(self, method_paths: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Generates authentication headers for many (method, path) requests at once.
+
+        All signatures are produced in a single signer batch, so a pool signer
+        can spread them across its workers.
+        """
+        timestamp_str = str(int(time.time() * 1000))
+        messages = [(timestamp_str, method, path.split('?')[0]) for method, path in method_paths]
+        t0 = METRICS.clock()
+        signatures = self.signer.sign_requests(messages)
+        METRICS.observe("sign", t0)
+        return [self._auth_headers(timestamp_str, signature) for signature in signatures]
+
+    def _fresh_headers(self, headers: Optional[Dict[str, Any]], method: str, path: str) -> Dict[str, Any]:
+        """Pre-signed headers if still fresh, otherwise newly signed ones."""
+        if headers is not None:
+            age = time.time() - int(headers["KALSHI-ACCESS-TIMESTAMP"]) / 1000
+            if age < self.SIGNED_HEADERS_MAX_AGE:
+                return headers
+        return self.request_headers(method, path)
+
+    def _auth_headers(self, timestamp_str: str, signature: str) -> Dict[str, Any]:
+        return {
             "Content-Type": "application/json",
             "KALSHI-ACCESS-KEY": self.key_id,
             "KALSHI-ACCESS-SIGNATURE": signature,
             "KALSHI-ACCESS-TIMESTAMP": timestamp_str,
         }
-        return headers
+
+    @staticmethod
+    def order_payload(
+        action: str,
+        client_order_id: str,
+        count: int,
+        side: str,
+        ticker: str,
+        type: str,
+        expiration_ts: Optional[int] = None,
+        no_price: Optional[int] = None,
+        yes_price: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Builds the JSON body for a create-order request."""
+        payload = {
+            "action": action,
+            "client_order_id": client_order_id,
+            "count": count,
+            "side": side,
+            "ticker": ticker,
+            "type": type
+        }
+
+        if expiration_ts:
+            payload["expiration_ts"] = expiration_ts
+
+        if yes_price is not None:
+            payload["yes_price"] = yes_price
+        elif no_price is not None:
+            payload["no_price"] = no_price
+        return payload
 
     def sign_pss_text(self, text: str) -> str:
         """Signs the text using RSA-PSS and returns the base64 encoded signature."""
-        message = text.encode('utf-8')
-        try:
-            signature = self.private_key.sign(
-                message,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            return base64.b64encode(signature).decode('utf-8')
-        except InvalidSignature as e:
-            raise ValueError("RSA sign PSS failed") from e
+        return self.signer.sign(text)
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that enables TCP keep-alive probes on pooled sockets."""
+    def __init__(self, keep_alive_idle: Optional[int] = 30, **kwargs):
+        """
+        Args:
+            keep_alive_idle (Optional[int]): Seconds a pooled socket may sit idle before the
+                kernel starts sending keep-alive probes. None disables TCP keep-alive.
+            **kwargs: Forwarded to HTTPAdapter (pool_connections, pool_maxsize, max_retries, ...).
+        """
+        self.keep_alive_idle = keep_alive_idle
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.keep_alive_idle is not None:
+            socket_options = [
+                (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+            # TCP_KEEPIDLE is Linux-only; macOS spells it TCP_KEEPALIVE
+            idle_option = getattr(socket, "TCP_KEEPIDLE", getattr(socket, "TCP_KEEPALIVE", None))
+            if idle_option is not None:
+                socket_options.append((socket.IPPROTO_TCP, idle_option, self.keep_alive_idle))
+            kwargs["socket_options"] = socket_options
+        super().init_poolmanager(*args, **kwargs)
 
 class KalshiHttpClient(KalshiBaseClient):
     """Client for handling HTTP connections to the Kalshi API."""
+    # Largest batch accepted by the batched order endpoints
+    MAX_BATCH_SIZE = 20
+    # Write-budget cost of one cancel relative to one order create
+    CANCEL_COST = 0.2
+
     def __init__(
         self,
         key_id: str,
         private_key: rsa.RSAPrivateKey,
         environment: Environment = Environment.PROD,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        keep_alive: bool = True,
+        keep_alive_idle: Optional[int] = 30,
+        timeout: Optional[float] = 10.0,
+        warm_up: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        signer: Optional[Signer] = None,
+        base_url: Optional[str] = None,
     ):
-        super().__init__(key_id, private_key, environment)
+        """Initializes the client and its pooled HTTP session.
+
+        Args:
+            key_id (str): Your Kalshi API key ID.
+            private_key (rsa.RSAPrivateKey): Your RSA private key.
+            environment (Environment): The API environment to use (DEMO or PROD).
+            pool_connections (int): Number of host pools to cache.
+            pool_maxsize (int): Maximum number of persistent connections kept per host.
+            keep_alive (bool): Reuse connections between requests. If False every
+                request sends "Connection: close".
+            keep_alive_idle (Optional[int]): Idle seconds before TCP keep-alive probes are sent.
+            timeout (Optional[float]): Per-request timeout in seconds.
+            warm_up (bool): Open a connection to the exchange during construction so the
+                first real request skips the TCP+TLS handshake.
+            rate_limiter (Optional[RateLimiter]): Read/write token buckets to draw from.
+                Pass the same instance to several clients to share one budget.
+            signer (Optional[Signer]): Signing backend. Defaults to signing in the calling thread.
+            base_url (Optional[str]): Overrides the environment's host (e.g. a local mock exchange).
+        """
+        super().__init__(key_id, private_key, environment, signer, base_url)
         self.host = self.HTTP_BASE_URL
         self.exchange_url = "/trade-api/v2/exchange"
         self.markets_url = "/trade-api/v2/markets"
         self.portfolio_url = "/trade-api/v2/portfolio"
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+
+        self.session = requests.Session()
+        adapter = KeepAliveAdapter(
+            keep_alive_idle=keep_alive_idle if keep_alive else None,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Connection": "keep-alive" if keep_alive else "close"})
+
+        if warm_up:
+            self.warm_up()
+
+    def warm_up(self) -> bool:
+        """Opens a pooled connection to the exchange ahead of the first trading request.
+
+        Returns:
+            bool: True if the connection was established.
+        """
+        try:
+            self.session.get(self.host + self.exchange_url + "/status", timeout=self.timeout)
+            return True
+        except requests.RequestException as e:
+            print(f"Connection warm-up failed: {e}")
+            return False
+
+    def close(self) -> None:
+        """Closes all pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
 
-    def rate_limit(self) -> None:
-        """Built-in rate limiter to prevent exceeding API rate limits."""
-        THRESHOLD_IN_MILLISECONDS = 100
-        now = datetime.now()
-        threshold_in_microseconds = 1000 * THRESHOLD_IN_MILLISECONDS
-        threshold_in_seconds = THRESHOLD_IN_MILLISECONDS / 1000
-        if now - self.last_api_call < timedelta(microseconds=threshold_in_microseconds):
-            time.sleep(threshold_in_seconds)
-        self.last_api_call = datetime.now()
+    def __exit__(self, *exc):
+        self.close()
+
+    def rate_limit(self, method: str = "GET", cost: float = 1) -> None:
+        """Blocks until the read or write budget for this method has `cost` tokens."""
+        t0 = METRICS.clock()
+        self.rate_limiter.acquire(method, cost)
+        METRICS.observe("rate_limit_wait", t0)
 
     def raise_if_bad_response(self, response: requests.Response) -> None:
         """Raises an HTTPError if the response status code indicates an error."""
         if response.status_code not in range(200, 299):
             response.raise_for_status()
 
-    def post(self, path: str, body: dict) -> Any:
-        """Performs an authenticated POST request to the Kalshi API."""
-        self.rate_limit()
-        response = requests.post(
+    def post(self, path: str, body: dict, cost: float = 1, headers: Optional[Dict[str, Any]] = None) -> Any:
+        """Performs an authenticated POST request to the Kalshi API.
+
+        `headers` may come from request_headers_batch; they are re-signed if they went stale.
+        """
+        self.rate_limit("POST", cost)
+        headers = self._fresh_headers(headers, "POST", path)
+        t0 = METRICS.clock()
+        response = self.session.post(
             self.host + path,
             json=body,
-            headers=self.request_headers("POST", path)
+            headers=headers,
+            timeout=self.timeout,
         )
+        METRICS.observe("http_post", t0)
         self.raise_if_bad_response(response)
         return response.json()
 
     def get(self, path: str, params: Dict[str, Any] = {}) -> Any:
         """Performs an authenticated GET request to the Kalshi API."""
-        self.rate_limit()
-        response = requests.get(
+        self.rate_limit("GET")
+        headers = self.request_headers("GET", path)
+        t0 = METRICS.clock()
+        response = self.session.get(
             self.host + path,
-            headers=self.request_headers("GET", path),
-            params=params
+            headers=headers,
+            params=params,
+            timeout=self.timeout,
         )
+        METRICS.observe("http_get", t0)
         self.raise_if_bad_response(response)
         return response.json()
 
-    def delete(self, path: str, params: Dict[str, Any] = {}) -> Any:
-        """Performs an authenticated DELETE request to the Kalshi API."""
-        self.rate_limit()
-        response = requests.delete(
+    def delete(
+        self,
+        path: str,
+        params: Dict[str, Any] = {},
+        body: Optional[dict] = None,
+        cost: float = 1,
+        headers: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """Performs an authenticated DELETE request to the Kalshi API.
+
+        `headers` may come from request_headers_batch; they are re-signed if they went stale.
+        """
+        self.rate_limit("DELETE", cost)
+        headers = self._fresh_headers(headers, "DELETE", path)
+        t0 = METRICS.clock()
+        response = self.session.delete(
             self.host + path,
-            headers=self.request_headers("DELETE", path),
-            params=params
+            headers=headers,
+            params=params,
+            json=body,
+            timeout=self.timeout,
         )
+        METRICS.observe("http_delete", t0)
         self.raise_if_bad_response(response)
         return response.json()
 
@@ -175,9 +377,11 @@ class KalshiHttpClient(KalshiBaseClient):
     def GetMarketOrderbook(
         self,
         ticker: str, 
-        depth: Optional[int] = None
+        depth: Optional[int] = None,
+        form: str = DICT
     ) -> Dict[str, Any]:
         # Retrives Orderbook for given market (ticker) at given depth
+        # form='records' or 'columns' returns a records.OrderbookRecord of price/count arrays
         url = f"{self.markets_url}/{ticker}/orderbook"
         if depth is not None:
             url += f"?depth={depth}"  # Append depth as a query parameter
@@ -186,7 +390,7 @@ class KalshiHttpClient(KalshiBaseClient):
         }
         if depth is not None:
             params[depth] = depth
-        return self.get(url, params=params)
+        return convert_orderbook(ticker, self.get(url, params=params), form)
 
     def get_markets(
             self,
@@ -195,7 +399,8 @@ class KalshiHttpClient(KalshiBaseClient):
             status: Optional[str] = None,
             series_ticker: Optional[str] = None,
             max_close_ts: Optional[int] = None,
-            min_close_ts: Optional[int] = None
+            min_close_ts: Optional[int] = None,
+            form: str = DICT
             ) -> Dict:
         """
         Fetches a list of markets from the Kalshi API.
@@ -205,14 +410,37 @@ class KalshiHttpClient(KalshiBaseClient):
         - limit (int): The number of markets to return. Default is 100.
         - cursor (str, optional): Pagination cursor from previous requests to get the next set of markets.
         - status (str, optional): A comma-separated list of market statuses (e.g., "open", "unopened").
+        - form (str, optional): 'dict' (default) for raw market dicts, 'records' for a list of
+          records.MarketRecord, or 'columns' for one NumPy structured array (records.MARKET_DTYPE).
 
         Returns:
         - Dict: A dictionary containing market data.
         """
+        data = self.get_markets_page(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            series_ticker=series_ticker,
+            max_close_ts=max_close_ts,
+            min_close_ts=min_close_ts,
+        )
 
-        headers = {"accept": "application/json"}
-        
+        # Check if 'markets' key exists in the response
+        if "markets" in data:
+            return convert_markets(data["markets"], form)
+        else:
+            return {} if form == DICT else convert_markets([], form)
 
+    def get_markets_page(
+            self,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+            status: Optional[str] = None,
+            series_ticker: Optional[str] = None,
+            max_close_ts: Optional[int] = None,
+            min_close_ts: Optional[int] = None
+            ) -> Dict[str, Any]:
+        """Fetches one page of markets, returning the raw response including the next 'cursor'."""
         params = {
             "limit": limit,
             "cursor": cursor,
@@ -224,26 +452,7 @@ class KalshiHttpClient(KalshiBaseClient):
         
         params = {k: v for k, v in params.items() if v is not None}
 
-        url = f"https://api.elections.kalshi.com/trade-api/v2/markets"
-
-
-        # Send the GET request to the API
-        response = requests.get(url, headers=headers, params=params)
-
-        if response.status_code != 200:
-            print(response.url)
-            raise Exception(f"Failed to fetch markets: {response.status_code} - {response.text}")
-        
-        # Parse the response JSON
-        data = response.json()
-
-        # Check if 'markets' key exists in the response
-        if "markets" in data:
-            return data["markets"]
-        else:
-            return {}
-
-
+        return self.get(self.markets_url, params=params)
 
     def PostOrder(
         self,
@@ -274,46 +483,129 @@ class KalshiHttpClient(KalshiBaseClient):
         Returns:
             dict: Response from the Kalshi API.
         """
-        url = "https://api.elections.kalshi.com/trade-api/v2/portfolio/orders"
-        
+        payload = self.order_payload(
+            action=action,
+            client_order_id=client_order_id,
+            count=count,
+            side=side,
+            ticker=ticker,
+            type=type,
+            expiration_ts=expiration_ts,
+            no_price=no_price,
+            yes_price=yes_price,
+        )
+        print(payload)
+        return self.post(self.portfolio_url + '/orders', payload)
 
-        # Construct the payload
-        payload = {
+    def cancel_order(self, order_id: str) -> Dict[str, Any]:
+        """Cancels a resting order."""
+        return self.delete(f"{self.portfolio_url}/orders/{order_id}", cost=self.CANCEL_COST)
+
+    def amend_order(
+        self,
+        order_id: str,
+        action: str,
+        client_order_id: str,
+        updated_client_order_id: str,
+        count: int,
+        side: str,
+        ticker: str,
+        no_price: Optional[int] = None,
+        yes_price: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Changes the price and/or size of a resting order in place.
+
+        Args:
+            order_id (str): Exchange id of the order to amend.
+            action (str): The order's action ('buy' or 'sell').
+            client_order_id (str): The order's current client order id.
+            updated_client_order_id (str): Client order id for the amended order.
+            count (int): New total number of contracts.
+            side (str): The order's side ('yes' or 'no').
+            ticker (str): The order's market.
+            no_price (Optional[int]): New price in cents for a 'No' order.
+            yes_price (Optional[int]): New price in cents for a 'Yes' order.
+
+        Returns:
+            dict: Response with the 'old_order' and the amended 'order'.
+        """
+        body = {
             "action": action,
             "client_order_id": client_order_id,
+            "updated_client_order_id": updated_client_order_id,
             "count": count,
             "side": side,
             "ticker": ticker,
-            "type": type
         }
-
-        if expiration_ts:
-            payload["expiration_ts"] = expiration_ts
-
         if yes_price is not None:
-            payload["yes_price"] = yes_price
+            body["yes_price"] = yes_price
         elif no_price is not None:
-            payload["no_price"] = no_price
-        # Generate the timestamp and signature for authentication
-        timestamp_str = str(int(time.time() * 1000))  # Current time in milliseconds
-        signature = self.sign_pss_text(timestamp_str + "POST" + "/trade-api/v2/portfolio/orders")
+            body["no_price"] = no_price
+        return self.post(f"{self.portfolio_url}/orders/{order_id}/amend", body)
 
-        # Set the headers
-        headers = {
-            "Content-Type": "application/json",
-            "KALSHI-ACCESS-KEY": self.key_id,
-            "KALSHI-ACCESS-SIGNATURE": signature,
-            "KALSHI-ACCESS-TIMESTAMP": timestamp_str,
-        }
+    def decrease_order(
+        self,
+        order_id: str,
+        reduce_by: Optional[int] = None,
+        reduce_to: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Reduces the remaining size of a resting order without losing queue position."""
+        body = {"reduce_by": reduce_by} if reduce_by is not None else {"reduce_to": reduce_to}
+        return self.post(f"{self.portfolio_url}/orders/{order_id}/decrease", body)
 
-        print(payload)
-        response = requests.post(url, json=payload, headers=headers)
+    def batch_create_orders(self, orders: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Submits many orders through the batched create endpoint.
 
-        # Check if the request was successful
-        if response.status_code != 201:
-            raise Exception(f"Order submission failed: {response.status_code}, {response.text}")
+        Orders are sent MAX_BATCH_SIZE at a time, so a requote across many
+        strikes costs a handful of round trips instead of one per order.
 
-        return response.json()
+        Args:
+            orders (Iterable[Dict[str, Any]]): Keyword arguments for PostOrder, one dict per order.
+
+        Returns:
+            List[Dict[str, Any]]: One result per input order, in input order. Each has an
+            'order' on success or an 'error' if the exchange rejected that order.
+        """
+        payloads = [self.order_payload(**order) for order in orders]
+        path = self.portfolio_url + '/orders/batched'
+        starts = range(0, len(payloads), self.MAX_BATCH_SIZE)
+        # Every chunk's signature in one signer batch, so a pool signer works on them in parallel
+        signed = self.request_headers_batch([("POST", path)] * len(starts)) if len(starts) > 1 else [None] * len(starts)
+        results = []
+        for i, headers in zip(starts, signed):
+            chunk = payloads[i:i + self.MAX_BATCH_SIZE]
+            response = self.post(path, {"orders": chunk}, cost=len(chunk), headers=headers)
+            results.extend(response.get("orders", []))
+        return results
+
+    def batch_cancel_orders(self, order_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Cancels many resting orders through the batched cancel endpoint.
+
+        Args:
+            order_ids (Iterable[str]): Exchange order ids to cancel.
+
+        Returns:
+            List[Dict[str, Any]]: One result per input id, in input order. Each has the
+            cancelled 'order' and 'reduced_by', or an 'error'.
+        """
+        order_ids = list(order_ids)
+        path = self.portfolio_url + '/orders/batched'
+        starts = range(0, len(order_ids), self.MAX_BATCH_SIZE)
+        signed = self.request_headers_batch([("DELETE", path)] * len(starts)) if len(starts) > 1 else [None] * len(starts)
+        results = []
+        for i, headers in zip(starts, signed):
+            chunk = order_ids[i:i + self.MAX_BATCH_SIZE]
+            response = self.delete(
+                path,
+                body={"ids": chunk},
+                cost=len(chunk) * self.CANCEL_COST,
+                headers=headers,
+            )
+            results.extend(response.get("orders", []))
+        return results
 
     def GetPositions(
             self,
@@ -322,12 +614,10 @@ class KalshiHttpClient(KalshiBaseClient):
             ticker: Optional[str] = None,
             count_filter: Optional[str] = None,
             settlement_status: Optional[str] = None,
-            event_ticker: Optional[str] = None
+            event_ticker: Optional[str] = None,
+            form: str = DICT
     ) -> dict:
-        url = 'https://api.elections.kalshi.com/trade-api/v2/portfolio/positions'
-        
-        headers = {"accept": "application/json"}
-
+        # form='records' or 'columns' converts 'market_positions' to records.PositionRecord / POSITION_DTYPE
         params = {
         "cursor": cursor,
         "limit": limit,
@@ -340,9 +630,242 @@ class KalshiHttpClient(KalshiBaseClient):
         # Remove any parameters that are None
         params = {key: value for key, value in params.items() if value is not None}
     
-        return self.get(self.portfolio_url + '/positions', params=params)
+        return convert_positions(self.get(self.portfolio_url + '/positions', params=params), form)
+
+    def GetOrders(
+            self,
+            cursor: Optional[str] = None,
+            limit: Optional[int] = None,
+            ticker: Optional[str] = None,
+            event_ticker: Optional[str] = None,
+            status: Optional[str] = None,
+            min_ts: Optional[int] = None,
+            max_ts: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Retrieves our orders, optionally for one market or with one status ('resting', 'canceled', 'executed')."""
+        params = {
+            "cursor": cursor,
+            "limit": limit,
+            "ticker": ticker,
+            "event_ticker": event_ticker,
+            "status": status,
+            "min_ts": min_ts,
+            "max_ts": max_ts,
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+        return self.get(self.portfolio_url + '/orders', params=params)
+
+    # Largest page size accepted by the list endpoints
+    MAX_PAGE_SIZE = 1000
+
+    def iter_markets(self, prefetch: bool = True, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """Yields every market matching the get_markets filters, following cursors lazily."""
+        filters.setdefault("limit", self.MAX_PAGE_SIZE)
+        return paginate(lambda cursor: self.get_markets_page(cursor=cursor, **filters), "markets", prefetch=prefetch)
+
+    def iter_trades(self, prefetch: bool = True, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """Yields every trade matching the get_trades filters, following cursors lazily."""
+        filters.setdefault("limit", self.MAX_PAGE_SIZE)
+        return paginate(lambda cursor: self.get_trades(cursor=cursor, **filters), "trades", prefetch=prefetch)
+
+    def iter_orders(self, prefetch: bool = True, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """Yields every order matching the GetOrders filters, following cursors lazily."""
+        filters.setdefault("limit", self.MAX_PAGE_SIZE)
+        return paginate(lambda cursor: self.GetOrders(cursor=cursor, **filters), "orders", prefetch=prefetch)
+
+    def iter_positions(
+        self,
+        items_key: str = "market_positions",
+        prefetch: bool = True,
+        **filters: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yields every position matching the GetPositions filters, following cursors lazily.
+
+        Args:
+            items_key (str): 'market_positions' or 'event_positions'.
+        """
+        filters.setdefault("limit", self.MAX_PAGE_SIZE)
+        return paginate(lambda cursor: self.GetPositions(cursor=cursor, **filters), items_key, prefetch=prefetch)
+
+
+class AsyncKalshiHttpClient(KalshiBaseClient):
+    """Asyncio client for the Kalshi HTTP API.
+
+    Signs requests exactly like KalshiHttpClient, but runs them on an aiohttp
+    session so many market reads or order posts can be in flight at once.
+    Use it as an async context manager:
+
+        async with AsyncKalshiHttpClient(key_id, private_key) as client:
+            books = await client.get_orderbooks(tickers, depth=1)
+    """
+    def __init__(
+        self,
+        key_id: str,
+        private_key: rsa.RSAPrivateKey,
+        environment: Environment = Environment.PROD,
+        max_concurrency: int = 10,
+        rate_limiter: Optional[RateLimiter] = None,
+        keep_alive_timeout: float = 30.0,
+        timeout: Optional[float] = 10.0,
+        signer: Optional[Signer] = None,
+        base_url: Optional[str] = None,
+    ):
+        """Initializes the client.
+
+        Args:
+            key_id (str): Your Kalshi API key ID.
+            private_key (rsa.RSAPrivateKey): Your RSA private key.
+            environment (Environment): The API environment to use (DEMO or PROD).
+            max_concurrency (int): Maximum number of requests in flight at once.
+                Also caps the size of the connection pool.
+            rate_limiter (Optional[RateLimiter]): Read/write token buckets to draw from.
+                Pass the same instance to a KalshiHttpClient to share one budget.
+            keep_alive_timeout (float): Seconds an idle pooled connection is kept open.
+            timeout (Optional[float]): Per-request timeout in seconds.
+            signer (Optional[Signer]): Signing backend. Pass a ThreadPoolSigner or
+                ProcessPoolSigner to keep RSA signing off the event loop.
+            base_url (Optional[str]): Overrides the environment's host (e.g. a local mock exchange).
+        """
+        super().__init__(key_id, private_key, environment, signer, base_url)
+        self.host = self.HTTP_BASE_URL
+        self.exchange_url = "/trade-api/v2/exchange"
+        self.markets_url = "/trade-api/v2/markets"
+        self.portfolio_url = "/trade-api/v2/portfolio"
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.keep_alive_timeout = keep_alive_timeout
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def open(self) -> None:
+        """Creates the pooled aiohttp session. Called automatically on first use."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                keepalive_timeout=self.keep_alive_timeout,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self) -> None:
+        """Closes the session and all pooled connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def rate_limit(self, method: str = "GET") -> None:
+        """Waits until the read or write budget for this method has a token."""
+        await self.rate_limiter.acquire_async(method)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[dict] = None,
+    ) -> Any:
+        """Performs an authenticated request to the Kalshi API."""
+        await self.open()
+        async with self._semaphore:
+            await self.rate_limit(method)
+            headers = await self.request_headers_async(method, path)
+            t0 = METRICS.clock()
+            async with self.session.request(
+                method,
+                self.host + path,
+                params=params,
+                json=body,
+                headers=headers,
+            ) as response:
+                response.raise_for_status()
+                data = await response.json()
+            METRICS.observe(f"http_{method.lower()}", t0)
+            return data
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Performs an authenticated GET request to the Kalshi API."""
+        return await self.request("GET", path, params=params)
+
+    async def post(self, path: str, body: dict) -> Any:
+        """Performs an authenticated POST request to the Kalshi API."""
+        return await self.request("POST", path, body=body)
+
+    async def delete(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Performs an authenticated DELETE request to the Kalshi API."""
+        return await self.request("DELETE", path, params=params)
+
+    async def get_balance(self) -> Dict[str, Any]:
+        """Retrieves the account balance."""
+        return await self.get(self.portfolio_url + '/balance')
+
+    async def get_markets(self, form: str = DICT, **filters: Any) -> List[Dict[str, Any]]:
+        """Fetches one page of markets. Accepts the same filters and forms as KalshiHttpClient.get_markets."""
+        params = {k: v for k, v in filters.items() if v is not None}
+        data = await self.get(self.markets_url, params=params)
+        return convert_markets(data.get("markets", []), form)
+
+    async def GetMarketOrderbook(self, ticker: str, depth: Optional[int] = None, form: str = DICT) -> Dict[str, Any]:
+        """Retrieves the orderbook for a market at the given depth."""
+        params = {'depth': depth} if depth is not None else None
+        return convert_orderbook(ticker, await self.get(f"{self.markets_url}/{ticker}/orderbook", params=params), form)
+
+    async def PostOrder(self, **order: Any) -> Dict[str, Any]:
+        """Submits an order. Accepts the same arguments as KalshiHttpClient.PostOrder."""
+        return await self.post(self.portfolio_url + '/orders', self.order_payload(**order))
+
+    async def GetPositions(self, form: str = DICT, **filters: Any) -> Dict[str, Any]:
+        """Retrieves portfolio positions. Accepts the same filters and forms as KalshiHttpClient.GetPositions."""
+        params = {k: v for k, v in filters.items() if v is not None}
+        return convert_positions(await self.get(self.portfolio_url + '/positions', params=params), form)
+
+    async def get_orderbooks(
+        self,
+        tickers: Iterable[str],
+        depth: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Fetches orderbooks for many markets concurrently.
+
+        Args:
+            tickers (Iterable[str]): Market tickers to fetch.
+            depth (Optional[int]): Orderbook depth for every market.
+
+        Returns:
+            Dict[str, Any]: Orderbook response per ticker. A ticker whose request
+            failed maps to the raised exception instead.
+        """
+        tickers = list(tickers)
+        results = await asyncio.gather(
+            *(self.GetMarketOrderbook(ticker, depth) for ticker in tickers),
+            return_exceptions=True,
+        )
+        return dict(zip(tickers, results))
+
+    async def post_orders(self, orders: Iterable[Dict[str, Any]]) -> List[Any]:
+        """Submits many orders concurrently.
+
+        Args:
+            orders (Iterable[Dict[str, Any]]): Keyword arguments for PostOrder, one dict per order.
+
+        Returns:
+            List[Any]: Order responses in the same order as the input. A failed
+            order is returned as the raised exception.
+        """
+        return await asyncio.gather(
+            *(self.PostOrder(**order) for order in orders),
+            return_exceptions=True,
+        )
 
-    
 class KalshiWebSocketClient(KalshiBaseClient):
     """Client for handling WebSocket connections to the Kalshi API."""
     def __init__(
@@ -350,11 +873,20 @@ class KalshiWebSocketClient(KalshiBaseClient):
         key_id: str,
         private_key: rsa.RSAPrivateKey,
         environment: Environment = Environment.DEMO,
+        signer: Optional[Signer] = None,
+        base_url: Optional[str] = None,
     ):
-        super().__init__(key_id, private_key, environment)
+        super().__init__(key_id, private_key, environment, signer, base_url)
         self.ws = None
         self.url_suffix = "/trade-api/ws/v2"
         self.message_id = 1  # Add counter for message IDs
+        self.dispatcher = Dispatcher()
+        self.subscriptions = SubscriptionManager(self)
+        self._opened = False
+        self.dispatcher.register(self.subscriptions.handle_subscribed, "subscribed", policy=INLINE)
+        self.dispatcher.register(self.subscriptions.handle_error, "error", policy=INLINE)
+        self.running = False
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
 
     async def connect(self):
         """Establishes a WebSocket connection using authentication."""
@@ -362,25 +894,106 @@ class KalshiWebSocketClient(KalshiBaseClient):
         auth_headers = self.request_headers("GET", self.url_suffix)
         async with websockets.connect(host, additional_headers=auth_headers) as websocket:
             self.ws = websocket
-            await self.on_open()
-            await self.handler()
+            self.dispatcher.start()
+            try:
+                await self.on_open()
+                await self.handler()
+            finally:
+                self.subscriptions.reset()
+                await self.dispatcher.stop()
+
+    async def run_forever(self, initial_backoff: float = 0.5, max_backoff: float = 30.0):
+        """Keeps the connection open, reconnecting with jittered exponential backoff.
+
+        Active subscriptions are replayed on every reconnect. Call stop() to exit.
+
+        Args:
+            initial_backoff (float): Seconds to wait before the first reconnect attempt.
+            max_backoff (float): Upper bound on the wait between attempts. A connection that
+                stayed up longer than this resets the backoff.
+        """
+        self.running = True
+        self.loop = asyncio.get_running_loop()
+        backoff = initial_backoff
+        while self.running:
+            started = time.monotonic()
+            try:
+                await self.connect()
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                await self.on_error(e)
+            if not self.running:
+                break
+            if time.monotonic() - started > max_backoff:
+                backoff = initial_backoff
+            delay = backoff * random.uniform(0.5, 1.0)
+            print(f"WebSocket reconnecting in {delay:.2f}s...")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, max_backoff)
+
+    async def stop(self):
+        """Stops run_forever() and closes the socket."""
+        self.running = False
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def send_command(self, cmd: str, params: Dict[str, Any]) -> int:
+        """Sends a command on the socket and returns its message id."""
+        message_id = self.message_id
+        self.message_id += 1
+        await self.ws.send(json.dumps({"id": message_id, "cmd": cmd, "params": params}))
+        return message_id
+
+    async def subscribe(self, channel: str, market_tickers: Optional[Iterable[str]] = None):
+        """Adds markets (or, with None, every market) on a channel. Kept across reconnects."""
+        await self.subscriptions.add(channel, market_tickers)
+
+    async def unsubscribe(self, channel: str, market_tickers: Optional[Iterable[str]] = None):
+        """Removes markets (or, with None, the whole channel) from the active subscriptions."""
+        await self.subscriptions.remove(channel, market_tickers)
+
+    def on(
+        self,
+        channel: Optional[str],
+        callback,
+        ticker: Optional[str] = None,
+        policy: str = DROP_OLDEST,
+        maxsize: int = 1024,
+    ):
+        """Registers a callback for messages on a channel and/or market ticker.
+
+        See Dispatcher.register for the backpressure policies.
+        """
+        return self.dispatcher.register(callback, channel, ticker, policy, maxsize)
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedules a coroutine (e.g. subscribe(...)) on the loop run_forever() runs on, from any thread."""
+        if self.loop is None:
+            raise RuntimeError("WebSocket client is not running")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def start_background(self) -> threading.Thread:
+        """Runs run_forever() on its own event loop in a daemon thread.
+
+        Lets synchronous strategy loops read state maintained by the socket
+        (e.g. local order books) without running asyncio themselves.
+        """
+        thread = threading.Thread(target=lambda: asyncio.run(self.run_forever()), daemon=True)
+        thread.start()
+        return thread
 
     async def on_open(self):
         """Callback when WebSocket connection is opened."""
         print("WebSocket connection opened.")
-        await self.subscribe_to_tickers()
+        if not self.subscriptions and not self._opened:
+            # Nothing requested before the first connect: default to tickers for every market
+            self.subscriptions.want("ticker")
+        self._opened = True
+        # Always through the manager, so it is marked connected and tracks the sids
+        await self.subscriptions.replay()
 
     async def subscribe_to_tickers(self):
         """Subscribe to ticker updates for all markets."""
-        subscription_message = {
-            "id": self.message_id,
-            "cmd": "subscribe",
-            "params": {
-                "channels": ["ticker"]
-            }
-        }
-        await self.ws.send(json.dumps(subscription_message))
-        self.message_id += 1
+        await self.subscriptions.add("ticker")
 
     async def handler(self):
         """Handle incoming messages."""
@@ -394,7 +1007,9 @@ class KalshiWebSocketClient(KalshiBaseClient):
 
     async def on_message(self, message):
         """Callback for handling incoming messages."""
-        print("Received message:", message)
+        t0 = METRICS.clock()
+        await self.dispatcher.dispatch(message)
+        METRICS.observe("ws_dispatch", t0)
 
     async def on_error(self, error):
         """Callback for handling errors."""
@@ -24,69 +24,72 @@ def should_trade(orderbook):
     return (best_yes + best_no) <= 95
 
 
-def trade_strategy(client):
-    """Loops through markets and places trades when conditions are met."""
-    cursor = "0"
+def trade_strategy(client, screener=None):
+    """Loops through markets and places trades when conditions are met.
+
+    With a MarketScreener, only the markets its volume index returns are
+    visited instead of streaming and checking every market.
+    """
     limit = 1000
-    
-    while cursor != None:
-        if cursor != 0:
-            markets = client.get_markets(cursor)
+
+    if screener is not None:
+        markets = (screener.get(ticker) for ticker in screener.query(volume=(1001, None)))
+    else:
+        markets = client.iter_markets(limit=limit)  # Stream active markets page by page
+
+    for market in markets:
+        time.sleep(0.1)
+        ticker = market['ticker']
+        print(f"Checking market: {ticker}")
+        depth = 1
+        if int(market['volume']) > 1000:
+            orderbook = client.GetMarketOrderbook(ticker, depth)
         else:
-            markets = client.get_markets()
-        for market in markets:  # Fetch active markets
-            time.sleep(0.1)
-            ticker = market['ticker']
-            print(f"Checking market: {ticker}")
-            depth = 1
-            if int(market['volume']) > 1000:
-                orderbook = client.GetMarketOrderbook(ticker, depth)
-            else:
-                continue
-            print(orderbook)
-            best_prices = get_best_prices(orderbook)
-            print(best_prices)
-            if should_trade(orderbook):
-                print("Should Trade")
-                best_yes, best_no = get_best_prices(orderbook)
-
-                # Buy at the best price available
-                client_order_id = f"order_{int(time.time())}"
-
-                response = client.PostOrder(
-                    action = 'buy',
-                    client_order_id = client_order_id,
-                    count = 1,
-                    side = 'yes',
-                    ticker = ticker,
-                    type = 'limit',
-                    yes_price = best_yes + 5
-                )
-
-                print("Yes Order Made")
-                print(response)
-                time.sleep(1)
-
-                client_order_id = f"order_{int(time.time())}"
-
-                response = client.PostLimitOrder(
-                    action = 'buy',
-                    client_order_id = client_order_id,
-                    count = 1,
-                    side = 'no',
-                    ticker = ticker,
-                    type = 'limit',
-                    no_price = best_no + 5
-                )
-
-                print("No Order Made")
-                print(response)
-                time.sleep(1)
-
-
-                balance = client.get_balance()
-                print(balance)
-                    
+            continue
+        print(orderbook)
+        best_prices = get_best_prices(orderbook)
+        print(best_prices)
+        if should_trade(orderbook):
+            print("Should Trade")
+            best_yes, best_no = get_best_prices(orderbook)
+
+            # Buy at the best price available
+            client_order_id = f"order_{int(time.time())}"
+
+            response = client.PostOrder(
+                action = 'buy',
+                client_order_id = client_order_id,
+                count = 1,
+                side = 'yes',
+                ticker = ticker,
+                type = 'limit',
+                yes_price = best_yes + 5
+            )
+
+            print("Yes Order Made")
+            print(response)
+            time.sleep(1)
+
+            client_order_id = f"order_{int(time.time())}"
+
+            response = client.PostLimitOrder(
+                action = 'buy',
+                client_order_id = client_order_id,
+                count = 1,
+                side = 'no',
+                ticker = ticker,
+                type = 'limit',
+                no_price = best_no + 5
+            )
+
+            print("No Order Made")
+            print(response)
+            time.sleep(1)
+
+
+            balance = client.get_balance()
+            print(balance)
+                
 
 
     return 0
@@ -0,0 +1,246 @@
+import asyncio
+import inspect
+import json
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    loads = json.loads
+
+# Backpressure policies for a consumer queue
+INLINE = "inline"            # run the callback in the receive loop, no queue
+DROP_OLDEST = "drop_oldest"  # when full, discard the oldest queued message
+COALESCE = "coalesce"        # keep only the latest message per (channel, ticker)
+
+# Message types whose channel name differs from the type
+CHANNEL_OF_TYPE = {
+    "orderbook_snapshot": "orderbook_delta",
+}
+
+
+def message_channel(message: Dict[str, Any]) -> Optional[str]:
+    """The subscription channel a decoded message belongs to."""
+    msg_type = message.get("type")
+    return CHANNEL_OF_TYPE.get(msg_type, msg_type)
+
+
+def message_ticker(message: Dict[str, Any]) -> Optional[str]:
+    """The market ticker a decoded message refers to, if any."""
+    body = message.get("msg")
+    if isinstance(body, dict):
+        return body.get("market_ticker")
+    return None
+
+
+class DispatchStats:
+    """Counters for frames seen by a Dispatcher or a single Consumer."""
+    __slots__ = ("received", "delivered", "dropped", "coalesced", "errors")
+
+    def __init__(self):
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"DispatchStats({self.as_dict()})"
+
+
+class Consumer:
+    """A registered callback and the bounded queue in front of it."""
+    def __init__(
+        self,
+        callback: Callable[[Dict[str, Any]], Any],
+        channel: Optional[str] = None,
+        ticker: Optional[str] = None,
+        policy: str = DROP_OLDEST,
+        maxsize: int = 1024,
+    ):
+        if policy not in (INLINE, DROP_OLDEST, COALESCE):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.callback = callback
+        self.is_async = inspect.iscoroutinefunction(callback)
+        self.channel = channel
+        self.ticker = ticker
+        self.policy = policy
+        self.maxsize = maxsize
+        self.stats = DispatchStats()
+        self._queue: deque = deque()
+        self._latest: "OrderedDict[Tuple[Optional[str], Optional[str]], Dict[str, Any]]" = OrderedDict()
+        self._ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._latest) if self.policy == COALESCE else len(self._queue)
+
+    def put(self, message: Dict[str, Any], channel: Optional[str], ticker: Optional[str]) -> None:
+        """Queues a message, applying the backpressure policy when full."""
+        self.stats.received += 1
+        if self.policy == COALESCE:
+            key = (channel, ticker)
+            if key in self._latest:
+                self._latest[key] = message
+                self.stats.coalesced += 1
+            else:
+                if len(self._latest) >= self.maxsize:
+                    self._latest.popitem(last=False)
+                    self.stats.dropped += 1
+                self._latest[key] = message
+        else:
+            if len(self._queue) >= self.maxsize:
+                self._queue.popleft()
+                self.stats.dropped += 1
+            self._queue.append(message)
+        if self._ready is not None:
+            self._ready.set()
+
+    def _pop(self) -> Optional[Dict[str, Any]]:
+        if self.policy == COALESCE:
+            return self._latest.popitem(last=False)[1] if self._latest else None
+        return self._queue.popleft() if self._queue else None
+
+    async def call(self, message: Dict[str, Any]) -> None:
+        try:
+            result = self.callback(message)
+            if self.is_async or inspect.isawaitable(result):
+                await result
+            self.stats.delivered += 1
+        except Exception as e:
+            self.stats.errors += 1
+            print(f"Error in WebSocket consumer {self.callback!r}: {e}")
+
+    async def run(self) -> None:
+        """Drains the queue into the callback until cancelled."""
+        while True:
+            message = self._pop()
+            if message is None:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            await self.call(message)
+
+    def start(self) -> None:
+        if self.policy != INLINE and self._task is None:
+            self._ready = asyncio.Event()
+            if len(self):
+                self._ready.set()
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._ready = None
+
+
+class Dispatcher:
+    """Decodes each WebSocket frame once and routes it to registered consumers.
+
+    Consumers subscribe by channel and/or market ticker; None matches
+    anything. Queued consumers run as their own tasks, so a slow callback
+    only fills its own queue and never stalls the socket.
+    """
+    def __init__(self):
+        self.stats = DispatchStats()
+        self.consumers: List[Consumer] = []
+        self._routes: Dict[Tuple[Optional[str], Optional[str]], List[Consumer]] = {}
+        self._running = False
+
+    def register(
+        self,
+        callback: Callable[[Dict[str, Any]], Any],
+        channel: Optional[str] = None,
+        ticker: Optional[str] = None,
+        policy: str = DROP_OLDEST,
+        maxsize: int = 1024,
+    ) -> Consumer:
+        """Routes messages for a channel and/or market ticker to a callback.
+
+        Args:
+            callback: Called with the decoded message. May be a coroutine function.
+            channel (Optional[str]): Channel name (e.g. 'ticker', 'orderbook_delta', 'fill'). None for all.
+            ticker (Optional[str]): Market ticker. None for all markets.
+            policy (str): INLINE, DROP_OLDEST or COALESCE.
+            maxsize (int): Queue bound (number of messages, or of distinct tickers for COALESCE).
+
+        Returns:
+            Consumer: Handle exposing per-consumer stats; pass to unregister() to remove.
+        """
+        consumer = Consumer(callback, channel, ticker, policy, maxsize)
+        self.consumers.append(consumer)
+        self._routes.setdefault((channel, ticker), []).append(consumer)
+        if self._running:
+            consumer.start()
+        return consumer
+
+    def unregister(self, consumer: Consumer) -> None:
+        """Stops routing messages to a consumer."""
+        self.consumers.remove(consumer)
+        self._routes[(consumer.channel, consumer.ticker)].remove(consumer)
+        if consumer._task is not None:
+            consumer._task.cancel()
+
+    def start(self) -> None:
+        """Starts consumer tasks on the running event loop."""
+        self._running = True
+        for consumer in self.consumers:
+            consumer.start()
+
+    async def stop(self) -> None:
+        """Cancels consumer tasks. Queued messages are kept for the next start()."""
+        self._running = False
+        for consumer in self.consumers:
+            await consumer.stop()
+
+    async def dispatch(self, raw) -> Optional[Dict[str, Any]]:
+        """Decodes a raw frame and hands it to every matching consumer.
+
+        Returns:
+            Optional[Dict[str, Any]]: The decoded message, or None if it could not be decoded.
+        """
+        self.stats.received += 1
+        try:
+            message = loads(raw)
+        except ValueError:
+            self.stats.errors += 1
+            return None
+        channel = message_channel(message)
+        ticker = message_ticker(message)
+        if ticker is None:
+            keys = ((channel, None), (None, None)) if channel is not None else ((None, None),)
+        elif channel is None:
+            keys = ((None, ticker), (None, None))
+        else:
+            keys = ((channel, ticker), (channel, None), (None, ticker), (None, None))
+        routes = self._routes
+        for key in keys:
+            consumers = routes.get(key)
+            if not consumers:
+                continue
+            for consumer in consumers:
+                if consumer.policy == INLINE:
+                    consumer.stats.received += 1
+                    await consumer.call(message)
+                else:
+                    consumer.put(message, channel, ticker)
+                self.stats.delivered += 1
+        return message
+
+    def counters(self) -> Dict[str, int]:
+        """Totals across the dispatcher and all of its consumers."""
+        totals = self.stats.as_dict()
+        totals["dropped"] = sum(consumer.stats.dropped for consumer in self.consumers)
+        totals["coalesced"] = sum(consumer.stats.coalesced for consumer in self.consumers)
+        totals["errors"] += sum(consumer.stats.errors for consumer in self.consumers)
+        return totals
@@ -1,6 +1,11 @@
+import asyncio
 import time
 import math
-from clients import KalshiBaseClient, KalshiHttpClient
+import uuid
+from clients import KalshiBaseClient, KalshiHttpClient, KalshiWebSocketClient
+from dispatch import INLINE
+from orderbook import OrderBookWebSocketClient
+from scheduler import Scheduler
 
 def get_best_prices(orderbook):
     """Returns the best (lowest) YES and NO prices from the order book."""
@@ -13,72 +18,194 @@ def get_best_prices(orderbook):
 
     return best_yes, best_no
 
-def get_net_position(client, ticker):
-    """Returns the net position of YES - NO contracts for a specific ticker.""" 
-    positions = client.GetPositions()
+def get_net_position(client, ticker, ledger=None):
+    """Returns the net position of YES - NO contracts for a specific ticker.
 
-    if not positions or "event_positions" not in positions:
-        return 0  
+    Reads the in-memory PositionLedger when one is given; otherwise asks
+    GetPositions for just this market.
+    """
+    if ledger is not None:
+        return ledger.position(ticker)
 
-    for market in positions["market_positions"]:
+    positions = client.GetPositions(ticker=ticker)
+    for market in positions.get("market_positions", []):
         if market["ticker"] == ticker:
-            return market["position"]  
-    
-    return 0  
-
-def dynamic_liquidity_provision(client, ticker):
+            return market["position"]
+
+    return 0
+
+def get_orderbook(client, ticker, books=None):
+    """Returns the top of book for a ticker, from the local order books when available."""
+    if books is not None:
+        book = books.book(ticker)
+        if book is not None:
+            return book.as_orderbook(depth=1)
+    return client.GetMarketOrderbook(ticker, 1)
+
+def liquidity_orders(ticker, market, net_position, order_size=1, expiration_seconds=30):
+    """
+    Decides which orders to place on one market this iteration.
+
+    Parameters:
+    ticker (str): The market to quote.
+    market (dict): Top of book in GetMarketOrderbook format.
+    net_position (int): Current YES - NO position.
+    order_size (int): Contracts per order.
+    expiration_seconds (int): How long the orders rest before the exchange expires them.
+
+    Returns:
+    tuple: (list of PostOrder keyword dicts, message describing the decision).
+    """
+    if not market:
+        return [], "Market data unavailable. Skipping iteration."
+    best_bid_yes, best_bid_no = get_best_prices(market)
+    if best_bid_yes is None or best_bid_no is None:
+        return [], "No valid bid prices. Skipping iteration."
+
+    sum_prices = best_bid_yes + best_bid_no
+    spread = 100 - sum_prices
+    if spread < 5 and net_position == 0:
+        return [], f"Spread {spread} too tight. Skipping iteration."
+
+    premium = math.floor(spread/2) - 1
+    expiration_ts = int(time.time()) + expiration_seconds
+
+    def order(side, price):
+        return dict(ticker=ticker, client_order_id=str(uuid.uuid4()), action="buy", type='limit', side=side,
+                    count=order_size, expiration_ts=expiration_ts, **{f"{side}_price": price})
+
+    if net_position == 0 and sum_prices < 97:
+        return [order('yes', best_bid_yes + premium), order('no', best_bid_no + premium)], \
+            f"Spread {spread}, neutral position. Placing balanced orders."
+    if net_position > 0:
+        return [order('no', best_bid_no + premium)], f"Spread {spread}, more YES contracts than NO. Selling to balance."
+    if net_position < 0:
+        return [order('yes', best_bid_yes + premium)], f"Spread {spread}, more NO contracts than YES. Buying to balance."
+    return [], f"Spread {spread}, nothing to do."
+
+def dynamic_liquidity_provision(client, ticker, books=None, ledger=None):
+    """
+    Provides liquidity on both sides of a single market.
+
+    Parameters:
+    client (KalshiHttpClient): The Kalshi client to interact with the exchange.
+    ticker (str): The market to quote.
+    books (OrderBookEngine): Local order books kept up to date over WebSocket. Falls back to
+        a REST orderbook request when omitted or when the book has not synced yet.
+    ledger (PositionLedger): Positions kept up to date from fills. Falls back to a REST
+        GetPositions request every iteration when omitted.
+    """
+    sleep = 30
     while True:
         # Step 1: Check current position
-        net_position = get_net_position(client, ticker)
+        net_position = get_net_position(client, ticker, ledger)
         print(f"Current net position: {net_position}")
 
         # Step 2: Get market order book
-        market = client.GetMarketOrderbook(ticker, 1)
+        market = get_orderbook(client, ticker, books)
         print(market)
-        best_bid_yes, best_bid_no = get_best_prices(market)
-        sum_prices = best_bid_yes + best_bid_no
-        spread = 100 - sum_prices
-        order_size = 1
-
-        sleep = 30
-
-        print("Spread:" + str(spread))
-        if not market:
-            print("Market data unavailable. Skipping iteration.")
-            time.sleep(sleep)
-            continue  
-
-        if best_bid_yes is None or best_bid_no is None:
-            print("No valid bid prices. Skipping iteration.")
-            time.sleep(sleep)
-            continue
-
-        if spread < 5 and net_position == 0:
-            print("Spread too tight. Skipping iteration.")
-            time.sleep(sleep)
-            continue
-
-
-        premium = math.floor(spread/2) - 1
 
         # Step 3: Make trading decisions based on position
-        if net_position == 0 and sum_prices < 97:
-            print("Neutral position. Placing balanced orders.")
-            client_order_id = f"order_{int(time.time())}"
-            client.PostOrder(ticker=ticker, client_order_id=client_order_id, action="buy", type='limit', side='yes', yes_price=best_bid_yes + premium, count=order_size, expiration_ts=sleep)
-            client_order_id = f"order_{int(time.time())}"
-            client.PostOrder(ticker=ticker, client_order_id=client_order_id, action="buy", type='limit', side='no', no_price=best_bid_no + premium, count=order_size, expiration_ts=sleep)
-
-        elif net_position > 0:
-            print("More YES contracts than NO. Selling to balance.")
-            client_order_id = f"order_{int(time.time())}"
-            client.PostOrder(ticker=ticker, client_order_id=client_order_id, action="buy", type='limit', side='no', no_price=best_bid_no + premium, count=order_size, expiration_ts=sleep)
-
-        elif net_position < 0:
-            print("More NO contracts than YES. Buying to balance.")
-            client_order_id = f"order_{int(time.time())}"
-            client.PostOrder(ticker=ticker, client_order_id=client_order_id, action="buy", type='limit', side='yes', yes_price=best_bid_yes + premium, count=order_size, expiration_ts=sleep)
-
-        # Step 4: Wait 5 seconds before restarting loop
+        orders, decision = liquidity_orders(ticker, market, net_position, expiration_seconds=sleep)
+        print(decision)
+        for order in orders:
+            client.PostOrder(**order)
+
+        # Step 4: Wait before restarting loop
         time.sleep(sleep)
 
+async def liquidity_step(client, ticker, books=None, ledger=None, order_size=1, period=30):
+    """
+    One iteration of dynamic_liquidity_provision on the asyncio client, for use with Scheduler.
+
+    Parameters:
+    client (AsyncKalshiHttpClient): Shared async client.
+    ticker (str): The market to quote.
+    books (OrderBookEngine): Shared local order books; REST is used until a market's book syncs.
+    ledger (PositionLedger): Shared positions; REST is used when omitted.
+    order_size (int): Contracts per order.
+    period (int): Seconds until the next iteration, also the orders' time to live.
+    """
+    if ledger is not None:
+        net_position = ledger.position(ticker)
+    else:
+        positions = await client.GetPositions(ticker=ticker)
+        net_position = next((market["position"] for market in positions.get("market_positions", [])
+                             if market["ticker"] == ticker), 0)
+
+    book = books.book(ticker) if books is not None else None
+    market = book.as_orderbook(depth=1) if book is not None else await client.GetMarketOrderbook(ticker, 1)
+
+    orders, decision = liquidity_orders(ticker, market, net_position, order_size, expiration_seconds=period)
+    print(f"{ticker}: position {net_position}. {decision}")
+    for result in await client.post_orders(orders):
+        if isinstance(result, Exception):
+            print(f"{ticker}: order failed: {result}")
+
+async def run_liquidity_markets(client, tickers, ledger=None, period=30, deadline=None, max_concurrency=8,
+                                order_size=1, priorities=None, scheduler=None, books=None):
+    """
+    Runs dynamic liquidity provision on many markets in one process.
+
+    Every market is a cooperative task on one Scheduler. All of them share
+    `client` (and so its connection pool and rate limiter) and one
+    WebSocket that keeps the order books and, through ticker updates, each
+    market's priority: the busiest markets by volume are serviced first
+    when several are due, and markets that cannot start within `deadline`
+    seconds of falling due skip that cycle.
+
+    With `books` (e.g. a MarketDataBus attached in a worker process) no
+    market data is subscribed at all; the socket is only opened for the
+    ledger's fills, and priorities stay as given.
+
+    Parameters:
+    client (AsyncKalshiHttpClient): Shared async client.
+    tickers (list): Markets to provide liquidity on.
+    ledger (PositionLedger): Positions shared by all markets. Fills from the shared socket are applied to it.
+    period (int): Seconds between iterations per market.
+    deadline (float): Seconds after falling due by which an iteration must start (default: half the period).
+    max_concurrency (int): Markets serviced at the same time.
+    order_size (int): Contracts per order.
+    priorities (dict): Starting priority per ticker, e.g. 24h volume. Updated from ticker messages.
+    scheduler (Scheduler): Scheduler to use, e.g. to stop() it from elsewhere.
+    books: Order books to read instead of subscribing to them; anything with book(ticker).
+    """
+    tickers = list(tickers)
+    scheduler = scheduler or Scheduler(max_concurrency)
+    stream = None
+    if books is None:
+        stream = OrderBookWebSocketClient(
+            client.key_id, client.private_key, tickers, client.environment,
+            signer=client.signer, base_url=client.HTTP_BASE_URL,
+        )
+        stream.subscriptions.want("ticker", tickers)
+        books = stream.books
+
+        def on_ticker(message):
+            update = message.get("msg", {})
+            if "volume" in update:
+                scheduler.set_priority(update.get("market_ticker"), update["volume"])
+
+        stream.on("ticker", on_ticker, policy=INLINE)
+    elif ledger is not None:
+        stream = KalshiWebSocketClient(
+            client.key_id, client.private_key, client.environment,
+            signer=client.signer, base_url=client.HTTP_BASE_URL,
+        )
+    if ledger is not None:
+        ledger.attach(stream)
+
+    deadline = period / 2 if deadline is None else deadline
+    for i, ticker in enumerate(tickers):
+        step = lambda ticker=ticker: liquidity_step(client, ticker, books, ledger, order_size, period)
+        # Spread first runs over the period so requests do not all land in the same second
+        scheduler.add(ticker, step, period, (priorities or {}).get(ticker, 0), deadline,
+                      delay=period * i / len(tickers))
+
+    stream_task = asyncio.ensure_future(stream.run_forever()) if stream is not None else None
+    try:
+        await scheduler.run()
+    finally:
+        if stream is not None:
+            await stream.stop()
+            stream_task.cancel()
@@ -0,0 +1,234 @@
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from pricing import HOURS_PER_YEAR, binary_option_prices
+
+MIN_IV_PERCENT = 1.0
+MAX_IV_PERCENT = 500.0
+
+
+def implied_vols(S0, K, T_hours, prices, r=0.0, iterations=40):
+    """
+    Backs out implied volatilities for a ladder of binary calls in one vectorized pass.
+
+    A binary call's price is not monotonic in volatility: in the money it
+    falls as vol rises, out of the money it rises up to a peak and then
+    falls. Bisection runs on the monotonic branch that starts at zero vol
+    (the whole range in the money, up to the peak out of the money), so
+    every strike gets the single economically sensible root.
+
+    Parameters:
+    S0 (float): Current Bitcoin price.
+    K (array): Strike prices.
+    T_hours (array): Time to expiry in hours.
+    prices (array): Observed probabilities (0-1), e.g. mid of yes bid/ask.
+    r (float): Risk-free rate.
+    iterations (int): Bisection steps; 40 bracket the root to under 1e-9 vol points.
+
+    Returns:
+    np.ndarray: Implied vol in percent per strike, NaN where no vol reproduces the price.
+    """
+    S0, K, T_hours, prices = np.broadcast_arrays(
+        np.asarray(S0, dtype=np.float64),
+        np.asarray(K, dtype=np.float64),
+        np.asarray(T_hours, dtype=np.float64),
+        np.asarray(prices, dtype=np.float64),
+    )
+    T = T_hours / HOURS_PER_YEAR
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m = np.log(S0 / K) + r * T
+        # Out of the money the price peaks at sigma* = sqrt(-2m / T)
+        peak = np.where(m < 0, np.sqrt(-2 * m / T) * 100, MAX_IV_PERCENT)
+    hi = np.minimum(peak, MAX_IV_PERCENT)
+    lo = np.full_like(hi, MIN_IV_PERCENT)
+    increasing = m < 0
+
+    p_lo = binary_option_prices(S0, K, T_hours, lo, r).price
+    p_hi = binary_option_prices(S0, K, T_hours, hi, r).price
+    attainable = (T > 0) & np.isfinite(prices) & (
+        np.where(increasing, (prices >= p_lo) & (prices <= p_hi), (prices <= p_lo) & (prices >= p_hi))
+    )
+
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        p_mid = binary_option_prices(S0, K, T_hours, mid, r).price
+        # Move the bound on the side of the root that mid is not on
+        go_up = np.where(increasing, p_mid < prices, p_mid > prices)
+        lo = np.where(go_up, mid, lo)
+        hi = np.where(go_up, hi, mid)
+    return np.where(attainable, 0.5 * (lo + hi), np.nan)
+
+
+def fit_smile(log_moneyness, vols, weights=None, degree=2):
+    """
+    Weighted least-squares polynomial smile in log-moneyness.
+
+    Falls back to a lower degree when there are too few points (a flat smile
+    from one point). Returns None when there are no points.
+
+    Returns:
+    np.ndarray: Polynomial coefficients, highest power first (np.polyval order).
+    """
+    ok = np.isfinite(log_moneyness) & np.isfinite(vols)
+    if weights is not None:
+        ok &= np.isfinite(weights) & (weights > 0)
+    x, y = log_moneyness[ok], vols[ok]
+    if not len(x):
+        return None
+    w = weights[ok] if weights is not None else None
+    degree = min(degree, len(x) - 1)
+    if degree == 0:
+        mean = np.average(y, weights=w)
+        return np.array([mean])
+    return np.polyfit(x, y, degree, w=np.sqrt(w) if w is not None else None)
+
+
+class IVSurface:
+    """
+    Implied-volatility surface fitted to the live KXBTCD yes bid/ask ladder.
+
+    Quotes are pushed in with update_quote() as books change; that only
+    marks their expiry dirty. refit() backs out vols for dirty expiries
+    (every expiry after a BTC move beyond `spot_tolerance`). It then fits a
+    quadratic smile in log-moneyness per expiry. Each market is weighted by
+    how precisely its bid/ask pins down a vol (vega over spread).
+
+    The fitted vol of every market is cached, so vol() is a dict lookup
+    and vol_at() evaluates one polynomial.
+    """
+    def __init__(self, default_IV_percent: float = 52.0, max_spread: int = 10, min_price: float = 0.05,
+                 degree: int = 2, spot_tolerance: float = 0.0005):
+        """
+        Parameters:
+        default_IV_percent (float): Vol reported where nothing could be fitted.
+        max_spread (int): Markets wider than this many cents are ignored.
+        min_price (float): Markets whose mid is within this of 0 or 1 are ignored; a cent tick
+            there is too coarse to say anything about vol.
+        degree (int): Polynomial degree of each smile.
+        spot_tolerance (float): Relative BTC move after which every expiry is refit.
+        """
+        self.default_IV_percent = default_IV_percent
+        self.max_spread = max_spread
+        self.min_price = min_price
+        self.degree = degree
+        self.spot_tolerance = spot_tolerance
+        self.markets: Dict[str, Tuple[float, float]] = {}   # ticker -> (strike, expiry_ts)
+        self.by_expiry: Dict[float, List[str]] = {}
+        self.quotes: Dict[str, Tuple[int, int]] = {}        # ticker -> (yes bid, yes ask) in cents
+        self.smiles: Dict[float, np.ndarray] = {}           # expiry_ts -> coefficients
+        self.vols: Dict[str, float] = {}                    # ticker -> fitted vol in percent
+        self.implied: Dict[str, float] = {}                 # ticker -> raw implied vol from its mid
+        self.weights: Dict[str, float] = {}                 # ticker -> weight of that vol in the fit
+        self.dirty = set()
+        self.fitted_spot: Optional[float] = None
+
+    def set_markets(self, tickers: Iterable[str], strikes: Iterable[float], expiry_ts: Iterable[float]) -> None:
+        """Registers the markets the surface covers (e.g. from a CatalogView)."""
+        markets = {}
+        for ticker, strike, expiry in zip(tickers, strikes, expiry_ts):
+            if np.isfinite(strike) and np.isfinite(expiry):
+                markets[ticker] = (float(strike), float(expiry))
+        for ticker in set(self.markets) - set(markets):
+            self.quotes.pop(ticker, None)
+            self.vols.pop(ticker, None)
+            self.implied.pop(ticker, None)
+            self.weights.pop(ticker, None)
+        self.markets = markets
+        self.by_expiry = {}
+        for ticker, (_, expiry) in markets.items():
+            self.by_expiry.setdefault(expiry, []).append(ticker)
+        for expiry in set(self.smiles) - set(self.by_expiry):
+            del self.smiles[expiry]
+        self.dirty = set(self.by_expiry)
+
+    def update_quote(self, ticker: str, yes_bid: Optional[int], yes_ask: Optional[int]) -> None:
+        """Records a market's current yes bid/ask. Only its expiry is refit."""
+        market = self.markets.get(ticker)
+        if market is None:
+            return
+        quote = (yes_bid or 0, yes_ask or 100)
+        if self.quotes.get(ticker) != quote:
+            self.quotes[ticker] = quote
+            self.dirty.add(market[1])
+
+    def refit(self, S0: float, now: Optional[float] = None) -> List[float]:
+        """
+        Refits the smiles that need it.
+
+        Returns:
+        list: Expiries whose smile changed.
+        """
+        now = time.time() if now is None else now
+        if self.fitted_spot is None or abs(S0 / self.fitted_spot - 1) > self.spot_tolerance:
+            self.dirty = set(self.by_expiry)
+            self.fitted_spot = S0
+        if not self.dirty:
+            return []
+
+        tickers, strikes, hours, mids, spreads = [], [], [], [], []
+        for expiry in self.dirty:
+            for ticker in self.by_expiry.get(expiry, ()):
+                self.implied.pop(ticker, None)
+                self.weights.pop(ticker, None)
+                bid, ask = self.quotes.get(ticker, (0, 100))
+                mid = (bid + ask) / 200
+                if bid <= 0 or ask >= 100 or ask <= bid or ask - bid > self.max_spread \
+                        or not self.min_price <= mid <= 1 - self.min_price:
+                    continue
+                tickers.append(ticker)
+                strikes.append(self.markets[ticker][0])
+                hours.append((expiry - now) / 3600)
+                mids.append(mid)
+                spreads.append(ask - bid)
+        if tickers:
+            implied = implied_vols(S0, strikes, hours, mids)
+            # A cent of price error moves the implied vol by 1 / vega points, so near-the-money
+            # strikes (vega ~ 0) and wide markets count for little in the fit
+            vega = binary_option_prices(S0, strikes, hours, np.nan_to_num(implied, nan=self.default_IV_percent)).vega
+            weights = (vega * 100 / np.asarray(spreads, dtype=np.float64)) ** 2
+            for ticker, vol, weight in zip(tickers, implied, weights):
+                if np.isfinite(vol):
+                    self.implied[ticker] = float(vol)
+                    self.weights[ticker] = float(weight)
+
+        changed = []
+        for expiry in self.dirty:
+            members = self.by_expiry.get(expiry, [])
+            if not members:
+                continue
+            k = np.log(np.array([self.markets[ticker][0] for ticker in members]) / S0)
+            vols = np.array([self.implied.get(ticker, np.nan) for ticker in members])
+            weights = np.array([self.weights.get(ticker, 0.0) for ticker in members])
+            coefficients = fit_smile(k, vols, weights, self.degree)
+            if coefficients is None:
+                self.smiles.pop(expiry, None)
+                fitted = np.full(len(members), self.default_IV_percent)
+            else:
+                self.smiles[expiry] = coefficients
+                # Hold the smile flat beyond the strikes that were actually quoted
+                quoted = k[np.isfinite(vols) & (weights > 0)]
+                fitted = np.clip(np.polyval(coefficients, np.clip(k, quoted.min(), quoted.max())),
+                                 MIN_IV_PERCENT, MAX_IV_PERCENT)
+            for ticker, vol in zip(members, fitted):
+                self.vols[ticker] = float(vol)
+            changed.append(expiry)
+        self.dirty.clear()
+        return changed
+
+    def vol(self, ticker: str) -> float:
+        """Fitted vol in percent for a market, O(1)."""
+        return self.vols.get(ticker, self.default_IV_percent)
+
+    def vol_at(self, expiry_ts: float, strike: float, S0: Optional[float] = None) -> float:
+        """Fitted vol in percent for any strike on an expiry's smile."""
+        coefficients = self.smiles.get(expiry_ts)
+        S0 = S0 if S0 is not None else self.fitted_spot
+        if coefficients is None or S0 is None:
+            return self.default_IV_percent
+        return float(np.clip(np.polyval(coefficients, np.log(strike / S0)), MIN_IV_PERCENT, MAX_IV_PERCENT))
+
+    def vols_for(self, tickers: Iterable[str]) -> np.ndarray:
+        """Fitted vols for a ladder of markets, e.g. a CatalogView's tickers."""
+        return np.array([self.vols.get(ticker, self.default_IV_percent) for ticker in tickers], dtype=np.float64)
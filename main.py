@@ -7,6 +7,7 @@ from demo_strategy import trade_strategy
 from ninetypercent import trade_ninetypercent
 from dynamic_liquidity import dynamic_liquidity_provision
 from bitcoinstrat import bitcoinstrat
+from ivsurface import IVSurface
 
 try:
     with open(KEYFILE, "rb") as key_file:
@@ -31,7 +32,8 @@ def run_trading_bot():
     
 
 
-    bitcoinstrat(client=client, IV_percent=52, spread=0.03, refresh_rate=10)
+    # Vols are implied from the KXBTCD ladder itself; 52% only covers strikes nothing could be fitted for
+    bitcoinstrat(client=client, IV_percent=52, spread=0.03, refresh_rate=10, iv_surface=IVSurface(default_IV_percent=52))
     
 
 
@@ -0,0 +1,536 @@
+"""Shared-memory market data bus.
+
+One publisher process holds the Kalshi WebSocket and the BTC price feed and
+writes every book update and price into a shared-memory block. Strategy
+processes attach to the block by name and read books and prices as NumPy
+views on it: no sockets, no requests and no copies of their own.
+
+    python marketbus.py publish --series KXBTCD             # one per account
+    python marketbus.py watch --shards 4 --shard 0          # peek at one shard
+
+Each market row is guarded by a sequence lock: the publisher makes the
+row's counter odd while it writes and even when done, and readers retry
+if the counter changed under them. Readers never block the publisher.
+
+Rows of expired markets are released and reused for new listings. The
+header's generation counter tells readers to rebuild their ticker index.
+"""
+import argparse
+import asyncio
+import threading
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from dispatch import INLINE
+from orderbook import NUM_LEVELS, SIDES, OrderBook, OrderBookWebSocketClient
+
+DEFAULT_NAME = "kalshi-market-bus"
+MAGIC = 0x4B424D42  # "KBMB"
+TICKER_BYTES = 64
+SIDE_INDEX = {side: i for i, side in enumerate(SIDES)}
+
+# Header words
+_MAGIC, _CAPACITY, _COUNT, _VERSION, _BTC_SEQ, _GENERATION = range(6)
+_HEADER_WORDS = 8
+# Per-market fields
+_VALID, _UPDATED_NS, _LAST_PRICE, _VOLUME, _OPEN_INTEREST = range(5)
+_FIELDS = 5
+
+
+def _layout(capacity: int) -> Tuple[int, Dict[str, Tuple[int, Tuple[int, ...], Any]]]:
+    """Byte offset, shape and dtype of every array in a bus of `capacity` markets."""
+    arrays = [
+        ("header", (_HEADER_WORDS,), np.int64),
+        ("btc", (2,), np.float64),               # price, monotonic publish time in s
+        ("seq", (capacity,), np.int64),
+        ("fields", (capacity, _FIELDS), np.int64),
+        ("best", (capacity, len(SIDES)), np.int64),
+        ("levels", (capacity, len(SIDES), NUM_LEVELS), np.int64),
+        ("tickers", (capacity,), f"S{TICKER_BYTES}"),
+    ]
+    offset, layout = 0, {}
+    for name, shape, dtype in arrays:
+        layout[name] = (offset, shape, dtype)
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset = (offset + 63) // 64 * 64  # keep every array cache-line aligned
+    return offset, layout
+
+
+def shard(tickers: Iterable[str], shards: int, index: int) -> List[str]:
+    """The tickers worker `index` of `shards` owns. Stable across processes and restarts."""
+    return [ticker for ticker in tickers if zlib.crc32(ticker.encode()) % shards == index]
+
+
+class SharedOrderBook:
+    """Read-only view of one market's book on the bus, with the OrderBook read API.
+
+    Every read works on the shared arrays directly and is retried if the
+    publisher was writing the row at the same time. Scalar reads go through
+    flat memoryviews, which are several times cheaper than NumPy indexing.
+    """
+    __slots__ = ("ticker", "bus", "row", "levels", "best", "_seq", "_best", "_fields")
+
+    def __init__(self, bus: "MarketDataBus", ticker: str, row: int):
+        self.ticker = ticker
+        self.bus = bus
+        self.row = row
+        self.levels = {side: bus.levels[row, i] for side, i in SIDE_INDEX.items()}
+        self.best = bus.best[row]
+        self._seq = bus.seq_words
+        self._best = bus.best_words
+        self._fields = bus.field_words
+
+    def _read(self, fn):
+        seq = self._seq
+        row = self.row
+        while True:
+            before = seq[row]
+            if before & 1:
+                continue
+            value = fn()
+            if seq[row] == before:
+                return value
+
+    @property
+    def seq(self) -> int:
+        return self._seq[self.row]
+
+    @property
+    def stale(self) -> bool:
+        return not self._fields[self.row * _FIELDS + _VALID]
+
+    def best_bid(self, side: str = "yes") -> Optional[int]:
+        return self._best[self.row * 2 + SIDE_INDEX[side]] or None
+
+    def best_ask(self, side: str = "yes") -> Optional[int]:
+        other = self._best[self.row * 2 + 1 - SIDE_INDEX[side]]
+        return 100 - other if other else None
+
+    def best_bid_ask(self) -> Tuple[Optional[int], Optional[int]]:
+        """(best YES bid, best YES ask) in cents, from one consistent version of the book."""
+        seq, best, row = self._seq, self._best, self.row
+        while True:
+            before = seq[row]
+            if before & 1:
+                continue
+            yes, no = best[2 * row], best[2 * row + 1]
+            if seq[row] == before:
+                return yes or None, 100 - no if no else None
+
+    def quantity(self, side: str, price: int) -> int:
+        return int(self.levels[side][price])
+
+    def depth(self, side: str, levels: int = 5) -> List[List[int]]:
+        return self._read(lambda: OrderBook.depth(self, side, levels))
+
+    def total_depth(self, side: str, min_price: int = 1) -> int:
+        return int(self.levels[side][min_price:].sum())
+
+    def as_orderbook(self, depth: Optional[int] = None) -> Dict[str, Any]:
+        return self._read(lambda: OrderBook.as_orderbook(self, depth))
+
+    def snapshot(self) -> OrderBook:
+        """A private copy of the book, for callers that need to hold it across many reads."""
+        def copy():
+            book = OrderBook(self.ticker)
+            book.levels = {side: array.copy() for side, array in self.levels.items()}
+            book.best = {side: int(self.best[i]) for side, i in SIDE_INDEX.items()}
+            book.stale = self.stale
+            return book
+        return self._read(copy)
+
+
+class MarketDataBus:
+    """Books, ticker fields and the BTC price for up to `capacity` markets in shared memory.
+
+    Use create() in the publisher and attach() in readers. A reader's
+    book(ticker) works like OrderBookEngine.book(), so a bus can be passed
+    anywhere a strategy takes `books`.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        header = np.ndarray((_HEADER_WORDS,), np.int64, shm.buf)
+        if header[_MAGIC] != MAGIC:
+            raise ValueError(f"shared memory block {shm.name!r} is not a market data bus")
+        self.capacity = int(header[_CAPACITY])
+        _, layout = _layout(self.capacity)
+        for name, (offset, shape, dtype) in layout.items():
+            setattr(self, name, np.ndarray(shape, dtype, shm.buf, offset))
+        # Flat int64 views of the arrays readers poll most
+        self.seq_words = self._words(layout["seq"])
+        self.best_words = self._words(layout["best"])
+        self.field_words = self._words(layout["fields"])
+        self.index: Dict[str, int] = {}
+        self._views: Dict[str, SharedOrderBook] = {}
+        self._lock = threading.Lock()
+        self._free: List[int] = []  # released rows, reused before the table grows
+        self._synced = 0  # rows scanned into the index
+        self._generation = 0  # header generation the index was built at
+
+    def _words(self, entry) -> memoryview:
+        offset, shape, _ = entry
+        return self.shm.buf[offset:offset + int(np.prod(shape)) * 8].cast("q")
+
+    @classmethod
+    def create(cls, name: str = DEFAULT_NAME, capacity: int = 4096, replace: bool = True) -> "MarketDataBus":
+        """
+        Allocates a new bus. Only the publisher should call this.
+
+        Args:
+            name (str): Shared memory name readers attach to.
+            capacity (int): Maximum number of markets.
+            replace (bool): Remove a leftover block with the same name (e.g. after a crash).
+        """
+        size, _ = _layout(capacity)
+        try:
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            if not replace:
+                raise
+            old = shared_memory.SharedMemory(name)
+            old.close()
+            old.unlink()
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        header = np.ndarray((_HEADER_WORDS,), np.int64, shm.buf)
+        header[:] = 0
+        header[_CAPACITY] = capacity
+        header[_MAGIC] = MAGIC
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str = DEFAULT_NAME) -> "MarketDataBus":
+        """Opens an existing bus for reading."""
+        shm = shared_memory.SharedMemory(name)
+        # Readers must not have the block removed when they exit; only the publisher owns it
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    def close(self) -> None:
+        """Detaches from the block; the publisher also removes it."""
+        self._views.clear()
+        for words in (self.seq_words, self.best_words, self.field_words):
+            words.release()
+        for name in _layout(1)[1]:
+            setattr(self, name, None)
+        self.shm.close()
+        if self.owner:
+            # Readers started as child processes share our resource tracker and may have
+            # dropped the block from it when they attached
+            resource_tracker.register(self.shm._name, "shared_memory")
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Publisher side
+
+    def slot(self, ticker: str) -> int:
+        """Row of a market, allocating one on first use."""
+        row = self.index.get(ticker)
+        if row is not None:
+            return row
+        with self._lock:
+            if self._free:
+                row = self._free.pop()
+                # Odd while a reused row's name changes, so readers rescan afterwards
+                self.header[_GENERATION] += 1
+                self.tickers[row] = ticker.encode()
+                self.header[_GENERATION] += 1
+                self.index[ticker] = row
+                return row
+            count = int(self.header[_COUNT])
+            if count >= self.capacity:
+                raise ValueError(f"market data bus is full ({self.capacity} markets)")
+            self.tickers[count] = ticker.encode()
+            self.index[ticker] = count
+            self.header[_COUNT] = count + 1  # publish the ticker only after its name is written
+        return count
+
+    def release(self, ticker: str) -> None:
+        """Clears a market's row and frees it for the next new market, e.g. once it expired."""
+        with self._lock:
+            row = self.index.pop(ticker, None)
+            if row is None:
+                return
+            self.seq[row] += 1
+            self.fields[row] = 0
+            self.best[row] = 0
+            self.levels[row] = 0
+            self.seq[row] += 1
+            self.header[_GENERATION] += 1
+            self.tickers[row] = b""
+            self.header[_GENERATION] += 1
+            self.header[_VERSION] += 1
+            self._free.append(row)
+
+    def write_book(self, ticker: str, book: OrderBook) -> None:
+        """Copies a local book into the market's row."""
+        row = self.slot(ticker)
+        seq = self.seq
+        seq[row] += 1
+        levels = self.levels[row]
+        for side, i in SIDE_INDEX.items():
+            levels[i] = book.levels[side]
+            self.best[row, i] = book.best[side]
+        self.fields[row, _VALID] = not book.stale
+        self.fields[row, _UPDATED_NS] = time.monotonic_ns()
+        seq[row] += 1
+        self.header[_VERSION] += 1
+
+    def invalidate(self, ticker: str) -> None:
+        """Marks a market's book stale, e.g. while it resyncs."""
+        row = self.index.get(ticker)
+        if row is not None:
+            self.seq[row] += 1
+            self.fields[row, _VALID] = 0
+            self.seq[row] += 1
+            self.header[_VERSION] += 1
+
+    def write_ticker(self, ticker: str, last_price: Optional[int] = None, volume: Optional[int] = None,
+                     open_interest: Optional[int] = None) -> None:
+        """Records fields from a 'ticker' channel update."""
+        row = self.slot(ticker)
+        self.seq[row] += 1
+        for field, value in ((_LAST_PRICE, last_price), (_VOLUME, volume), (_OPEN_INTEREST, open_interest)):
+            if value is not None:
+                self.fields[row, field] = value
+        self.seq[row] += 1
+
+    def write_btc(self, price: float) -> None:
+        self.header[_BTC_SEQ] += 1
+        self.btc[0] = price
+        self.btc[1] = time.monotonic()
+        self.header[_BTC_SEQ] += 1
+        self.header[_VERSION] += 1
+
+    # Reader side
+
+    @property
+    def version(self) -> int:
+        """Bumped on every book or price write; poll it to see if anything changed."""
+        return int(self.header[_VERSION])
+
+    def tickers_list(self) -> List[str]:
+        """Every market the publisher has written, in row order."""
+        self._sync_index()
+        return list(self.index)
+
+    def _sync_index(self) -> None:
+        header = self.header
+        generation = int(header[_GENERATION])
+        if generation == self._generation:
+            count = int(header[_COUNT])
+            for row in range(self._synced, count):
+                self.index[self.tickers[row].decode()] = row
+            self._synced = count
+            return
+        # Rows were released or reused: rescan every name, retrying if the publisher renamed one meanwhile
+        while True:
+            generation = int(header[_GENERATION])
+            if generation & 1:
+                continue
+            count = int(header[_COUNT])
+            names = self.tickers[:count].tolist()
+            if int(header[_GENERATION]) == generation:
+                break
+        self.index = {name.decode(): row for row, name in enumerate(names) if name}
+        self._views = {ticker: view for ticker, view in self._views.items() if self.index.get(ticker) == view.row}
+        self._synced = count
+        self._generation = generation
+
+    def row(self, ticker: str) -> Optional[int]:
+        if self.header[_GENERATION] != self._generation:
+            self._sync_index()
+        row = self.index.get(ticker)
+        if row is None:
+            self._sync_index()
+            row = self.index.get(ticker)
+        return row
+
+    def book(self, ticker: str) -> Optional[SharedOrderBook]:
+        """The market's book, or None if the publisher has no synced book for it."""
+        if self.header[_GENERATION] != self._generation:
+            self._sync_index()
+        view = self._views.get(ticker)
+        if view is None:
+            row = self.row(ticker)
+            if row is None:
+                return None
+            view = self._views[ticker] = SharedOrderBook(self, ticker, row)
+        return None if view.stale else view
+
+    def best_bid_ask(self, ticker: str) -> Tuple[Optional[int], Optional[int]]:
+        book = self.book(ticker)
+        return book.best_bid_ask() if book is not None else (None, None)
+
+    def market_fields(self, ticker: str) -> Dict[str, int]:
+        """last_price, volume and open_interest from the latest ticker update."""
+        row = self.row(ticker)
+        if row is None:
+            return {}
+        fields = self.fields[row]
+        return {"last_price": int(fields[_LAST_PRICE]), "volume": int(fields[_VOLUME]),
+                "open_interest": int(fields[_OPEN_INTEREST])}
+
+    def btc_latest(self) -> Tuple[float, float]:
+        """(BTC price, age in seconds), like BtcPriceFeed.latest(). Age is infinite before the first price."""
+        header = self.header
+        while True:
+            before = int(header[_BTC_SEQ])
+            if before & 1:
+                continue
+            price, published = float(self.btc[0]), float(self.btc[1])
+            if int(header[_BTC_SEQ]) == before:
+                break
+        if not before:
+            return float("nan"), float("inf")
+        return price, time.monotonic() - published
+
+
+class MarketDataPublisher:
+    """Feeds a MarketDataBus from one WebSocket and one BTC price feed.
+
+    Run exactly one per account; every strategy process then reads the bus
+    instead of opening its own connections.
+    """
+    def __init__(self, bus: MarketDataBus, book_client: OrderBookWebSocketClient, price_feed=None):
+        """
+        Args:
+            bus (MarketDataBus): Bus created with MarketDataBus.create().
+            book_client (OrderBookWebSocketClient): Socket subscribed to the markets to publish.
+            price_feed (BtcPriceFeed): Optional BTC feed whose combined price is published.
+        """
+        self.bus = bus
+        self.book_client = book_client
+        self.price_feed = price_feed
+        self.updates = 0
+        # Registered after the client's own handler, so the local book is already updated
+        book_client.on("orderbook_delta", self.on_book, policy=INLINE)
+        book_client.on("ticker", self.on_ticker, policy=INLINE)
+        if price_feed is not None:
+            price_feed.on_price(self.on_btc)
+
+    def _published(self, channel: str, ticker: Optional[str]) -> bool:
+        """Whether the socket still wants a market, so late updates cannot re-take a released row."""
+        if ticker is None:
+            return False
+        wanted = self.book_client.subscriptions.tickers(channel)
+        return wanted is None or ticker in wanted
+
+    def on_book(self, message: Dict[str, Any]) -> None:
+        ticker = message.get("msg", {}).get("market_ticker")
+        if not self._published("orderbook_delta", ticker):
+            return
+        book = self.book_client.books.books.get(ticker)
+        if book is None or book.stale:
+            self.bus.invalidate(ticker)
+        else:
+            self.bus.write_book(ticker, book)
+        self.updates += 1
+
+    def on_ticker(self, message: Dict[str, Any]) -> None:
+        update = message.get("msg", {})
+        if self._published("ticker", update.get("market_ticker")):
+            self.bus.write_ticker(update["market_ticker"], update.get("price"), update.get("volume"),
+                                  update.get("open_interest"))
+
+    def on_btc(self, source: str, price: float) -> None:
+        combined, age = self.price_feed.latest()
+        if age <= self.price_feed.max_age:
+            self.bus.write_btc(combined)
+
+    async def retire(self, tickers: Iterable[str]) -> None:
+        """Unsubscribes markets from both channels, then frees their rows on the bus."""
+        tickers = set(tickers)
+        await self.book_client.unsubscribe("orderbook_delta", tickers)
+        await self.book_client.unsubscribe("ticker", tickers)
+        for ticker in tickers:
+            self.bus.release(ticker)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-memory market data bus")
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish = commands.add_parser("publish", help="run the publisher")
+    publish.add_argument("--name", default=DEFAULT_NAME)
+    publish.add_argument("--capacity", type=int, default=4096)
+    publish.add_argument("--series", default="KXBTCD", help="series whose open markets are published")
+    publish.add_argument("--refresh", type=float, default=60.0, help="seconds between market catalog refreshes")
+    publish.add_argument("--no-btc", action="store_true", help="do not run the BTC price feed")
+    watch = commands.add_parser("watch", help="print a shard's top of book from an existing bus")
+    watch.add_argument("--name", default=DEFAULT_NAME)
+    watch.add_argument("--shards", type=int, default=1)
+    watch.add_argument("--shard", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "watch":
+        bus = MarketDataBus.attach(args.name)
+        try:
+            while True:
+                price, age = bus.btc_latest()
+                print(f"BTC {price:.2f} ({age:.1f}s old), bus version {bus.version}")
+                for ticker in shard(bus.tickers_list(), args.shards, args.shard):
+                    print(f"  {ticker}: {bus.best_bid_ask(ticker)} {bus.market_fields(ticker)}")
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            bus.close()
+        return
+
+    from cryptography.hazmat.primitives import serialization
+
+    from clients import KalshiHttpClient
+    from config import KEYFILE, KEYID, env
+    from marketdata import MarketCatalog
+    from pricefeed import BtcPriceFeed
+
+    with open(KEYFILE, "rb") as key_file:
+        private_key = serialization.load_pem_private_key(key_file.read(), password=None)
+    client = KalshiHttpClient(key_id=KEYID, private_key=private_key, environment=env)
+    catalog = MarketCatalog(client, series_ticker=args.series, quote_hours=0)  # only listings are needed
+    catalog.refresh()
+    tickers = set(catalog.expiring_within().tickers)
+
+    bus = MarketDataBus.create(args.name, args.capacity)
+    book_client = OrderBookWebSocketClient(KEYID, private_key, tickers, env, signer=client.signer)
+    book_client.subscriptions.want("ticker", tickers)
+    price_feed = None if args.no_btc else BtcPriceFeed()
+    publisher = MarketDataPublisher(bus, book_client, price_feed)
+    if price_feed is not None:
+        price_feed.start_background()
+    book_client.start_background()
+    print(f"Publishing {len(tickers)} {args.series} markets on shared memory {args.name!r}")
+    try:
+        while True:
+            time.sleep(args.refresh)
+            catalog.refresh()
+            live = set(catalog.expiring_within().tickers)
+            if live != tickers and book_client.loop is not None:
+                if live - tickers:
+                    book_client.submit(book_client.subscribe("orderbook_delta", live - tickers))
+                    book_client.submit(book_client.subscribe("ticker", live - tickers))
+                if tickers - live:
+                    book_client.submit(publisher.retire(tickers - live))
+                tickers = live
+            print(f"{len(tickers)} markets, {publisher.updates} book updates published")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if price_feed is not None:
+            price_feed.stop()
+        if book_client.loop is not None:
+            asyncio.run_coroutine_threadsafe(book_client.stop(), book_client.loop)
+        bus.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+
+def parse_timestamp(value: Optional[str]) -> float:
+    """Converts an ISO 8601 time string (e.g. '2025-02-15T05:00:00Z') to UNIX seconds."""
+    if not value:
+        return np.nan
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def series_of(market: Dict[str, Any]) -> str:
+    """Returns the series ticker (e.g. 'KXBTCD') a market belongs to."""
+    event_ticker = market.get("event_ticker") or market["ticker"]
+    return event_ticker.split("-")[0]
+
+
+class CatalogView(NamedTuple):
+    """A set of cataloged markets sorted by expiry, with metadata as parallel arrays."""
+    tickers: List[str]
+    markets: List[Dict[str, Any]]
+    strikes: np.ndarray    # floor_strike, NaN where the market has none
+    expiry_ts: np.ndarray  # expiration_time in UNIX seconds
+    close_ts: np.ndarray   # close_time in UNIX seconds
+
+    def hours_to_expiry(self, now: Optional[float] = None) -> np.ndarray:
+        """Time to expiry in hours for every market in the view, floored at 0."""
+        now = time.time() if now is None else now
+        return np.maximum((self.expiry_ts - now) / 3600, 0.0)
+
+
+class MarketCatalog:
+    """In-memory catalog of Kalshi markets keyed by ticker.
+
+    Expiry times and strikes are parsed once when a market is first seen and
+    kept in arrays sorted by expiry, so the strategy loop never re-parses
+    market JSON. Each refresh() asks the exchange for markets closing in the
+    next `quote_hours` (to keep their prices and volume current) plus any
+    part of the rolling window that has not been loaded yet, and drops
+    markets once they close. Markets beyond `quote_hours` keep the quote
+    fields (yes_bid, yes_ask, volume_24h, ...) of their last full reload.
+
+    Stored market dicts are the catalog's own copies; the parsed metadata is
+    kept alongside them, not written into them.
+    """
+    def __init__(
+        self,
+        client,
+        series_ticker: Optional[str] = None,
+        status: Optional[str] = "open",
+        horizon_hours: float = 48,
+        full_refresh_seconds: Optional[float] = 300,
+        page_limit: int = 1000,
+        quote_hours: Optional[float] = None,
+    ):
+        """
+        Args:
+            client (KalshiHttpClient): Client used to download markets.
+            series_ticker (Optional[str]): Only catalog this series (e.g. 'KXBTCD').
+            status (Optional[str]): Market status filter passed to get_markets.
+            horizon_hours (float): Only markets closing within this many hours are loaded.
+            full_refresh_seconds (Optional[float]): Reload the whole window this often to pick up
+                late listings and updated market fields. None disables full reloads.
+            page_limit (int): Page size for get_markets.
+            quote_hours (Optional[float]): Markets closing within this many hours are refetched
+                on every refresh so their quote fields stay current. None refetches the whole
+                window; 0 only refetches on full reloads.
+        """
+        self.client = client
+        self.series_ticker = series_ticker
+        self.status = status
+        self.horizon_seconds = horizon_hours * 3600
+        self.full_refresh_seconds = full_refresh_seconds
+        self.page_limit = page_limit
+        self.quote_seconds = quote_hours * 3600 if quote_hours is not None else None
+
+        self.markets: Dict[str, Dict[str, Any]] = {}
+        self.meta: Dict[str, Tuple[float, float, float]] = {}  # ticker -> (strike, expiry_ts, close_ts)
+        self.by_series: Dict[str, Set[str]] = {}
+        self.by_expiry: Dict[float, Set[str]] = {}
+        self._loaded_until = 0.0
+        self._last_full_refresh = 0.0
+        self._view = self._build_view([])
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.markets
+
+    def __getitem__(self, ticker: str) -> Dict[str, Any]:
+        return self.markets[ticker]
+
+    def fetch(self, min_close_ts: int, max_close_ts: int) -> List[Dict[str, Any]]:
+        """Downloads every market closing in [min_close_ts, max_close_ts], following cursors."""
+        markets = []
+        cursor = None
+        while True:
+            page = self.client.get_markets_page(
+                limit=self.page_limit,
+                cursor=cursor,
+                status=self.status,
+                series_ticker=self.series_ticker,
+                min_close_ts=min_close_ts,
+                max_close_ts=max_close_ts,
+            )
+            markets.extend(page.get("markets", []))
+            cursor = page.get("cursor")
+            if not cursor:
+                return markets
+
+    def refresh(self, now: Optional[float] = None) -> int:
+        """Brings the catalog up to date.
+
+        Returns:
+            int: Number of markets added or updated.
+        """
+        now = time.time() if now is None else now
+        self.expire(now)
+
+        window_end = now + self.horizon_seconds
+        full = (
+            self.full_refresh_seconds is not None
+            and now - self._last_full_refresh >= self.full_refresh_seconds
+        )
+        known = len(self.markets)
+        if full:
+            self._last_full_refresh = now
+            fetched = self.fetch(int(now), int(window_end))
+            for market in fetched:
+                self.add(market)
+            added = len(fetched)
+        else:
+            # Near markets for fresh quotes, then whatever part of the window is new
+            quote_end = window_end if self.quote_seconds is None else min(now + self.quote_seconds, window_end)
+            ranges = [(now, quote_end), (max(quote_end, self._loaded_until), window_end)]
+            added = 0
+            for start, end in ranges:
+                if end <= start:
+                    continue
+                for market in self.fetch(int(start), int(end)):
+                    self.update(market)
+                    added += 1
+        self._loaded_until = window_end
+        # Quote updates change the stored dicts in place; only new listings or reparsed ones need a new view
+        if full or len(self.markets) != known:
+            self._view = self._build_view(self.markets.values())
+        return added
+
+    def add(self, market: Dict[str, Any]) -> None:
+        """Adds or replaces a market, parsing its expiry and strike once."""
+        ticker = market["ticker"]
+        if ticker in self.markets:
+            self._unindex(ticker)
+        strike = market.get("floor_strike")
+        expiry_ts = parse_timestamp(market.get("expiration_time"))
+        close_ts = parse_timestamp(market.get("close_time") or market.get("expiration_time"))
+        self.markets[ticker] = dict(market)
+        self.meta[ticker] = (float(strike) if strike is not None else np.nan, expiry_ts, close_ts)
+        self.by_series.setdefault(series_of(market), set()).add(ticker)
+        self.by_expiry.setdefault(expiry_ts, set()).add(ticker)
+
+    def update(self, market: Dict[str, Any]) -> None:
+        """Refreshes the fields of a cataloged market without re-parsing its metadata; adds it if new."""
+        stored = self.markets.get(market["ticker"])
+        if stored is None:
+            self.add(market)
+        else:
+            stored.update(market)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drops markets that have closed. Returns the number removed."""
+        now = time.time() if now is None else now
+        closed = [ticker for ticker, (_, _, close_ts) in self.meta.items() if close_ts < now]
+        for ticker in closed:
+            self._unindex(ticker)
+            del self.markets[ticker]
+            del self.meta[ticker]
+        if closed:
+            self._view = self._build_view(self.markets.values())
+        return len(closed)
+
+    def _unindex(self, ticker: str) -> None:
+        market = self.markets[ticker]
+        for index, key in ((self.by_series, series_of(market)), (self.by_expiry, self.meta[ticker][1])):
+            tickers = index.get(key)
+            if tickers is not None:
+                tickers.discard(ticker)
+                if not tickers:
+                    del index[key]
+
+    def _build_view(self, markets) -> CatalogView:
+        ordered = sorted(markets, key=lambda market: self.meta[market["ticker"]][1])
+        meta = np.array([self.meta[market["ticker"]] for market in ordered], dtype=np.float64).reshape(-1, 3)
+        return CatalogView(
+            tickers=[market["ticker"] for market in ordered],
+            markets=ordered,
+            strikes=meta[:, 0].copy(),
+            expiry_ts=meta[:, 1].copy(),
+            close_ts=meta[:, 2].copy(),
+        )
+
+    def view(self, series_ticker: Optional[str] = None) -> CatalogView:
+        """All cataloged markets (optionally one series) sorted by expiry."""
+        if series_ticker is None:
+            return self._view
+        tickers = self.by_series.get(series_ticker, set())
+        return self._select([i for i, ticker in enumerate(self._view.tickers) if ticker in tickers])
+
+    def expiring_within(self, hours: Optional[float] = None, now: Optional[float] = None) -> CatalogView:
+        """Markets that have not expired and expire within `hours` from now, sorted by expiry."""
+        now = time.time() if now is None else now
+        expiry_ts = self._view.expiry_ts
+        lo = np.searchsorted(expiry_ts, now, side="left")
+        hi = len(expiry_ts) if hours is None else np.searchsorted(expiry_ts, now + hours * 3600, side="right")
+        return self._select(slice(lo, hi))
+
+    def _select(self, index) -> CatalogView:
+        view = self._view
+        if isinstance(index, slice):
+            return CatalogView(
+                tickers=view.tickers[index],
+                markets=view.markets[index],
+                strikes=view.strikes[index],
+                expiry_ts=view.expiry_ts[index],
+                close_ts=view.close_ts[index],
+            )
+        return CatalogView(
+            tickers=[view.tickers[i] for i in index],
+            markets=[view.markets[i] for i in index],
+            strikes=view.strikes[index],
+            expiry_ts=view.expiry_ts[index],
+            close_ts=view.close_ts[index],
+        )
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, Iterable, List, Optional
+
+# Log-linear buckets as in HdrHistogram: values below 2**SUB_BUCKET_BITS get
+# their own bucket, larger values keep SUB_BUCKET_BITS - 1 significant bits,
+# so any recorded value is reported within ~1.6% of its true size.
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKETS = SUB_BUCKETS >> 1
+MAX_VALUE_NS = (1 << 40) - 1  # ~18 minutes; larger values are clamped
+NUM_BUCKETS = SUB_BUCKETS + (MAX_VALUE_NS.bit_length() - SUB_BUCKET_BITS) * HALF_SUB_BUCKETS
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def bucket_index(value: int) -> int:
+    if value < SUB_BUCKETS:
+        return value if value > 0 else 0
+    if value > MAX_VALUE_NS:
+        value = MAX_VALUE_NS
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF_SUB_BUCKETS + (value >> shift) - HALF_SUB_BUCKETS
+
+
+def bucket_value(index: int) -> int:
+    """Midpoint of the values that land in a bucket."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index - SUB_BUCKETS) // HALF_SUB_BUCKETS + 1
+    mantissa = (index - SUB_BUCKETS) % HALF_SUB_BUCKETS + HALF_SUB_BUCKETS
+    return (mantissa << shift) + (1 << (shift - 1))
+
+
+class LatencyHistogram:
+    """Fixed-memory histogram of nanosecond latencies with bounded relative error.
+
+    Recording is a bucket lookup and two additions, with no allocation and no
+    lock; under heavy contention from several threads an occasional sample
+    may be lost, which does not matter for percentiles.
+    """
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value_ns: int) -> None:
+        self.counts[bucket_index(value_ns)] += 1
+        self.count += 1
+        self.total += value_ns
+        if value_ns > self.max:
+            self.max = value_ns
+
+    def percentile(self, q: float) -> int:
+        """Latency in ns at quantile q (0-1). 0 if nothing was recorded."""
+        if not self.count:
+            return 0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_value(index), self.max)
+        return self.max
+
+    def percentiles(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[float, int]:
+        return {q: self.percentile(q) for q in quantiles}
+
+    def reset(self) -> None:
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+
+class Metrics:
+    """Per-stage latency histograms for the path from BTC tick to order ack.
+
+    Call sites take a start time with clock() and report it with observe():
+
+        t0 = METRICS.clock()
+        ...
+        METRICS.observe("sign", t0)
+
+    While disabled clock() returns 0 and observe() returns at once, so the
+    hooks cost two attribute lookups and two calls.
+    """
+    def __init__(self, enabled: bool = False, prefix: str = "kalshi"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[HTTPServer] = None
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clock(self) -> int:
+        """Start timestamp for a stage, or 0 when metrics are disabled."""
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def observe(self, stage: str, start_ns: int) -> None:
+        """Records the time since `start_ns` (from clock()) under `stage`."""
+        if not start_ns:
+            return
+        self.histogram(stage).record(time.perf_counter_ns() - start_ns)
+
+    def record(self, stage: str, value_ns: int) -> None:
+        """Records an already measured duration."""
+        if self.enabled:
+            self.histogram(stage).record(value_ns)
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, LatencyHistogram())
+        return histogram
+
+    def reset(self) -> None:
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+
+    def summary(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Dict[str, float]]:
+        """{stage: {"count", "mean_ns", "max_ns", "p50_ns", ...}} for every stage with samples."""
+        result = {}
+        for stage, histogram in sorted(self.histograms.items()):
+            if not histogram.count:
+                continue
+            row = {"count": histogram.count, "mean_ns": histogram.total / histogram.count, "max_ns": histogram.max}
+            for q, value in histogram.percentiles(quantiles).items():
+                row[f"p{q * 100:g}_ns"] = value
+            result[stage] = row
+        return result
+
+    def prometheus(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> str:
+        """All histograms as Prometheus summaries in the text exposition format."""
+        name = f"{self.prefix}_stage_latency_seconds"
+        lines: List[str] = [
+            f"# HELP {name} Latency of each stage from BTC tick to order ack.",
+            f"# TYPE {name} summary",
+        ]
+        for stage, histogram in sorted(self.histograms.items()):
+            for q, value in histogram.percentiles(quantiles).items():
+                lines.append(f'{name}{{stage="{stage}",quantile="{q:g}"}} {value / 1e9:.9f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total / 1e9:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+        lines.append(f"# HELP {self.prefix}_stage_latency_max_seconds Largest latency seen per stage.")
+        lines.append(f"# TYPE {self.prefix}_stage_latency_max_seconds gauge")
+        for stage, histogram in sorted(self.histograms.items()):
+            lines.append(f'{self.prefix}_stage_latency_max_seconds{{stage="{stage}"}} {histogram.max / 1e9:.9f}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Writes the metrics dump atomically, e.g. for node_exporter's textfile collector."""
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+    def serve(self, port: int = 9108, host: str = "127.0.0.1") -> HTTPServer:
+        """Serves the metrics dump at http://host:port/metrics from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = HTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server
+
+
+# Process-wide registry used by the clients and strategies.
+# Set KALSHI_METRICS=1 to enable it at start-up, or call METRICS.enable().
+METRICS = Metrics(enabled=os.environ.get("KALSHI_METRICS", "") not in ("", "0"))
@@ -0,0 +1,973 @@
+"""Local stand-in for the Kalshi trade API.
+
+Serves the REST and WebSocket endpoints used by clients.py on one aiohttp
+server, checks the RSA-PSS request signatures, and matches orders with a
+price-time-priority engine, so strategies can be run and load-tested end to
+end without the live exchange:
+
+    python mockexchange.py --port 8080 --key MY_KEY_ID=public_key.pem
+
+    client = KalshiHttpClient(key_id, private_key, base_url="http://127.0.0.1:8080")
+"""
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from aiohttp import WSMsgType, web
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from pricing import binary_option_prices
+
+API_PREFIX = "/trade-api/v2"
+WS_PATH = "/trade-api/ws/v2"
+HOUSE = "house"  # member that provides seeded liquidity
+
+
+class ExchangeError(Exception):
+    """A request the exchange rejects. Mapped to a Kalshi-style error body."""
+    def __init__(self, code: str, message: str, status: int = 400):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"code": self.code, "message": self.message}
+
+
+def iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class MockOrder:
+    """A live or finished order. Prices are kept in YES terms: bids buy YES, asks sell YES (buy NO)."""
+    __slots__ = (
+        "order_id", "client_order_id", "member", "ticker", "action", "side", "type",
+        "is_bid", "price", "remaining", "initial_count", "fill_count", "expiration_ts",
+        "created_ts", "status",
+    )
+
+    def __init__(self, member, ticker, action, side, type, price, count, client_order_id, expiration_ts=None):
+        self.order_id = str(uuid.uuid4())
+        self.client_order_id = client_order_id
+        self.member = member
+        self.ticker = ticker
+        self.action = action
+        self.side = side
+        self.type = type
+        self.is_bid = (action == "buy") == (side == "yes")
+        self.price = price
+        self.remaining = count
+        self.initial_count = count
+        self.fill_count = 0
+        self.expiration_ts = expiration_ts
+        self.created_ts = time.time()
+        self.status = "resting"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "order_id": self.order_id,
+            "user_id": self.member,
+            "client_order_id": self.client_order_id,
+            "ticker": self.ticker,
+            "status": self.status,
+            "action": self.action,
+            "side": self.side,
+            "type": self.type,
+            "yes_price": self.price,
+            "no_price": 100 - self.price,
+            "created_time": iso(self.created_ts),
+            "expiration_time": iso(self.expiration_ts) if self.expiration_ts else None,
+            "initial_count": self.initial_count,
+            "remaining_count": self.remaining,
+            "fill_count": self.fill_count,
+        }
+
+
+class MatchingBook:
+    """Price-time-priority book for one market.
+
+    One FIFO queue per price level and side, plus the total size at each
+    level, so the REST book, WebSocket deltas and the touch are cheap to
+    produce. Bids are YES buyers; asks are YES sellers, which is how NO
+    buyers appear in YES terms (a NO bid at q is a YES ask at 100 - q).
+    """
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.bids = [deque() for _ in range(100)]
+        self.asks = [deque() for _ in range(100)]
+        self.bid_size = [0] * 100
+        self.ask_size = [0] * 100
+
+    def best_bid(self) -> int:
+        """Best YES bid in cents, 0 if there are no bids."""
+        for price in range(99, 0, -1):
+            if self.bid_size[price]:
+                return price
+        return 0
+
+    def best_ask(self) -> int:
+        """Best YES ask in cents, 100 if there are no asks."""
+        for price in range(1, 100):
+            if self.ask_size[price]:
+                return price
+        return 100
+
+    def rest(self, order: MockOrder) -> None:
+        (self.bids if order.is_bid else self.asks)[order.price].append(order)
+        (self.bid_size if order.is_bid else self.ask_size)[order.price] += order.remaining
+
+    def remove(self, order: MockOrder) -> None:
+        (self.bids if order.is_bid else self.asks)[order.price].remove(order)
+        (self.bid_size if order.is_bid else self.ask_size)[order.price] -= order.remaining
+
+    def reduce(self, order: MockOrder, count: int) -> None:
+        """Shrinks a resting order in place, keeping its queue position."""
+        (self.bid_size if order.is_bid else self.ask_size)[order.price] -= count
+        order.remaining -= count
+
+    def match(self, order: MockOrder) -> List[Tuple[MockOrder, int, int]]:
+        """Crosses an incoming order with the opposite side.
+
+        Returns:
+            List of (maker order, price, count) in execution order. Makers that
+            are completely filled are removed from the book.
+        """
+        fills = []
+        if order.is_bid:
+            queues, sizes, prices = self.asks, self.ask_size, range(1, order.price + 1)
+        else:
+            queues, sizes, prices = self.bids, self.bid_size, range(99, order.price - 1, -1)
+        for price in prices:
+            if not order.remaining:
+                break
+            queue = queues[price]
+            while queue and order.remaining:
+                maker = queue[0]
+                if not maker.remaining:
+                    # Never match an emptied order; drop it from the queue
+                    queue.popleft()
+                    continue
+                count = min(maker.remaining, order.remaining)
+                maker.remaining -= count
+                order.remaining -= count
+                sizes[price] -= count
+                fills.append((maker, price, count))
+                if not maker.remaining:
+                    queue.popleft()
+        return fills
+
+    def levels(self, depth: Optional[int] = None) -> Dict[str, Optional[List[List[int]]]]:
+        """The book in GetMarketOrderbook shape: YES bids and NO bids, ascending by price."""
+        yes = [[price, self.bid_size[price]] for price in range(1, 100) if self.bid_size[price]]
+        no = [[100 - price, self.ask_size[price]] for price in range(99, 0, -1) if self.ask_size[price]]
+        if depth:
+            yes, no = yes[-depth:], no[-depth:]
+        return {"yes": yes or None, "no": no or None}
+
+
+class MemberPosition:
+    __slots__ = ("position", "cost", "realized_pnl", "total_traded", "resting_orders_count")
+
+    def __init__(self):
+        self.position = 0  # YES contracts, negative for NO
+        self.cost = 0.0    # cents paid for the open position
+        self.realized_pnl = 0.0
+        self.total_traded = 0
+        self.resting_orders_count = 0
+
+
+class Member:
+    def __init__(self, key_id: str, balance: int):
+        self.key_id = key_id
+        self.balance = balance  # cents
+        self.positions: Dict[str, MemberPosition] = {}
+        self.client_order_ids: Dict[str, MockOrder] = {}
+
+    def position(self, ticker: str) -> MemberPosition:
+        position = self.positions.get(ticker)
+        if position is None:
+            position = self.positions[ticker] = MemberPosition()
+        return position
+
+    def apply_fill(self, ticker: str, is_bid: bool, price: int, count: int) -> None:
+        """Books a fill at YES price `price`. Opposite YES and NO contracts net out into cash."""
+        position = self.position(ticker)
+        paid = price if is_bid else 100 - price
+        old = position.position
+        new = old + count if is_bid else old - count
+        netted = (abs(old) + count - abs(new)) // 2
+        released = position.cost * netted / abs(old) if old else 0.0
+        position.cost += paid * (count - netted) - released
+        position.realized_pnl += netted * (100 - paid) - released
+        position.position = new
+        position.total_traded += count
+        self.balance += 100 * netted - paid * count
+
+
+class MockExchange:
+    """In-memory exchange state: markets, books, orders and member accounts.
+
+    Every state change is reported through `listener(channel, ticker, msg, member)`
+    so a server can fan it out to WebSocket subscribers.
+    """
+    def __init__(self, markets: Iterable[Dict[str, Any]] = (), starting_balance: int = 1_000_000):
+        """
+        Args:
+            markets (Iterable[Dict[str, Any]]): Market dicts in GetMarkets shape (see btc_ladder).
+            starting_balance (int): Balance in cents of each member on first use.
+        """
+        self.starting_balance = starting_balance
+        self.markets: Dict[str, Dict[str, Any]] = {}
+        self.books: Dict[str, MatchingBook] = {}
+        self.orders: Dict[str, MockOrder] = {}
+        self.members: Dict[str, Member] = {}
+        self.trades: deque = deque(maxlen=100_000)
+        self.listener: Optional[Callable[[str, str, Dict[str, Any], Optional[str]], None]] = None
+        self._dirty: Set[str] = set()
+        for market in markets:
+            self.add_market(market)
+
+    # Accounts and markets
+
+    def member(self, key_id: str) -> Member:
+        member = self.members.get(key_id)
+        if member is None:
+            member = self.members[key_id] = Member(key_id, self.starting_balance)
+        return member
+
+    def add_market(self, market: Dict[str, Any]) -> None:
+        market.setdefault("status", "active")
+        market.setdefault("volume", 0)
+        market.setdefault("volume_24h", 0)
+        market.setdefault("open_interest", 0)
+        market.setdefault("last_price", 0)
+        market.update(yes_bid=0, yes_ask=100, no_bid=0, no_ask=100)
+        self.markets[market["ticker"]] = market
+        self.books[market["ticker"]] = MatchingBook(market["ticker"])
+
+    def market(self, ticker: str) -> Dict[str, Any]:
+        market = self.markets.get(ticker)
+        if market is None:
+            raise ExchangeError("market_not_found", f"Market {ticker} not found", 404)
+        return market
+
+    def order(self, member: str, order_id: str) -> MockOrder:
+        order = self.orders.get(order_id)
+        if order is None or order.member != member:
+            raise ExchangeError("not_found", f"Order {order_id} not found", 404)
+        return order
+
+    # Orders
+
+    def create_order(self, member: str, body: Dict[str, Any]) -> MockOrder:
+        """Validates, matches and (for limit orders) rests an order."""
+        ticker = body.get("ticker")
+        action, side, type = body.get("action"), body.get("side"), body.get("type", "limit")
+        count = body.get("count")
+        if action not in ("buy", "sell") or side not in ("yes", "no") or type not in ("limit", "market"):
+            raise ExchangeError("invalid_parameters", "action, side and type must be buy/sell, yes/no and limit/market")
+        if not isinstance(count, int) or count < 1:
+            raise ExchangeError("invalid_parameters", "count must be a positive integer")
+        market = self.market(ticker)
+        if market["status"] != "active":
+            raise ExchangeError("market_closed", f"Market {ticker} is not open for trading")
+        account = self.member(member)
+        client_order_id = body.get("client_order_id") or str(uuid.uuid4())
+        if client_order_id in account.client_order_ids:
+            raise ExchangeError("order_already_exists", f"client_order_id {client_order_id} is already in use", 409)
+
+        is_bid = (action == "buy") == (side == "yes")
+        if type == "market":
+            price = 99 if is_bid else 1
+        else:
+            side_price = body.get(f"{side}_price")
+            other_price = body.get(f"{'no' if side == 'yes' else 'yes'}_price")
+            if side_price is None and other_price is not None:
+                side_price = 100 - other_price
+            if not isinstance(side_price, int) or not 1 <= side_price <= 99:
+                raise ExchangeError("invalid_parameters", "limit orders need a yes_price or no_price between 1 and 99")
+            price = side_price if side == "yes" else 100 - side_price
+        if action == "buy" and (price if is_bid else 100 - price) * count > account.balance:
+            raise ExchangeError("insufficient_balance", "Insufficient balance for this order")
+
+        order = MockOrder(member, ticker, action, side, type, price, count, client_order_id, body.get("expiration_ts"))
+        self.orders[order.order_id] = order
+        account.client_order_ids[client_order_id] = order
+        self._execute(order, rest=type == "limit")
+        return order
+
+    def cancel_order(self, member: str, order_id: str) -> Tuple[MockOrder, int]:
+        """Cancels a resting order. Returns the order and the number of contracts cancelled."""
+        order = self.order(member, order_id)
+        if order.status != "resting":
+            raise ExchangeError("order_not_resting", f"Order {order_id} is {order.status}")
+        reduced_by = order.remaining
+        self._unrest(order)
+        order.remaining = 0
+        self._finish(order, "canceled")
+        return order, reduced_by
+
+    def amend_order(self, member: str, order_id: str, body: Dict[str, Any]) -> Tuple[Dict[str, Any], MockOrder]:
+        """Re-prices and/or re-sizes a resting order. It loses queue priority, like a cancel/replace."""
+        order = self.order(member, order_id)
+        if order.status != "resting":
+            raise ExchangeError("order_not_resting", f"Order {order_id} is {order.status}")
+        old = order.as_dict()
+        side_price = body.get(f"{order.side}_price")
+        if side_price is None:
+            other = body.get(f"{'no' if order.side == 'yes' else 'yes'}_price")
+            side_price = 100 - other if other is not None else (order.price if order.side == "yes" else 100 - order.price)
+        if not isinstance(side_price, int) or not 1 <= side_price <= 99:
+            raise ExchangeError("invalid_parameters", "price must be between 1 and 99")
+        count = body.get("count", order.remaining)
+        if not isinstance(count, int) or count < 1:
+            raise ExchangeError("invalid_parameters", "count must be a positive integer")
+        account = self.member(member)
+        updated_id = body.get("updated_client_order_id")
+        if updated_id and updated_id != order.client_order_id:
+            if updated_id in account.client_order_ids:
+                raise ExchangeError("order_already_exists", f"client_order_id {updated_id} is already in use", 409)
+            account.client_order_ids.pop(order.client_order_id, None)
+            account.client_order_ids[updated_id] = order
+            order.client_order_id = updated_id
+
+        self._unrest(order)
+        order.price = side_price if order.side == "yes" else 100 - side_price
+        order.initial_count += count - order.remaining
+        order.remaining = count
+        self._execute(order, rest=True)
+        return old, order
+
+    def decrease_order(self, member: str, order_id: str, body: Dict[str, Any]) -> MockOrder:
+        """Shrinks a resting order without changing its queue position."""
+        order = self.order(member, order_id)
+        if order.status != "resting":
+            raise ExchangeError("order_not_resting", f"Order {order_id} is {order.status}")
+        if body.get("reduce_by") is not None:
+            reduce_by = body["reduce_by"]
+        elif body.get("reduce_to") is not None:
+            reduce_by = order.remaining - body["reduce_to"]
+        else:
+            raise ExchangeError("invalid_parameters", "reduce_by or reduce_to is required")
+        reduce_by = max(0, min(reduce_by, order.remaining))
+        if reduce_by == order.remaining:
+            # Reduced to nothing: a cancel, so the order must leave its queue
+            self._unrest(order)
+            order.remaining = 0
+            self._finish(order, "canceled")
+        else:
+            self.books[order.ticker].reduce(order, reduce_by)
+            self._book_delta(order, -reduce_by)
+        self._dirty.add(order.ticker)
+        return order
+
+    def expire_orders(self, now: Optional[float] = None) -> int:
+        """Cancels resting orders whose expiration_ts has passed."""
+        now = time.time() if now is None else now
+        expired = [order for order in self.orders.values()
+                   if order.status == "resting" and order.expiration_ts and order.expiration_ts <= now]
+        for order in expired:
+            self._unrest(order)
+            order.remaining = 0
+            self._finish(order, "canceled")
+        return len(expired)
+
+    def settle(self, ticker: str, result: str) -> None:
+        """Closes a market: cancels its orders and pays 100 cents per winning contract."""
+        market = self.market(ticker)
+        for order in [order for order in self.orders.values() if order.ticker == ticker and order.status == "resting"]:
+            self._unrest(order)
+            order.remaining = 0
+            self._finish(order, "canceled")
+        for account in self.members.values():
+            position = account.positions.get(ticker)
+            if position is None or not position.position:
+                continue
+            wins = position.position > 0 if result == "yes" else position.position < 0
+            payout = 100 * abs(position.position) if wins else 0
+            account.balance += payout
+            position.realized_pnl += payout - position.cost
+            position.position, position.cost = 0, 0.0
+        market.update(status="settled", result=result)
+
+    # Matching internals
+
+    def _execute(self, order: MockOrder, rest: bool) -> None:
+        book = self.books[order.ticker]
+        taker = self.member(order.member)
+        for maker, price, count in book.match(order):
+            order.fill_count += count
+            maker.fill_count += count
+            self.member(maker.member).apply_fill(maker.ticker, maker.is_bid, price, count)
+            taker.apply_fill(order.ticker, order.is_bid, price, count)
+            self._book_delta(maker, -count)
+            if not maker.remaining:
+                self.member(maker.member).position(maker.ticker).resting_orders_count -= 1
+                self._finish(maker, "executed")
+            self._record_trade(order, maker, price, count)
+        if order.remaining and rest:
+            book.rest(order)
+            taker.position(order.ticker).resting_orders_count += 1
+            self._book_delta(order, order.remaining)
+        else:
+            order.remaining = 0
+            self._finish(order, "executed" if order.fill_count else "canceled")
+        self._dirty.add(order.ticker)
+
+    def _unrest(self, order: MockOrder) -> None:
+        self.books[order.ticker].remove(order)
+        self._book_delta(order, -order.remaining)
+        self.member(order.member).position(order.ticker).resting_orders_count -= 1
+        self._dirty.add(order.ticker)
+
+    def _finish(self, order: MockOrder, status: str) -> None:
+        order.status = status
+        self.member(order.member).client_order_ids.pop(order.client_order_id, None)
+
+    def _record_trade(self, taker: MockOrder, maker: MockOrder, price: int, count: int) -> None:
+        now = time.time()
+        trade_id = str(uuid.uuid4())
+        taker_side = "yes" if taker.is_bid else "no"
+        trade = {
+            "trade_id": trade_id,
+            "ticker": taker.ticker,
+            "count": count,
+            "yes_price": price,
+            "no_price": 100 - price,
+            "taker_side": taker_side,
+            "created_time": iso(now),
+        }
+        self.trades.append(trade)
+        market = self.markets[taker.ticker]
+        market["last_price"] = price
+        market["volume"] += count
+        market["volume_24h"] += count
+        self._emit("trade", taker.ticker, {
+            "trade_id": trade_id, "market_ticker": taker.ticker, "yes_price": price, "no_price": 100 - price,
+            "count": count, "taker_side": taker_side, "ts": int(now),
+        })
+        for order, is_taker in ((taker, True), (maker, False)):
+            self._emit("fill", order.ticker, {
+                "trade_id": trade_id, "order_id": order.order_id, "market_ticker": order.ticker,
+                "is_taker": is_taker, "side": order.side, "action": order.action,
+                "yes_price": price, "no_price": 100 - price, "count": count, "ts": int(now),
+            }, member=order.member)
+
+    def _book_delta(self, order: MockOrder, delta: int) -> None:
+        if not delta:
+            return
+        side, price = ("yes", order.price) if order.is_bid else ("no", 100 - order.price)
+        self._emit("orderbook_delta", order.ticker, {
+            "market_ticker": order.ticker, "price": price, "delta": delta, "side": side,
+        })
+
+    def _emit(self, channel: str, ticker: str, msg: Dict[str, Any], member: Optional[str] = None) -> None:
+        if self.listener is not None:
+            self.listener(channel, ticker, msg, member)
+
+    def flush(self) -> None:
+        """Refreshes top-of-book fields of changed markets and publishes their ticker updates."""
+        for ticker in self._dirty:
+            market, book = self.markets[ticker], self.books[ticker]
+            yes_bid, yes_ask = book.best_bid(), book.best_ask()
+            market.update(yes_bid=yes_bid, yes_ask=yes_ask, no_bid=100 - yes_ask, no_ask=100 - yes_bid)
+            self._emit("ticker", ticker, {
+                "market_ticker": ticker, "price": market["last_price"], "yes_bid": yes_bid, "yes_ask": yes_ask,
+                "volume": market["volume"], "open_interest": market["open_interest"], "ts": int(time.time()),
+            })
+        self._dirty.clear()
+
+    # Read views
+
+    def positions(self, member: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(market_positions, event_positions) for a member."""
+        account = self.member(member)
+        market_positions = []
+        events: Dict[str, Dict[str, Any]] = {}
+        for ticker, position in account.positions.items():
+            market_positions.append({
+                "ticker": ticker,
+                "position": position.position,
+                "market_exposure": round(position.cost),
+                "realized_pnl": round(position.realized_pnl),
+                "total_traded": position.total_traded,
+                "resting_orders_count": position.resting_orders_count,
+                "fees_paid": 0,
+            })
+            event_ticker = self.markets[ticker].get("event_ticker", ticker)
+            event = events.setdefault(event_ticker, {
+                "event_ticker": event_ticker, "event_exposure": 0, "realized_pnl": 0, "total_cost": 0, "fees_paid": 0,
+            })
+            event["event_exposure"] += round(position.cost)
+            event["total_cost"] += round(position.cost)
+            event["realized_pnl"] += round(position.realized_pnl)
+        return market_positions, list(events.values())
+
+    def seed_liquidity(self, ticker: str, fair_cents: int, width: int = 2, size: int = 100, levels: int = 5) -> None:
+        """Rests house orders on both sides of `fair_cents` so strategies have something to trade against."""
+        house = self.member(HOUSE)
+        house.balance = max(house.balance, 10**12)
+        bid = max(1, min(98, fair_cents - width // 2))
+        ask = min(99, max(bid + 1, fair_cents + (width + 1) // 2))
+        for level in range(levels):
+            if bid - level >= 1:
+                self.create_order(HOUSE, {"ticker": ticker, "action": "buy", "side": "yes", "type": "limit",
+                                          "count": size, "yes_price": bid - level})
+            if ask + level <= 99:
+                self.create_order(HOUSE, {"ticker": ticker, "action": "buy", "side": "no", "type": "limit",
+                                          "count": size, "no_price": 100 - (ask + level)})
+        self.flush()
+
+
+def btc_ladder(
+    spot: float = 100000.0,
+    num_strikes: int = 20,
+    strike_step: float = 250.0,
+    expiries_hours: Iterable[int] = (1, 2, 3, 6, 12, 24),
+    now: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """KXBTCD-style markets: a strike ladder around `spot` for each hourly expiry."""
+    now = time.time() if now is None else now
+    top_of_hour = datetime.fromtimestamp(now, timezone.utc).replace(minute=0, second=0, microsecond=0)
+    markets = []
+    for hours in expiries_hours:
+        expiry = top_of_hour + timedelta(hours=hours)
+        event_ticker = f"KXBTCD-{expiry:%y%b%d%H}".upper()
+        for i in range(num_strikes):
+            strike = round(spot / strike_step) * strike_step + strike_step * (i - num_strikes // 2)
+            markets.append({
+                "ticker": f"{event_ticker}-T{strike - 0.01:.2f}",
+                "event_ticker": event_ticker,
+                "market_type": "binary",
+                "title": f"Bitcoin price on {expiry:%b %d, %Y} at {expiry:%H}:00 UTC?",
+                "yes_sub_title": f"${strike:,.0f} or above",
+                "open_time": iso(now - 3600),
+                "close_time": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "expiration_time": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "floor_strike": strike - 0.01,
+                "strike_type": "greater",
+            })
+    return markets
+
+
+def seed_ladder(exchange: MockExchange, spot: float, IV_percent: float = 50.0, **kwargs: Any) -> None:
+    """Seeds every market of a btc_ladder around its model fair value."""
+    now = time.time()
+    for market in exchange.markets.values():
+        expiry = datetime.strptime(market["expiration_time"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        hours = max((expiry.timestamp() - now) / 3600, 0.0)
+        fair = float(binary_option_prices(spot, market["floor_strike"], hours, IV_percent).price)
+        exchange.seed_liquidity(market["ticker"], int(round(fair * 100)), **kwargs)
+
+
+def load_public_key(path: str) -> rsa.RSAPublicKey:
+    """Loads a PEM public key, or derives it from a PEM private key."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if b"PRIVATE KEY" in data:
+        return serialization.load_pem_private_key(data, password=None).public_key()
+    return serialization.load_pem_public_key(data)
+
+
+class Connection:
+    """One WebSocket client: its subscriptions and outbound queue."""
+    def __init__(self, ws: web.WebSocketResponse, member: str):
+        self.ws = ws
+        self.member = member
+        self.subscriptions: Dict[int, Tuple[str, Optional[Set[str]]]] = {}
+        self.seq: Dict[int, int] = {}
+        self.outbox: asyncio.Queue = asyncio.Queue()
+
+    def send(self, message: Dict[str, Any]) -> None:
+        self.outbox.put_nowait(message)
+
+    def publish(self, sid: int, msg_type: str, msg: Dict[str, Any]) -> None:
+        self.seq[sid] = self.seq.get(sid, 0) + 1
+        self.send({"type": msg_type, "sid": sid, "seq": self.seq[sid], "msg": msg})
+
+
+class MockKalshiServer:
+    """aiohttp application serving a MockExchange over the Kalshi REST and WebSocket APIs."""
+    CHANNELS = ("orderbook_delta", "ticker", "trade", "fill")
+
+    def __init__(
+        self,
+        exchange: MockExchange,
+        public_keys: Optional[Dict[str, rsa.RSAPublicKey]] = None,
+        verify_signatures: bool = True,
+        max_clock_skew: float = 60.0,
+    ):
+        """
+        Args:
+            exchange (MockExchange): State the server exposes.
+            public_keys (Optional[Dict[str, rsa.RSAPublicKey]]): API key id -> public key.
+            verify_signatures (bool): Reject requests whose KALSHI-ACCESS-SIGNATURE does not
+                verify against the key id's public key. If False any key id is accepted.
+            max_clock_skew (float): Seconds a request timestamp may differ from the server clock.
+        """
+        self.exchange = exchange
+        self.public_keys = public_keys or {}
+        self.verify_signatures = verify_signatures
+        self.max_clock_skew = max_clock_skew
+        self.connections: Set[Connection] = set()
+        self._sids = itertools.count(1)
+        self.requests = 0
+        exchange.listener = self._publish
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.add_routes([
+            web.get(API_PREFIX + "/exchange/status", self.exchange_status),
+            web.get(API_PREFIX + "/markets", self.get_markets),
+            web.get(API_PREFIX + "/markets/trades", self.get_trades),
+            web.get(API_PREFIX + "/markets/{ticker}", self.get_market),
+            web.get(API_PREFIX + "/markets/{ticker}/orderbook", self.get_orderbook),
+            web.get(API_PREFIX + "/portfolio/balance", self.get_balance),
+            web.get(API_PREFIX + "/portfolio/positions", self.get_positions),
+            web.get(API_PREFIX + "/portfolio/orders", self.get_orders),
+            web.post(API_PREFIX + "/portfolio/orders", self.create_order),
+            web.post(API_PREFIX + "/portfolio/orders/batched", self.batch_create_orders),
+            web.delete(API_PREFIX + "/portfolio/orders/batched", self.batch_cancel_orders),
+            web.delete(API_PREFIX + "/portfolio/orders/{order_id}", self.cancel_order),
+            web.post(API_PREFIX + "/portfolio/orders/{order_id}/amend", self.amend_order),
+            web.post(API_PREFIX + "/portfolio/orders/{order_id}/decrease", self.decrease_order),
+            web.get(WS_PATH, self.websocket),
+        ])
+        self.app.on_startup.append(self._start_expiry)
+        self._runner: Optional[web.AppRunner] = None
+
+    # Authentication
+
+    def authenticate(self, request: web.Request) -> str:
+        """Returns the member key id, or raises ExchangeError(401)."""
+        key_id = request.headers.get("KALSHI-ACCESS-KEY")
+        timestamp = request.headers.get("KALSHI-ACCESS-TIMESTAMP")
+        signature = request.headers.get("KALSHI-ACCESS-SIGNATURE")
+        if not key_id or not timestamp or not signature:
+            raise ExchangeError("missing_parameters", "Missing authentication headers", 401)
+        if not self.verify_signatures:
+            return key_id
+        public_key = self.public_keys.get(key_id)
+        if public_key is None:
+            raise ExchangeError("authentication_error", f"Unknown API key {key_id}", 401)
+        try:
+            if abs(int(timestamp) / 1000 - time.time()) > self.max_clock_skew:
+                raise ExchangeError("authentication_error", "Request timestamp outside allowed skew", 401)
+            public_key.verify(
+                base64.b64decode(signature),
+                (timestamp + request.method + request.path).encode("utf-8"),
+                padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.AUTO),
+                hashes.SHA256(),
+            )
+        except (InvalidSignature, ValueError):
+            raise ExchangeError("authentication_error", "Invalid signature", 401)
+        return key_id
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.requests += 1
+        try:
+            if request.path != API_PREFIX + "/exchange/status":
+                request["member"] = self.authenticate(request)
+            return await handler(request)
+        except ExchangeError as e:
+            return web.json_response({"error": e.as_dict()}, status=e.status)
+        finally:
+            self.exchange.flush()
+
+    async def _body(self, request: web.Request) -> Dict[str, Any]:
+        try:
+            return await request.json() if request.can_read_body else {}
+        except json.JSONDecodeError:
+            raise ExchangeError("invalid_parameters", "Body is not valid JSON")
+
+    # REST handlers
+
+    async def exchange_status(self, request: web.Request) -> web.Response:
+        return web.json_response({"exchange_active": True, "trading_active": True})
+
+    async def get_markets(self, request: web.Request) -> web.Response:
+        query = request.query
+        markets = list(self.exchange.markets.values())
+        status = query.get("status")
+        if status:
+            wanted = {"open": "active"}.get(status, status)
+            markets = [market for market in markets if market["status"] in wanted.split(",")]
+        if query.get("series_ticker"):
+            prefix = query["series_ticker"] + "-"
+            markets = [market for market in markets if market["ticker"].startswith(prefix)]
+        if query.get("event_ticker"):
+            markets = [market for market in markets if market.get("event_ticker") == query["event_ticker"]]
+        for key, keep in (("min_close_ts", lambda ts, bound: ts >= bound), ("max_close_ts", lambda ts, bound: ts <= bound)):
+            if query.get(key):
+                bound = int(query[key])
+                markets = [market for market in markets if keep(self._close_ts(market), bound)]
+        page, cursor = self._page(markets, query)
+        return web.json_response({"markets": page, "cursor": cursor})
+
+    @staticmethod
+    def _close_ts(market: Dict[str, Any]) -> float:
+        return datetime.strptime(market["close_time"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+
+    @staticmethod
+    def _page(items: List[Any], query) -> Tuple[List[Any], str]:
+        limit = min(int(query.get("limit") or 100), 1000)
+        offset = int(query.get("cursor") or 0)
+        end = offset + limit
+        return items[offset:end], str(end) if end < len(items) else ""
+
+    async def get_market(self, request: web.Request) -> web.Response:
+        return web.json_response({"market": self.exchange.market(request.match_info["ticker"])})
+
+    async def get_trades(self, request: web.Request) -> web.Response:
+        trades = list(reversed(self.exchange.trades))
+        if request.query.get("ticker"):
+            trades = [trade for trade in trades if trade["ticker"] == request.query["ticker"]]
+        page, cursor = self._page(trades, request.query)
+        return web.json_response({"trades": page, "cursor": cursor})
+
+    async def get_orderbook(self, request: web.Request) -> web.Response:
+        ticker = request.match_info["ticker"]
+        self.exchange.market(ticker)
+        depth = request.query.get("depth")
+        return web.json_response({"orderbook": self.exchange.books[ticker].levels(int(depth) if depth else None)})
+
+    async def get_balance(self, request: web.Request) -> web.Response:
+        return web.json_response({"balance": self.exchange.member(request["member"]).balance})
+
+    async def get_positions(self, request: web.Request) -> web.Response:
+        market_positions, event_positions = self.exchange.positions(request["member"])
+        query = request.query
+        if query.get("ticker"):
+            market_positions = [p for p in market_positions if p["ticker"] == query["ticker"]]
+        if query.get("event_ticker"):
+            event_positions = [p for p in event_positions if p["event_ticker"] == query["event_ticker"]]
+            market_positions = [p for p in market_positions
+                                if self.exchange.markets[p["ticker"]].get("event_ticker") == query["event_ticker"]]
+        if "position" in (query.get("count_filter") or ""):
+            market_positions = [p for p in market_positions if p["position"]]
+        page, cursor = self._page(market_positions, query)
+        return web.json_response({"market_positions": page, "event_positions": event_positions, "cursor": cursor})
+
+    async def get_orders(self, request: web.Request) -> web.Response:
+        query = request.query
+        orders = [order for order in reversed(list(self.exchange.orders.values())) if order.member == request["member"]]
+        for key in ("ticker", "status"):
+            if query.get(key):
+                orders = [order for order in orders if getattr(order, key) == query[key]]
+        if query.get("event_ticker"):
+            orders = [order for order in orders
+                      if self.exchange.markets[order.ticker].get("event_ticker") == query["event_ticker"]]
+        page, cursor = self._page([order.as_dict() for order in orders], query)
+        return web.json_response({"orders": page, "cursor": cursor})
+
+    async def create_order(self, request: web.Request) -> web.Response:
+        order = self.exchange.create_order(request["member"], await self._body(request))
+        return web.json_response({"order": order.as_dict()}, status=201)
+
+    async def batch_create_orders(self, request: web.Request) -> web.Response:
+        results = []
+        for body in (await self._body(request)).get("orders") or []:
+            try:
+                results.append({"order": self.exchange.create_order(request["member"], body).as_dict(), "error": None})
+            except ExchangeError as e:
+                results.append({"order": None, "error": e.as_dict()})
+        return web.json_response({"orders": results}, status=201)
+
+    async def cancel_order(self, request: web.Request) -> web.Response:
+        order, reduced_by = self.exchange.cancel_order(request["member"], request.match_info["order_id"])
+        return web.json_response({"order": order.as_dict(), "reduced_by": reduced_by})
+
+    async def batch_cancel_orders(self, request: web.Request) -> web.Response:
+        results = []
+        for order_id in (await self._body(request)).get("ids") or []:
+            try:
+                order, reduced_by = self.exchange.cancel_order(request["member"], order_id)
+                results.append({"order_id": order_id, "order": order.as_dict(), "reduced_by": reduced_by, "error": None})
+            except ExchangeError as e:
+                results.append({"order_id": order_id, "order": None, "reduced_by": 0, "error": e.as_dict()})
+        return web.json_response({"orders": results})
+
+    async def amend_order(self, request: web.Request) -> web.Response:
+        old, order = self.exchange.amend_order(request["member"], request.match_info["order_id"], await self._body(request))
+        return web.json_response({"old_order": old, "order": order.as_dict()})
+
+    async def decrease_order(self, request: web.Request) -> web.Response:
+        order = self.exchange.decrease_order(request["member"], request.match_info["order_id"], await self._body(request))
+        return web.json_response({"order": order.as_dict()})
+
+    # WebSocket
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        connection = Connection(ws, request["member"])
+        self.connections.add(connection)
+        writer = asyncio.ensure_future(self._writer(connection))
+        try:
+            async for frame in ws:
+                if frame.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    command = json.loads(frame.data)
+                    self._command(connection, command)
+                except (ValueError, KeyError, TypeError) as e:
+                    connection.send({"type": "error", "msg": {"code": 1, "msg": f"Bad command: {e}"}})
+        finally:
+            self.connections.discard(connection)
+            writer.cancel()
+        return ws
+
+    async def _writer(self, connection: Connection) -> None:
+        while True:
+            message = await connection.outbox.get()
+            if connection.ws.closed:
+                return
+            await connection.ws.send_str(json.dumps(message))
+
+    def _command(self, connection: Connection, command: Dict[str, Any]) -> None:
+        message_id, cmd, params = command.get("id"), command.get("cmd"), command.get("params") or {}
+        if cmd == "subscribe":
+            tickers = params.get("market_tickers")
+            for channel in params.get("channels") or []:
+                if channel not in self.CHANNELS:
+                    connection.send({"id": message_id, "type": "error", "msg": {"code": 6, "msg": f"Unknown channel {channel}"}})
+                    continue
+                sid = next(self._sids)
+                connection.subscriptions[sid] = (channel, set(tickers) if tickers is not None else None)
+                connection.send({"id": message_id, "type": "subscribed", "msg": {"channel": channel, "sid": sid}})
+                if channel == "orderbook_delta":
+                    self._snapshots(connection, sid, tickers if tickers is not None else list(self.exchange.markets))
+        elif cmd == "unsubscribe":
+            for sid in params.get("sids") or []:
+                connection.subscriptions.pop(sid, None)
+                connection.seq.pop(sid, None)
+                connection.send({"id": message_id, "sid": sid, "type": "unsubscribed"})
+        elif cmd == "update_subscription":
+            tickers = set(params.get("market_tickers") or [])
+            for sid in params.get("sids") or []:
+                channel, current = connection.subscriptions.get(sid, (None, None))
+                if channel is None or current is None:
+                    connection.send({"id": message_id, "type": "error", "msg": {"code": 7, "msg": f"Cannot update sid {sid}"}})
+                    continue
+                if params.get("action") == "add_markets":
+                    added = tickers - current
+                    current |= added
+                    if channel == "orderbook_delta":
+                        self._snapshots(connection, sid, sorted(added))
+                else:
+                    current -= tickers
+                connection.send({"id": message_id, "sid": sid, "type": "ok", "msg": {"market_tickers": sorted(current)}})
+        else:
+            connection.send({"id": message_id, "type": "error", "msg": {"code": 5, "msg": f"Unknown command {cmd}"}})
+
+    def _snapshots(self, connection: Connection, sid: int, tickers: Iterable[str]) -> None:
+        for ticker in tickers:
+            book = self.exchange.books.get(ticker)
+            if book is not None:
+                levels = book.levels()
+                connection.publish(sid, "orderbook_snapshot", {
+                    "market_ticker": ticker, "yes": levels["yes"] or [], "no": levels["no"] or [],
+                })
+
+    def _publish(self, channel: str, ticker: str, msg: Dict[str, Any], member: Optional[str]) -> None:
+        for connection in self.connections:
+            if member is not None and connection.member != member:
+                continue
+            for sid, (sid_channel, tickers) in connection.subscriptions.items():
+                if sid_channel == channel and (tickers is None or ticker in tickers):
+                    connection.publish(sid, channel, msg)
+
+    # Lifecycle
+
+    async def _start_expiry(self, app: web.Application) -> None:
+        async def expire():
+            while True:
+                await asyncio.sleep(0.5)
+                if self.exchange.expire_orders():
+                    self.exchange.flush()
+        app["expiry"] = asyncio.ensure_future(expire())
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> str:
+        """Starts serving on the running event loop. Returns the base URL."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start_background(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Runs the server on its own event loop in a daemon thread. Returns the base URL.
+
+        Port 0 picks a free port, which is handy for tests and benchmarks.
+        """
+        started = threading.Event()
+        result = {}
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            result["url"] = loop.run_until_complete(self.start(host, port))
+            started.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, name="mock-kalshi", daemon=True).start()
+        started.wait()
+        return result["url"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock Kalshi exchange")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--key", action="append", default=[], metavar="KEY_ID=PEM",
+                        help="API key id and its public (or private) key file; repeatable")
+    parser.add_argument("--no-verify", action="store_true", help="accept requests without checking signatures")
+    parser.add_argument("--spot", type=float, default=100000.0, help="BTC price the strike ladder is centred on")
+    parser.add_argument("--strikes", type=int, default=20, help="strikes per expiry")
+    parser.add_argument("--iv", type=float, default=50.0, help="volatility used to seed house liquidity")
+    parser.add_argument("--no-liquidity", action="store_true", help="start with empty books")
+    parser.add_argument("--balance", type=int, default=1_000_000, help="starting balance per member in cents")
+    args = parser.parse_args()
+
+    public_keys = {}
+    for entry in args.key:
+        key_id, path = entry.split("=", 1)
+        public_keys[key_id] = load_public_key(path)
+    if not public_keys and not args.no_verify:
+        parser.error("pass at least one --key KEY_ID=PEM, or --no-verify")
+
+    exchange = MockExchange(btc_ladder(args.spot, args.strikes), starting_balance=args.balance)
+    if not args.no_liquidity:
+        seed_ladder(exchange, args.spot, args.iv)
+    server = MockKalshiServer(exchange, public_keys, verify_signatures=not args.no_verify)
+
+    async def serve():
+        url = await server.start(args.host, args.port)
+        print(f"Mock Kalshi exchange on {url} with {len(exchange.markets)} markets")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
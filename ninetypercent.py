@@ -1,4 +1,5 @@
 import time
+import uuid
 from datetime import datetime, timedelta
 from clients import KalshiHttpClient  # Import necessary functions
 
@@ -14,38 +15,32 @@ def filter_markets(results, price_threshold=90, volume_threshold=100):
     if result['yes_ask'] >= price_threshold and result['volume_24h'] > volume_threshold
     ]
 
+def screen_markets(screener, price_threshold=90, volume_threshold=100, max_close_ts=None, min_close_ts=None):
+    """
+    Same filter as filter_markets, answered from a MarketScreener's indexes instead of a scan.
+    """
+    return screener.query(
+        yes_ask=(price_threshold, None),
+        volume_24h=(volume_threshold + 1, None),
+        close_ts=(min_close_ts, max_close_ts),
+    )
+
 def fetch_all_markets(client, max_close_ts, min_close_ts, limit=1000):
     """
     Fetches all markets, paginating through results using the cursor.
     """
-    all_results = []
-    cursor = None
-    x = 0
+    return list(client.iter_markets(limit=limit, max_close_ts=max_close_ts, min_close_ts=min_close_ts))
 
-    while True:
-        # Fetch results, passing the cursor for pagination
-        response = client.get_markets(limit=limit, max_close_ts=max_close_ts, min_close_ts=min_close_ts, cursor=cursor)
-        
-        # Extract markets (assuming it's the top level of the response) and the cursor from the response
-        markets = response[:-1]  
-        cursor = response[-1]  # Extract cursor for pagination
-        
-        # Add the fetched results to the list
-        all_results.extend(markets)
-        
-        # If there's no next cursor, break the loop
-        if not cursor:
-            break
 
-    return all_results
 
 
 
-
-
-def trade_ninetypercent(client):
+def trade_ninetypercent(client, screener=None):
     """
     Fetches markets, filters those where price > 0.9 and volume > 1000, and executes trades.
+
+    With a MarketScreener kept up to date from ticker updates, the markets are
+    looked up in its indexes instead of being downloaded and filtered again.
     """
     # Current time in seconds
     current_time = int(time.time())
@@ -53,15 +48,17 @@ def trade_ninetypercent(client):
     # 24 hours from current time in seconds
     closeby_time = current_time + (24 * 60 * 60)
 
-    # Fetch and filter markets
-    results = fetch_all_markets(client, max_close_ts=closeby_time, min_close_ts=current_time)
-    print(len(results))
-    filtered_markets = filter_markets(results)
+    if screener is not None:
+        filtered_markets = screen_markets(screener, max_close_ts=closeby_time, min_close_ts=current_time)
+    else:
+        # Stream and filter markets page by page
+        results = client.iter_markets(max_close_ts=closeby_time, min_close_ts=current_time)
+        filtered_markets = filter_markets(results)
     print(filtered_markets)
 
     # Execute trades
     for ticker in filtered_markets:
-        # client_order_id = f"order_{int(time.time())}"
+        client_order_id = str(uuid.uuid4())
         client.PostOrder(
             action="buy",
             client_order_id=client_order_id,
@@ -71,4 +68,4 @@ def trade_ninetypercent(client):
             count=1,  # Modify count as needed
         )
 
-    print(f"Traded in markets: {[ticker for ticker, _ in filtered_markets]}")
+    print(f"Traded in markets: {filtered_markets}")
@@ -0,0 +1,224 @@
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from clients import Environment, KalshiWebSocketClient
+from dispatch import INLINE
+from signing import Signer
+
+# Kalshi prices are whole cents from 1 to 99; index 0 is unused
+NUM_LEVELS = 100
+SIDES = ("yes", "no")
+
+
+class OrderBook:
+    """Resting bids for one market, stored as contract counts per price level.
+
+    Kalshi books only carry bids: a YES ask at p is a NO bid at 100 - p. The
+    best bid per side is cached and only rescanned when the best level empties,
+    so best bid/ask lookups are O(1).
+    """
+    __slots__ = ("ticker", "levels", "best", "seq", "stale")
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.levels = {side: np.zeros(NUM_LEVELS, dtype=np.int64) for side in SIDES}
+        self.best = {side: 0 for side in SIDES}
+        self.seq = 0
+        self.stale = True
+
+    def apply_snapshot(self, yes: Iterable[Tuple[int, int]], no: Iterable[Tuple[int, int]], seq: int = 0) -> None:
+        """Replaces the whole book with [[price, count], ...] levels for each side."""
+        levels = {}
+        best = {}
+        for side, side_levels in (("yes", yes), ("no", no)):
+            array = np.zeros(NUM_LEVELS, dtype=np.int64)
+            for price, count in side_levels or ():
+                array[price] = count
+            levels[side] = array
+            filled = np.flatnonzero(array > 0)
+            best[side] = int(filled[-1]) if len(filled) else 0
+        # Swap whole arrays so readers on other threads never see a half-built book
+        self.levels = levels
+        self.best = best
+        self.seq = seq
+        self.stale = False
+
+    def apply_delta(self, side: str, price: int, delta: int, seq: int = 0) -> None:
+        """Adds `delta` contracts (negative to remove) at one price level."""
+        array = self.levels[side]
+        count = int(array[price]) + delta
+        array[price] = count if count > 0 else 0
+        best = self.best[side]
+        if count > 0 and price > best:
+            self.best[side] = price
+        elif count <= 0 and price == best:
+            self.best[side] = self._scan_best(array, price - 1)
+        self.seq = seq
+
+    @staticmethod
+    def _scan_best(array: np.ndarray, start: int) -> int:
+        for price in range(start, 0, -1):
+            if array[price] > 0:
+                return price
+        return 0
+
+    def best_bid(self, side: str = "yes") -> Optional[int]:
+        """Highest bid on a side in cents, or None if that side is empty."""
+        return self.best[side] or None
+
+    def best_ask(self, side: str = "yes") -> Optional[int]:
+        """Lowest ask on a side in cents (100 minus the best bid on the other side)."""
+        other = self.best["no" if side == "yes" else "yes"]
+        return 100 - other if other else None
+
+    def best_bid_ask(self) -> Tuple[Optional[int], Optional[int]]:
+        """(best YES bid, best YES ask) in cents."""
+        return self.best_bid("yes"), self.best_ask("yes")
+
+    def quantity(self, side: str, price: int) -> int:
+        """Contracts resting at one price level."""
+        return int(self.levels[side][price])
+
+    def depth(self, side: str, levels: int = 5) -> List[List[int]]:
+        """Top `levels` bids on a side as [[price, count], ...], best first."""
+        array = self.levels[side]
+        prices = np.flatnonzero(array > 0)[::-1][:levels]
+        return [[int(price), int(array[price])] for price in prices]
+
+    def total_depth(self, side: str, min_price: int = 1) -> int:
+        """Total contracts bid on a side at or above `min_price`."""
+        return int(self.levels[side][min_price:].sum())
+
+    def as_orderbook(self, depth: Optional[int] = None) -> Dict[str, Any]:
+        """Returns the book in the same shape as the REST GetMarketOrderbook response.
+
+        Levels are sorted by ascending price like the REST payload.
+        """
+        book = {}
+        for side in SIDES:
+            array = self.levels[side]
+            prices = np.flatnonzero(array > 0)
+            if depth is not None:
+                prices = prices[-depth:]
+            book[side] = [[int(price), int(array[price])] for price in prices] or None
+        return {"orderbook": book}
+
+
+class OrderBookEngine:
+    """Maintains local order books from Kalshi `orderbook_delta` channel messages.
+
+    Each subscription (sid) carries its own sequence number. When a message
+    arrives out of sequence every book on that subscription is marked stale
+    and `on_gap` is called with the sid and its tickers so the caller can
+    resubscribe and receive fresh snapshots.
+    """
+    def __init__(self, on_gap: Optional[Callable[[int, List[str]], Any]] = None):
+        self.books: Dict[str, OrderBook] = {}
+        self.last_seq: Dict[int, int] = {}
+        self.sid_tickers: Dict[int, set] = {}
+        self.on_gap = on_gap
+        self.gaps = 0
+
+    def book(self, ticker: str) -> Optional[OrderBook]:
+        """The local book for a market, or None if no snapshot has arrived yet."""
+        book = self.books.get(ticker)
+        return book if book is not None and not book.stale else None
+
+    def best_bid_ask(self, ticker: str) -> Tuple[Optional[int], Optional[int]]:
+        """(best YES bid, best YES ask) in cents for a market."""
+        book = self.book(ticker)
+        return book.best_bid_ask() if book is not None else (None, None)
+
+    def handle(self, message: Dict[str, Any]) -> Optional[List[str]]:
+        """Applies one decoded WebSocket message.
+
+        Returns:
+            Optional[List[str]]: Tickers that went stale because of a sequence gap.
+        """
+        msg_type = message.get("type")
+        if msg_type not in ("orderbook_snapshot", "orderbook_delta"):
+            return None
+        sid = message.get("sid")
+        seq = message.get("seq")
+        body = message["msg"]
+        ticker = body["market_ticker"]
+
+        if msg_type == "orderbook_snapshot":
+            book = self.books.get(ticker)
+            if book is None:
+                book = self.books[ticker] = OrderBook(ticker)
+            book.apply_snapshot(body.get("yes"), body.get("no"), seq or 0)
+            self.sid_tickers.setdefault(sid, set()).add(ticker)
+            if seq is not None:
+                self.last_seq[sid] = seq
+            return None
+
+        expected = self.last_seq.get(sid)
+        if seq is not None and expected is not None and seq != expected + 1:
+            return self._gap(sid)
+        if seq is not None:
+            self.last_seq[sid] = seq
+        book = self.books.get(ticker)
+        if book is None or book.stale:
+            return None
+        book.apply_delta(body["side"], body["price"], body["delta"], seq or 0)
+        return None
+
+    def reset(self) -> None:
+        """Marks every book stale and forgets sequence state, e.g. after a reconnect."""
+        for book in self.books.values():
+            book.stale = True
+        self.last_seq.clear()
+        self.sid_tickers.clear()
+
+    def _gap(self, sid: int) -> List[str]:
+        self.gaps += 1
+        tickers = sorted(self.sid_tickers.pop(sid, ()))
+        self.last_seq.pop(sid, None)
+        for ticker in tickers:
+            self.books[ticker].stale = True
+        if self.on_gap is not None:
+            self.on_gap(sid, tickers)
+        return tickers
+
+
+class OrderBookWebSocketClient(KalshiWebSocketClient):
+    """WebSocket client that keeps an OrderBookEngine up to date for a set of markets.
+
+    Markets can be added or removed at runtime with subscribe("orderbook_delta", ...)
+    and unsubscribe(...). Sequence gaps are repaired by dropping the affected
+    subscription and subscribing again, which makes the exchange send fresh
+    snapshots.
+    """
+    def __init__(
+        self,
+        key_id: str,
+        private_key: rsa.RSAPrivateKey,
+        market_tickers: Iterable[str],
+        environment: Environment = Environment.DEMO,
+        signer: Optional[Signer] = None,
+        base_url: Optional[str] = None,
+    ):
+        super().__init__(key_id, private_key, environment, signer, base_url)
+        self.books = OrderBookEngine()
+        self.subscriptions.want("orderbook_delta", market_tickers)
+        # Books must see every delta in order, so they are updated inline rather than queued
+        self.on("orderbook_delta", self.apply_orderbook_message, policy=INLINE)
+
+    async def on_open(self):
+        # Deltas on the new connection only make sense on top of its own snapshots
+        self.books.reset()
+        await super().on_open()
+
+    async def resync(self, sid: int, market_tickers: List[str]):
+        """Replace a subscription that skipped a sequence number with a fresh one."""
+        print(f"Orderbook sequence gap on sid {sid}, resyncing {len(market_tickers)} markets.")
+        await self.subscriptions.resubscribe(sid)
+
+    async def apply_orderbook_message(self, message: Dict[str, Any]):
+        stale = self.books.handle(message)
+        if stale is not None:
+            await self.resync(message.get("sid"), stale)
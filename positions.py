@@ -0,0 +1,222 @@
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from requests.exceptions import RequestException
+
+from dispatch import INLINE
+
+
+class MarketPosition:
+    """Our holding in one market, in Kalshi's convention: positive is YES, negative is NO."""
+    __slots__ = ("ticker", "position", "cost", "realized_pnl", "total_traded", "last_fill_seq")
+
+    def __init__(self, ticker: str, position: int = 0, cost: float = 0.0, realized_pnl: float = 0.0,
+                 total_traded: int = 0):
+        self.ticker = ticker
+        self.position = position
+        self.cost = cost                  # cents paid for the open position
+        self.realized_pnl = realized_pnl  # cents
+        self.total_traded = total_traded
+        self.last_fill_seq = 0
+
+    def __repr__(self):
+        return f"MarketPosition({self.ticker} {self.position:+d} cost={self.cost:.0f})"
+
+
+class PositionLedger:
+    """In-memory positions per market, kept current from WebSocket fills.
+
+    Strategies read positions with position() or get(), which are a dict
+    lookup and never touch the network. Fills from the 'fill' channel (and
+    snapshots from 'market_positions', if subscribed) are applied as they
+    arrive; duplicates are ignored by trade and order id.
+
+    REST is only used to reconcile, on a background thread. A market whose
+    fills arrived while the snapshot was in flight keeps the ledger's value,
+    since the snapshot may or may not include them; it is checked again on
+    the next pass.
+    """
+    def __init__(self, client=None, reconcile_seconds: Optional[float] = 30.0, max_seen_fills: int = 100_000):
+        """
+        Args:
+            client (KalshiHttpClient): Client used to reconcile against GetPositions.
+            reconcile_seconds (Optional[float]): Interval between background reconciliations.
+            max_seen_fills (int): Fill ids remembered for de-duplication.
+        """
+        self.client = client
+        self.reconcile_seconds = reconcile_seconds
+        self.max_seen_fills = max_seen_fills
+        self.positions: Dict[str, MarketPosition] = {}
+        self.stats = {"fills": 0, "duplicates": 0, "reconciles": 0, "corrections": 0, "errors": 0}
+        self._seen: Dict[Tuple[Any, Any], None] = {}
+        self._fill_seq = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def position(self, ticker: str) -> int:
+        """Net contracts held in a market (YES positive, NO negative)."""
+        market = self.positions.get(ticker)
+        return market.position if market is not None else 0
+
+    def get(self, ticker: str) -> Optional[MarketPosition]:
+        return self.positions.get(ticker)
+
+    def open_positions(self) -> Dict[str, int]:
+        """{ticker: position} for every market with a non-zero position."""
+        return {ticker: market.position for ticker, market in list(self.positions.items()) if market.position}
+
+    def _market(self, ticker: str) -> MarketPosition:
+        market = self.positions.get(ticker)
+        if market is None:
+            market = self.positions[ticker] = MarketPosition(ticker)
+        return market
+
+    def apply_fill(self, ticker: str, side: str, action: str, count: int, yes_price: int,
+                   fill_id: Optional[Tuple[Any, Any]] = None) -> bool:
+        """
+        Books one of our fills. Opposite YES and NO contracts net out, as on the exchange.
+
+        Args:
+            ticker (str): Market ticker.
+            side (str): 'yes' or 'no'.
+            action (str): 'buy' or 'sell'.
+            count (int): Contracts filled.
+            yes_price (int): Fill price in cents, in YES terms.
+            fill_id (Optional[Tuple]): Unique id of the fill; a fill seen before is ignored.
+
+        Returns:
+            bool: False if the fill was a duplicate.
+        """
+        # Buying YES or selling NO adds YES exposure; the price paid is in the side we end up long
+        adds_yes = (side == "yes") == (action == "buy")
+        paid = yes_price if adds_yes else 100 - yes_price
+        with self._lock:
+            if fill_id is not None:
+                if fill_id in self._seen:
+                    self.stats["duplicates"] += 1
+                    return False
+                self._seen[fill_id] = None
+                if len(self._seen) > self.max_seen_fills:
+                    del self._seen[next(iter(self._seen))]
+            market = self._market(ticker)
+            old = market.position
+            new = old + count if adds_yes else old - count
+            netted = (abs(old) + count - abs(new)) // 2
+            released = market.cost * netted / abs(old) if old else 0.0
+            market.cost += paid * (count - netted) - released
+            market.realized_pnl += netted * (100 - paid) - released
+            market.position = new
+            market.total_traded += count
+            self._fill_seq += 1
+            market.last_fill_seq = self._fill_seq
+            self.stats["fills"] += 1
+        return True
+
+    def on_fill(self, message: Dict[str, Any]) -> None:
+        """Handler for the 'fill' WebSocket channel."""
+        fill = message.get("msg", message)
+        self.apply_fill(
+            fill["market_ticker"], fill["side"], fill.get("action", "buy"), fill["count"], fill["yes_price"],
+            (fill.get("trade_id"), fill.get("order_id")) if fill.get("trade_id") is not None else None,
+        )
+
+    def on_market_position(self, message: Dict[str, Any]) -> None:
+        """Handler for the 'market_positions' WebSocket channel, which carries the exchange's own totals."""
+        update = message.get("msg", message)
+        with self._lock:
+            market = self._market(update["market_ticker"])
+            market.position = update["position"]
+            if "position_cost" in update:
+                market.cost = update["position_cost"] / 100  # centi-cents
+            if "realized_pnl" in update:
+                market.realized_pnl = update["realized_pnl"] / 100
+            self._fill_seq += 1
+            market.last_fill_seq = self._fill_seq
+
+    def attach(self, ws_client, market_positions: bool = False) -> None:
+        """
+        Feeds the ledger from a KalshiWebSocketClient's fill (and optionally market_positions) channel.
+
+        Call before the client connects so the subscriptions go out with the first connect.
+        """
+        ws_client.subscriptions.want("fill")
+        ws_client.on("fill", self.on_fill, policy=INLINE)
+        if market_positions:
+            ws_client.subscriptions.want("market_positions")
+            ws_client.on("market_positions", self.on_market_position, policy=INLINE)
+
+    def load(self, market_positions: Iterable[Dict[str, Any]], since_seq: Optional[int] = None) -> int:
+        """
+        Overwrites the ledger with a REST positions snapshot.
+
+        Args:
+            market_positions (Iterable[Dict]): 'market_positions' entries from GetPositions.
+            since_seq (Optional[int]): Fill sequence number when the snapshot was requested.
+                Markets that had fills after it are left alone, and markets missing from the
+                snapshot are only zeroed when this is given.
+
+        Returns:
+            int: Number of markets whose position the snapshot corrected.
+        """
+        corrections = 0
+        with self._lock:
+            snapshot = {entry["ticker"]: entry for entry in market_positions}
+            tickers = set(snapshot) | (set(self.positions) if since_seq is not None else set())
+            for ticker in tickers:
+                market = self._market(ticker)
+                if since_seq is not None and market.last_fill_seq > since_seq:
+                    continue
+                entry = snapshot.get(ticker, {})
+                position = entry.get("position", 0)
+                if position != market.position:
+                    corrections += 1
+                market.position = position
+                market.cost = entry.get("market_exposure", market.cost if position else 0.0)
+                market.realized_pnl = entry.get("realized_pnl", market.realized_pnl)
+                market.total_traded = entry.get("total_traded", market.total_traded)
+        return corrections
+
+    def reconcile(self) -> int:
+        """
+        Compares the ledger with GetPositions and corrects any drift.
+
+        Returns:
+            int: Number of markets corrected.
+        """
+        since_seq = self._fill_seq
+        snapshot = list(self.client.iter_positions(count_filter="position"))
+        corrections = self.load(snapshot, since_seq=since_seq)
+        self.stats["reconciles"] += 1
+        self.stats["corrections"] += corrections
+        if corrections:
+            print(f"Position ledger: corrected {corrections} markets from REST")
+        return corrections
+
+    def start_background(self, initial: bool = True) -> Optional[threading.Thread]:
+        """
+        Reconciles every `reconcile_seconds` on a daemon thread.
+
+        Args:
+            initial (bool): Load the starting positions synchronously first, so the
+                ledger is complete before the caller starts trading.
+        """
+        if initial:
+            self.reconcile()
+        if self.reconcile_seconds is None:
+            return None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="position-ledger", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.reconcile_seconds):
+            try:
+                self.reconcile()
+            except (RequestException, KeyError, ValueError) as e:
+                self.stats["errors"] += 1
+                print(f"Position reconciliation failed: {e}")
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import websockets
+
+from dispatch import loads
+
+
+class PriceSource(NamedTuple):
+    """One streaming BTC reference price.
+
+    parse turns a decoded message into a price, or None for messages that
+    carry no price (subscription acks, heartbeats).
+    """
+    name: str
+    url: str
+    parse: Callable[[Any], Optional[float]]
+    subscribe: Optional[Dict[str, Any]] = None
+
+
+def _binance_trade(message):
+    return float(message["p"]) if message.get("e") == "trade" else None
+
+
+def _binance_options_index(message):
+    return float(message["p"]) if message.get("e") == "index" else None
+
+
+def _coinbase_ticker(message):
+    return float(message["price"]) if message.get("type") == "ticker" else None
+
+
+def _kraken_ticker(message):
+    if message.get("channel") != "ticker" or not message.get("data"):
+        return None
+    return float(message["data"][0]["last"])
+
+
+SOURCES = {
+    "binance": PriceSource("binance", "wss://stream.binance.com:9443/ws/btcusdt@trade", _binance_trade),
+    # Same index try.py polled over REST; Kalshi's BTC contracts settle on an index, not one venue's trades
+    "binance_index": PriceSource("binance_index", "wss://nbstream.binance.com/eoptions/ws/BTCUSDT@index",
+                                 _binance_options_index),
+    "coinbase": PriceSource("coinbase", "wss://ws-feed.exchange.coinbase.com", _coinbase_ticker,
+                            {"type": "subscribe", "product_ids": ["BTC-USD"], "channels": ["ticker"]}),
+    "kraken": PriceSource("kraken", "wss://ws.kraken.com/v2", _kraken_ticker,
+                          {"method": "subscribe", "params": {"channel": "ticker", "symbol": ["BTC/USD"]}}),
+}
+DEFAULT_SOURCES = ("binance", "coinbase", "kraken")
+
+MEDIAN = "median"
+LAST_GOOD = "last_good"
+
+
+class PriceSlot:
+    """Latest (price, timestamp, source) published by one writer, read by any thread.
+
+    The value is an immutable tuple swapped in with a single reference
+    assignment, so readers never lock and never see a torn update.
+    """
+    __slots__ = ("_value",)
+
+    def __init__(self):
+        self._value: Tuple[float, int, str] = (float("nan"), 0, "")
+
+    def publish(self, price: float, ts_ns: int, source: str = "") -> None:
+        self._value = (price, ts_ns, source)
+
+    def read(self) -> Tuple[float, int, str]:
+        """(price, monotonic timestamp in ns, source). Timestamp 0 means nothing was published."""
+        return self._value
+
+    def latest(self) -> Tuple[float, float]:
+        """(price, age in seconds). Age is infinite before the first publish."""
+        price, ts_ns, _ = self._value
+        if not ts_ns:
+            return price, float("inf")
+        return price, (time.monotonic_ns() - ts_ns) / 1e9
+
+
+class BtcPriceFeed:
+    """Streams BTC prices from several venues and publishes a combined reference price.
+
+    Each source runs its own WebSocket with reconnect and backoff. Every
+    update recombines the sources that are fresher than `max_age`: the
+    median of them, or with LAST_GOOD the most recent one. The result goes
+    into `slot`, which strategies read with latest() without any I/O.
+    """
+    def __init__(
+        self,
+        sources: Iterable[Any] = DEFAULT_SOURCES,
+        combine: str = MEDIAN,
+        max_age: float = 2.0,
+        max_deviation: Optional[float] = 0.01,
+    ):
+        """
+        Args:
+            sources (Iterable): PriceSource instances or names from SOURCES.
+            combine (str): MEDIAN or LAST_GOOD.
+            max_age (float): Seconds after which a source's price is ignored.
+            max_deviation (Optional[float]): With three or more fresh sources, drop any that is
+                further than this fraction from their median before combining.
+        """
+        self.sources: List[PriceSource] = [SOURCES[source] if isinstance(source, str) else source for source in sources]
+        if combine not in (MEDIAN, LAST_GOOD):
+            raise ValueError(f"combine must be {MEDIAN!r} or {LAST_GOOD!r}")
+        self.combine = combine
+        self.max_age = max_age
+        self.max_deviation = max_deviation
+        self.slots: Dict[str, PriceSlot] = {source.name: PriceSlot() for source in self.sources}
+        self.slot = PriceSlot()
+        self.updates = dict.fromkeys(self.slots, 0)
+        self.listeners: List[Callable[[str, float], Any]] = []
+        self.running = False
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def latest(self) -> Tuple[float, float]:
+        """(combined price, age in seconds). Never blocks and never touches the network."""
+        return self.slot.latest()
+
+    def price(self, max_age: Optional[float] = None) -> Optional[float]:
+        """The combined price, or None if it is older than `max_age` (default: the feed's max_age)."""
+        price, age = self.slot.latest()
+        return price if age <= (self.max_age if max_age is None else max_age) else None
+
+    def on_price(self, callback: Callable[[str, float], Any]) -> None:
+        """Calls callback(source, price) for every raw source update (e.g. MarketDataRecorder.record_btc)."""
+        self.listeners.append(callback)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the first price is published."""
+        return self._ready.wait(timeout)
+
+    def update(self, source: str, price: float, ts_ns: Optional[int] = None) -> None:
+        """Records a price from one source and republishes the combined price."""
+        now = time.monotonic_ns() if ts_ns is None else ts_ns
+        self.slots[source].publish(price, now, source)
+        self.updates[source] += 1
+        for callback in self.listeners:
+            callback(source, price)
+
+        cutoff = now - int(self.max_age * 1e9)
+        fresh = [slot.read() for slot in self.slots.values()]
+        fresh = [value for value in fresh if value[1] >= cutoff]
+        if not fresh:
+            return
+        if self.combine == LAST_GOOD:
+            price, _, name = max(fresh, key=lambda value: value[1])
+            self.slot.publish(price, now, name)
+        else:
+            prices = [value[0] for value in fresh]
+            middle = statistics.median(prices)
+            if self.max_deviation is not None and len(prices) >= 3:
+                kept = [p for p in prices if abs(p - middle) <= self.max_deviation * middle]
+                middle = statistics.median(kept) if kept else middle
+            self.slot.publish(middle, now, MEDIAN)
+        self._ready.set()
+
+    async def stream(self, source: PriceSource, initial_backoff: float = 0.5, max_backoff: float = 30.0) -> None:
+        """Consumes one source until stop(), reconnecting with jittered exponential backoff."""
+        backoff = initial_backoff
+        while self.running:
+            started = time.monotonic()
+            try:
+                async with websockets.connect(source.url, ping_interval=20, open_timeout=10) as ws:
+                    if source.subscribe is not None:
+                        await ws.send(json.dumps(source.subscribe))
+                    async for raw in ws:
+                        try:
+                            price = source.parse(loads(raw))
+                        except (KeyError, ValueError, TypeError, IndexError):
+                            continue
+                        if price is not None:
+                            self.update(source.name, price)
+                        if not self.running:
+                            return
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                print(f"BTC price source {source.name} disconnected: {e}")
+            if not self.running:
+                return
+            if time.monotonic() - started > max_backoff:
+                backoff = initial_backoff
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+            backoff = min(backoff * 2, max_backoff)
+
+    async def run(self) -> None:
+        """Streams every source concurrently until stop()."""
+        self.running = True
+        await asyncio.gather(*(self.stream(source) for source in self.sources))
+
+    def start_background(self) -> threading.Thread:
+        """Runs the feed on its own event loop in a daemon thread."""
+        self.running = True
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name="btc-price-feed", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Stops after each source's next message or reconnect attempt."""
+        self.running = False
@@ -0,0 +1,89 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+HOURS_PER_YEAR = 24 * 365
+
+_SQRT_2 = math.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+# Abramowitz & Stegun 7.1.26 coefficients (|error| < 1.5e-7)
+_P = 0.3275911
+_A1, _A2, _A3, _A4, _A5 = 0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429
+
+
+class BinaryGreeks(NamedTuple):
+    """Fair values and sensitivities for a ladder of binary (cash-or-nothing) calls."""
+    price: np.ndarray  # probability of finishing at or above the strike (0-1)
+    delta: np.ndarray  # d price / d spot, per $1
+    gamma: np.ndarray  # d delta / d spot, per $1
+    vega: np.ndarray   # d price / d IV, per 1 IV percentage point
+
+
+def norm_pdf(x):
+    """Standard normal density, elementwise."""
+    x = np.asarray(x, dtype=np.float64)
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def norm_cdf(x):
+    """Standard normal CDF, elementwise, without going through scipy.
+
+    Uses the Abramowitz & Stegun erf approximation, accurate to about 1e-7,
+    which is far below the 1 cent tick of a Kalshi contract.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    z = np.abs(x) / _SQRT_2
+    t = 1.0 / (1.0 + _P * z)
+    poly = t * (_A1 + t * (_A2 + t * (_A3 + t * (_A4 + t * _A5))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.copysign(erf, x))
+
+
+def binary_option_prices(S0, K, T_hours, IV_percent, r=0.0) -> BinaryGreeks:
+    """
+    Price a whole ladder of binary option contracts in one vectorized pass.
+
+    Same model as bitcoinstrat.binary_option_price, broadcast over NumPy arrays.
+
+    Parameters:
+    S0 (float or array): Current Bitcoin price.
+    K (array): Strike prices.
+    T_hours (array): Time to expiry in hours, per strike.
+    IV_percent (float or array): Implied volatility in percentage (e.g., 50 for 50%).
+    r (float): Risk-free rate (default is 0%).
+
+    Returns:
+    BinaryGreeks: Arrays of fair price, delta, gamma and vega. Expired contracts
+    are priced at intrinsic value (1 if S0 >= K else 0) with zero greeks.
+    """
+    S0, K, T_hours, IV_percent = np.broadcast_arrays(
+        np.asarray(S0, dtype=np.float64),
+        np.asarray(K, dtype=np.float64),
+        np.asarray(T_hours, dtype=np.float64),
+        np.asarray(IV_percent, dtype=np.float64),
+    )
+    T = T_hours / HOURS_PER_YEAR
+    sigma = IV_percent / 100
+    live = (T > 0) & (sigma > 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sig_sqrt_t = sigma * np.sqrt(T)
+        d2 = (np.log(S0 / K) + (r - 0.5 * sigma**2) * T) / sig_sqrt_t
+        d1 = d2 + sig_sqrt_t
+        discount = np.exp(-r * T)
+        pdf = norm_pdf(d2)
+
+        price = discount * norm_cdf(d2)
+        delta = discount * pdf / (S0 * sig_sqrt_t)
+        gamma = -discount * pdf * d1 / (S0**2 * sigma**2 * T)
+        vega = -discount * pdf * d1 / sigma / 100
+
+    intrinsic = (S0 >= K).astype(np.float64)
+    return BinaryGreeks(
+        price=np.where(live, price, intrinsic),
+        delta=np.where(live, delta, 0.0),
+        gamma=np.where(live, gamma, 0.0),
+        vega=np.where(live, vega, 0.0),
+    )
@@ -0,0 +1,188 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket usable from both threads and asyncio tasks.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so a
+    caller that has been idle can burst up to `capacity` requests at once.
+    """
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            capacity (Optional[float]): Maximum number of tokens held. Defaults to `rate`
+                (one second worth of burst).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last = now
+
+    def _take(self, n: float) -> float:
+        """Takes n tokens if available. Returns 0 on success, otherwise seconds to wait."""
+        if n > self.capacity:
+            raise ValueError(f"cannot acquire {n} tokens from a bucket of capacity {self.capacity}")
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= n:
+                self._tokens -= n
+                return 0.0
+            return (n - self._tokens) / self.rate
+
+    def _refund(self, n: float) -> None:
+        """Returns tokens taken for a request that will not be sent."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + n)
+
+    def _seconds_until(self, n: float) -> float:
+        """Least time before n tokens (possibly more than capacity) can all have been taken."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(n - self._tokens, 0.0) / self.rate
+
+    @property
+    def tokens(self) -> float:
+        """Current number of available tokens."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the bucket currently spent (0 = idle, 1 = saturated)."""
+        return 1.0 - self.tokens / self.capacity
+
+    def try_acquire(self, n: float = 1) -> bool:
+        """Takes n tokens without waiting. Returns False if not enough are available."""
+        return self._take(n) == 0.0
+
+    def acquire(self, n: float = 1, timeout: Optional[float] = None) -> bool:
+        """Blocks the calling thread until n tokens are available.
+
+        Args:
+            n (float): Number of tokens to take. Amounts above the bucket capacity
+                (e.g. a large batch) are taken in capacity-sized pieces.
+            timeout (Optional[float]): Give up after this many seconds. None waits forever.
+
+        Returns:
+            bool: True if the tokens were taken, False on timeout. On timeout no tokens
+            are kept: pieces already taken are refunded.
+        """
+        if timeout is not None and self._seconds_until(n) > timeout:
+            return False
+        deadline = None if timeout is None else time.monotonic() + timeout
+        taken = 0.0
+        while taken < n:
+            piece = min(n - taken, self.capacity)
+            wait = self._take(piece)
+            if wait == 0.0:
+                taken += piece
+                continue
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if taken:
+                        self._refund(taken)
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, n: float = 1, timeout: Optional[float] = None) -> bool:
+        """Awaits until n tokens are available without blocking the event loop.
+
+        Args:
+            n (float): Number of tokens to take. Amounts above the bucket capacity
+                are taken in capacity-sized pieces.
+            timeout (Optional[float]): Give up after this many seconds. None waits forever.
+
+        Returns:
+            bool: True if the tokens were taken, False on timeout. On timeout no tokens
+            are kept: pieces already taken are refunded.
+        """
+        if timeout is not None and self._seconds_until(n) > timeout:
+            return False
+        deadline = None if timeout is None else time.monotonic() + timeout
+        taken = 0.0
+        try:
+            while taken < n:
+                piece = min(n - taken, self.capacity)
+                wait = self._take(piece)
+                if wait == 0.0:
+                    taken += piece
+                    continue
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._refund(taken)
+                        taken = 0.0
+                        return False
+                    wait = min(wait, remaining)
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # A cancelled caller will not send the request either
+            if taken < n:
+                self._refund(taken)
+            raise
+        return True
+
+
+class RateLimiter:
+    """Separate read and write token buckets for the Kalshi API.
+
+    GET requests draw from the read bucket; POST, PUT and DELETE draw from the
+    write bucket. One instance can be shared by several clients, threads and
+    event loops so they all stay inside the same account budget.
+    """
+    WRITE_METHODS = frozenset({"POST", "PUT", "DELETE"})
+
+    def __init__(
+        self,
+        read_rate: float = 20.0,
+        write_rate: float = 10.0,
+        read_burst: Optional[float] = None,
+        write_burst: Optional[float] = None,
+    ):
+        """
+        Args:
+            read_rate (float): Read requests allowed per second.
+            write_rate (float): Write requests allowed per second.
+            read_burst (Optional[float]): Read bucket size. Defaults to read_rate.
+            write_burst (Optional[float]): Write bucket size. Defaults to write_rate.
+        """
+        self.read = TokenBucket(read_rate, read_burst)
+        self.write = TokenBucket(write_rate, write_burst)
+
+    def bucket(self, method: str) -> TokenBucket:
+        """Returns the bucket that requests with this HTTP method draw from."""
+        return self.write if method.upper() in self.WRITE_METHODS else self.read
+
+    def tokens(self, method: str = "GET") -> float:
+        """Current number of available tokens for this HTTP method."""
+        return self.bucket(method).tokens
+
+    def try_acquire(self, method: str = "GET", n: float = 1) -> bool:
+        """Takes n tokens for this HTTP method without waiting."""
+        return self.bucket(method).try_acquire(n)
+
+    def acquire(self, method: str = "GET", n: float = 1, timeout: Optional[float] = None) -> bool:
+        """Blocks the calling thread until n tokens are available for this HTTP method."""
+        return self.bucket(method).acquire(n, timeout)
+
+    async def acquire_async(self, method: str = "GET", n: float = 1, timeout: Optional[float] = None) -> bool:
+        """Awaits until n tokens are available for this HTTP method."""
+        return await self.bucket(method).acquire_async(n, timeout)
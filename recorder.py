@@ -0,0 +1,300 @@
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from dispatch import INLINE
+
+# Fixed-width record layouts, one append-only stream per kind
+TICK_DTYPE = np.dtype([
+    ("ts_ns", "<i8"),          # local receive time
+    ("ticker_id", "<u4"),
+    ("price", "<i2"),          # last trade price, cents
+    ("yes_bid", "<i2"),
+    ("yes_ask", "<i2"),
+    ("_pad", "<i2"),
+    ("volume", "<i8"),
+    ("open_interest", "<i8"),
+])
+BOOK_DTYPE = np.dtype([
+    ("ts_ns", "<i8"),
+    ("seq", "<i8"),
+    ("ticker_id", "<u4"),
+    ("price", "<i2"),          # cents
+    ("side", "u1"),            # 0 = yes, 1 = no
+    ("snapshot", "u1"),        # 1 for a snapshot level (delta holds the full count)
+    ("delta", "<i8"),
+])
+BTC_DTYPE = np.dtype([
+    ("ts_ns", "<i8"),
+    ("source_id", "<u4"),
+    ("_pad", "<u4"),
+    ("price", "<f8"),
+])
+STREAMS = {"ticks": TICK_DTYPE, "book": BOOK_DTYPE, "btc": BTC_DTYPE}
+SIDE_CODES = {"yes": 0, "no": 1}
+
+# File header: magic, version, record size, record count, first/last ts_ns
+HEADER = struct.Struct("<4sHxxIQqq")
+HEADER_SIZE = 64
+MAGIC = b"KREC"
+VERSION = 1
+
+
+class RecordFile:
+    """One fixed-capacity, memory-mapped file of fixed-width records."""
+    def __init__(self, path: str, dtype: np.dtype, capacity: int):
+        self.path = path
+        self.dtype = dtype
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * dtype.itemsize
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT)
+        os.ftruncate(self._fd, size)
+        self._mmap = mmap.mmap(self._fd, size)
+        self.records = np.ndarray((capacity,), dtype=dtype, buffer=self._mmap, offset=HEADER_SIZE)
+        self.count = 0
+        self.first_ts = 0
+        self.last_ts = 0
+        self._write_header()
+
+    def _write_header(self) -> None:
+        HEADER.pack_into(self._mmap, 0, MAGIC, VERSION, self.dtype.itemsize, self.count, self.first_ts, self.last_ts)
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def append(self, record: tuple) -> None:
+        self.records[self.count] = record
+        ts = record[0]
+        if self.count == 0:
+            self.first_ts = ts
+        self.last_ts = ts
+        self.count += 1
+        # Count is published after the record so readers never see a half-written row
+        self._write_header()
+
+    def close(self) -> None:
+        """Trims unused capacity and releases the mapping."""
+        self._mmap.flush()
+        del self.records
+        self._mmap.close()
+        os.ftruncate(self._fd, HEADER_SIZE + self.count * self.dtype.itemsize)
+        os.close(self._fd)
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        magic, version, itemsize, count, first_ts, last_ts = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a recorder file")
+    return {"version": version, "itemsize": itemsize, "count": count, "first_ts": first_ts, "last_ts": last_ts}
+
+
+class MarketDataRecorder:
+    """Appends ticks, orderbook deltas and BTC prices to rotating memory-mapped files.
+
+    Layout under `root`:
+        tickers.json           ticker_id -> market ticker (and source_id -> BTC source)
+        ticks/000000.rec ...   TICK_DTYPE records
+        book/000000.rec ...    BOOK_DTYPE records
+        btc/000000.rec ...     BTC_DTYPE records
+
+    The WebSocket receive loop only puts messages on a queue; a writer
+    thread converts them and copies them into the mapped files.
+    """
+    def __init__(self, root: str, records_per_file: int = 1 << 20):
+        """
+        Args:
+            root (str): Directory the streams are written to.
+            records_per_file (int): Capacity of each file before rotating to the next one.
+        """
+        self.root = root
+        self.records_per_file = records_per_file
+        os.makedirs(root, exist_ok=True)
+        self.ticker_ids: Dict[str, int] = {}
+        self.source_ids: Dict[str, int] = {}
+        self._load_symbols()
+        self._files: Dict[str, RecordFile] = {}
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._symbols_dirty = False
+        self._writer = threading.Thread(target=self._run, name="market-data-recorder", daemon=True)
+        self._writer.start()
+
+    # Symbol tables
+
+    def _symbols_path(self) -> str:
+        return os.path.join(self.root, "tickers.json")
+
+    def _load_symbols(self) -> None:
+        if os.path.exists(self._symbols_path()):
+            with open(self._symbols_path()) as f:
+                symbols = json.load(f)
+            self.ticker_ids = {ticker: i for i, ticker in enumerate(symbols["tickers"])}
+            self.source_ids = {source: i for i, source in enumerate(symbols["sources"])}
+
+    def _save_symbols(self) -> None:
+        tmp = self._symbols_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"tickers": list(self.ticker_ids), "sources": list(self.source_ids)}, f)
+        os.replace(tmp, self._symbols_path())
+        self._symbols_dirty = False
+
+    def _ticker_id(self, ticker: str) -> int:
+        ticker_id = self.ticker_ids.get(ticker)
+        if ticker_id is None:
+            ticker_id = self.ticker_ids[ticker] = len(self.ticker_ids)
+            self._symbols_dirty = True
+        return ticker_id
+
+    def _source_id(self, source: str) -> int:
+        source_id = self.source_ids.get(source)
+        if source_id is None:
+            source_id = self.source_ids[source] = len(self.source_ids)
+            self._symbols_dirty = True
+        return source_id
+
+    # Producer side: cheap, called from the receive loop or the price feed
+
+    def record_message(self, message: Dict[str, Any]) -> None:
+        """Queues a decoded WebSocket message for recording."""
+        self._queue.put((time.time_ns(), message))
+
+    def record_btc(self, price: float, source: str = "binance", ts_ns: Optional[int] = None) -> None:
+        """Queues a BTC reference price for recording."""
+        self._queue.put((ts_ns or time.time_ns(), ("btc", source, price)))
+
+    def attach(self, ws_client) -> None:
+        """Records ticker and orderbook messages received by a KalshiWebSocketClient."""
+        ws_client.on("ticker", self.record_message, policy=INLINE)
+        ws_client.on("orderbook_delta", self.record_message, policy=INLINE)
+
+    # Writer side
+
+    def _append(self, stream: str, record: tuple) -> None:
+        current = self._files.get(stream)
+        if current is None or current.full:
+            if current is not None:
+                current.close()
+            current = self._files[stream] = self._open_next(stream)
+        current.append(record)
+
+    def _open_next(self, stream: str) -> RecordFile:
+        directory = os.path.join(self.root, stream)
+        os.makedirs(directory, exist_ok=True)
+        existing = sorted(name for name in os.listdir(directory) if name.endswith(".rec"))
+        index = int(existing[-1][:-4]) + 1 if existing else 0
+        path = os.path.join(directory, f"{index:06d}.rec")
+        return RecordFile(path, STREAMS[stream], self.records_per_file)
+
+    def _write(self, ts_ns: int, item) -> None:
+        if isinstance(item, tuple):
+            _, source, price = item
+            self._append("btc", (ts_ns, self._source_id(source), 0, price))
+            return
+        msg_type = item.get("type")
+        body = item.get("msg") or {}
+        ticker = body.get("market_ticker")
+        if ticker is None:
+            return
+        ticker_id = self._ticker_id(ticker)
+        if msg_type == "ticker":
+            self._append("ticks", (
+                ts_ns, ticker_id,
+                body.get("price") or 0, body.get("yes_bid") or 0, body.get("yes_ask") or 0, 0,
+                body.get("volume") or 0, body.get("open_interest") or 0,
+            ))
+        elif msg_type == "orderbook_delta":
+            self._append("book", (
+                ts_ns, item.get("seq") or 0, ticker_id,
+                body["price"], SIDE_CODES[body["side"]], 0, body["delta"],
+            ))
+        elif msg_type == "orderbook_snapshot":
+            seq = item.get("seq") or 0
+            for side, code in SIDE_CODES.items():
+                for price, count in body.get(side) or ():
+                    self._append("book", (ts_ns, seq, ticker_id, price, code, 1, count))
+
+    def _run(self) -> None:
+        while True:
+            ts_ns, item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(ts_ns, item)
+            except Exception as e:
+                print(f"Recorder failed to write {item!r}: {e}")
+            if self._symbols_dirty and self._queue.empty():
+                self._save_symbols()
+        if self._symbols_dirty:
+            self._save_symbols()
+
+    def close(self) -> None:
+        """Writes everything still queued and closes the files."""
+        self._queue.put((0, None))
+        self._writer.join()
+        for record_file in self._files.values():
+            record_file.close()
+        self._files.clear()
+
+
+class MarketDataReader:
+    """Zero-copy NumPy views over files written by MarketDataRecorder."""
+    def __init__(self, root: str):
+        self.root = root
+        with open(os.path.join(root, "tickers.json")) as f:
+            symbols = json.load(f)
+        self.tickers: List[str] = symbols["tickers"]
+        self.sources: List[str] = symbols["sources"]
+        self.ticker_ids = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    def files(self, stream: str) -> List[str]:
+        directory = os.path.join(self.root, stream)
+        if not os.path.isdir(directory):
+            return []
+        return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith(".rec")]
+
+    def views(self, stream: str, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Iterator[np.ndarray]:
+        """Yields a read-only memory-mapped view per file, trimmed to [start_ns, end_ns).
+
+        Files entirely outside the range are skipped using their header, and the
+        range inside a file is found by binary search on ts_ns.
+        """
+        dtype = STREAMS[stream]
+        for path in self.files(stream):
+            header = read_header(path)
+            if header["count"] == 0:
+                continue
+            if end_ns is not None and header["first_ts"] >= end_ns:
+                continue
+            if start_ns is not None and header["last_ts"] < start_ns:
+                continue
+            records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(header["count"],))
+            lo = 0 if start_ns is None else np.searchsorted(records["ts_ns"], start_ns, side="left")
+            hi = len(records) if end_ns is None else np.searchsorted(records["ts_ns"], end_ns, side="left")
+            yield records[lo:hi]
+
+    def load(self, stream: str, start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+             ticker: Optional[str] = None) -> np.ndarray:
+        """All records of a stream in a time range, optionally for one ticker.
+
+        Returns a view when the range sits in a single file and no ticker filter is
+        applied; otherwise the matching rows are copied into one array.
+        """
+        views = list(self.views(stream, start_ns, end_ns))
+        if ticker is not None:
+            ticker_id = self.ticker_ids.get(ticker)
+            if ticker_id is None:
+                return np.empty(0, dtype=STREAMS[stream])
+            views = [view[view["ticker_id"] == ticker_id] for view in views]
+        if len(views) == 1:
+            return views[0]
+        if not views:
+            return np.empty(0, dtype=STREAMS[stream])
+        return np.concatenate(views)
@@ -0,0 +1,232 @@
+"""Compact typed forms of Kalshi market, orderbook and position payloads.
+
+Raw JSON dicts carry every field the API sends (titles, rules text, ...)
+and resolve each access through a string-keyed hash lookup. The record
+types here keep only the fields the strategies use, in __slots__, and the
+columnar forms hold a whole set in one NumPy structured array.
+
+    markets = client.get_markets(series_ticker="KXBTCD", form=RECORDS)
+    markets[0].floor_strike
+
+    columns = client.get_markets(series_ticker="KXBTCD", form=COLUMNS)
+    columns["floor_strike"][columns["yes_ask"] >= 90]
+"""
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from marketdata import parse_timestamp
+
+DICT = "dict"
+RECORDS = "records"
+COLUMNS = "columns"
+FORMS = (DICT, RECORDS, COLUMNS)
+
+# Strings are stored as fixed-width bytes; Kalshi tickers are ASCII
+MARKET_DTYPE = np.dtype([
+    ("ticker", "S64"),
+    ("event_ticker", "S48"),
+    ("status", "S16"),
+    ("yes_bid", np.int16),
+    ("yes_ask", np.int16),
+    ("no_bid", np.int16),
+    ("no_ask", np.int16),
+    ("last_price", np.int16),
+    ("volume", np.int64),
+    ("volume_24h", np.int64),
+    ("open_interest", np.int64),
+    ("floor_strike", np.float64),  # NaN where the market has none
+    ("cap_strike", np.float64),
+    ("close_ts", np.float64),      # UNIX seconds
+    ("expiration_ts", np.float64),
+])
+
+POSITION_DTYPE = np.dtype([
+    ("ticker", "S64"),
+    ("position", np.int64),
+    ("market_exposure", np.int64),
+    ("realized_pnl", np.int64),
+    ("total_traded", np.int64),
+    ("resting_orders_count", np.int64),
+    ("fees_paid", np.int64),
+])
+
+
+def _strike(value: Any) -> float:
+    return float(value) if value is not None else math.nan
+
+
+class MarketRecord:
+    """The fields of a market the strategies read, with close and expiration times parsed once."""
+    __slots__ = tuple(MARKET_DTYPE.names)
+
+    def __init__(self, ticker: str, event_ticker: str = "", status: str = "", yes_bid: int = 0, yes_ask: int = 0,
+                 no_bid: int = 0, no_ask: int = 0, last_price: int = 0, volume: int = 0, volume_24h: int = 0,
+                 open_interest: int = 0, floor_strike: float = math.nan, cap_strike: float = math.nan,
+                 close_ts: float = math.nan, expiration_ts: float = math.nan):
+        self.ticker = ticker
+        self.event_ticker = event_ticker
+        self.status = status
+        self.yes_bid = yes_bid
+        self.yes_ask = yes_ask
+        self.no_bid = no_bid
+        self.no_ask = no_ask
+        self.last_price = last_price
+        self.volume = volume
+        self.volume_24h = volume_24h
+        self.open_interest = open_interest
+        self.floor_strike = floor_strike
+        self.cap_strike = cap_strike
+        self.close_ts = close_ts
+        self.expiration_ts = expiration_ts
+
+    @classmethod
+    def from_dict(cls, market: Dict[str, Any]) -> "MarketRecord":
+        get = market.get
+        return cls(
+            market["ticker"], get("event_ticker") or "", get("status") or "",
+            get("yes_bid") or 0, get("yes_ask") or 0, get("no_bid") or 0, get("no_ask") or 0,
+            get("last_price") or 0, get("volume") or 0, get("volume_24h") or 0, get("open_interest") or 0,
+            _strike(get("floor_strike")), _strike(get("cap_strike")),
+            parse_timestamp(get("close_time")), parse_timestamp(get("expiration_time")),
+        )
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"MarketRecord({self.ticker} {self.yes_bid}/{self.yes_ask} vol={self.volume})"
+
+
+class PositionRecord:
+    """One entry of GetPositions' market_positions."""
+    __slots__ = tuple(POSITION_DTYPE.names)
+
+    def __init__(self, ticker: str, position: int = 0, market_exposure: int = 0, realized_pnl: int = 0,
+                 total_traded: int = 0, resting_orders_count: int = 0, fees_paid: int = 0):
+        self.ticker = ticker
+        self.position = position
+        self.market_exposure = market_exposure
+        self.realized_pnl = realized_pnl
+        self.total_traded = total_traded
+        self.resting_orders_count = resting_orders_count
+        self.fees_paid = fees_paid
+
+    @classmethod
+    def from_dict(cls, position: Dict[str, Any]) -> "PositionRecord":
+        get = position.get
+        return cls(position["ticker"], get("position") or 0, get("market_exposure") or 0, get("realized_pnl") or 0,
+                   get("total_traded") or 0, get("resting_orders_count") or 0, get("fees_paid") or 0)
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"PositionRecord({self.ticker} {self.position:+d})"
+
+
+class OrderbookRecord:
+    """A GetMarketOrderbook response as price and count arrays per side, ascending like the REST payload."""
+    __slots__ = ("ticker", "yes_prices", "yes_counts", "no_prices", "no_counts")
+
+    def __init__(self, ticker: str, yes_prices: np.ndarray, yes_counts: np.ndarray,
+                 no_prices: np.ndarray, no_counts: np.ndarray):
+        self.ticker = ticker
+        self.yes_prices = yes_prices
+        self.yes_counts = yes_counts
+        self.no_prices = no_prices
+        self.no_counts = no_counts
+
+    @classmethod
+    def from_response(cls, ticker: str, response: Dict[str, Any]) -> "OrderbookRecord":
+        book = response.get("orderbook") or {}
+        sides = []
+        for side in ("yes", "no"):
+            levels = np.array(book.get(side) or (), dtype=np.int32).reshape(-1, 2)
+            sides += [levels[:, 0].copy(), levels[:, 1].copy()]
+        return cls(ticker, *sides)
+
+    def best_bid(self, side: str = "yes") -> Optional[int]:
+        """Highest bid on a side in cents, or None if that side is empty."""
+        prices = self.yes_prices if side == "yes" else self.no_prices
+        return int(prices[-1]) if len(prices) else None
+
+    def best_ask(self, side: str = "yes") -> Optional[int]:
+        """Lowest ask on a side in cents (100 minus the best bid on the other side)."""
+        other = self.best_bid("no" if side == "yes" else "yes")
+        return 100 - other if other is not None else None
+
+    def as_orderbook(self) -> Dict[str, Any]:
+        """Back to the REST response shape."""
+        return {"orderbook": {
+            "yes": [[int(p), int(c)] for p, c in zip(self.yes_prices, self.yes_counts)] or None,
+            "no": [[int(p), int(c)] for p, c in zip(self.no_prices, self.no_counts)] or None,
+        }}
+
+    def __repr__(self):
+        return f"OrderbookRecord({self.ticker} {self.best_bid('yes')}/{self.best_ask('yes')})"
+
+
+def market_records(markets: Iterable[Dict[str, Any]]) -> List[MarketRecord]:
+    return [MarketRecord.from_dict(market) for market in markets]
+
+
+def market_columns(markets: Iterable[Any]) -> np.ndarray:
+    """Markets (raw dicts or MarketRecords) as one structured array with MARKET_DTYPE."""
+    rows = [(market if isinstance(market, MarketRecord) else MarketRecord.from_dict(market)).as_tuple()
+            for market in markets]
+    return np.array(rows, dtype=MARKET_DTYPE)
+
+
+def position_records(positions: Iterable[Dict[str, Any]]) -> List[PositionRecord]:
+    return [PositionRecord.from_dict(position) for position in positions]
+
+
+def position_columns(positions: Iterable[Any]) -> np.ndarray:
+    """Positions (raw dicts or PositionRecords) as one structured array with POSITION_DTYPE."""
+    rows = [(position if isinstance(position, PositionRecord) else PositionRecord.from_dict(position)).as_tuple()
+            for position in positions]
+    return np.array(rows, dtype=POSITION_DTYPE)
+
+
+def convert_markets(markets: List[Dict[str, Any]], form: str = DICT):
+    """Returns get_markets results in the requested form."""
+    if form == DICT:
+        return markets
+    if form == RECORDS:
+        return market_records(markets)
+    if form == COLUMNS:
+        return market_columns(markets)
+    raise ValueError(f"form must be one of {FORMS}")
+
+
+def convert_positions(response: Dict[str, Any], form: str = DICT) -> Dict[str, Any]:
+    """Returns a GetPositions response with its market_positions in the requested form."""
+    if form == DICT:
+        return response
+    positions = response.get("market_positions") or []
+    if form == RECORDS:
+        return {**response, "market_positions": position_records(positions)}
+    if form == COLUMNS:
+        return {**response, "market_positions": position_columns(positions)}
+    raise ValueError(f"form must be one of {FORMS}")
+
+
+def convert_orderbook(ticker: str, response: Dict[str, Any], form: str = DICT):
+    """Returns a GetMarketOrderbook response in the requested form.
+
+    An OrderbookRecord already holds its levels as arrays, so RECORDS and
+    COLUMNS both return one.
+    """
+    if form == DICT:
+        return response
+    if form in (RECORDS, COLUMNS):
+        return OrderbookRecord.from_response(ticker, response)
+    raise ValueError(f"form must be one of {FORMS}")
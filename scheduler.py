@@ -0,0 +1,177 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# A step runs one iteration of a task and returns the delay before its next
+# run, or None to use the task's period.
+Step = Callable[[], Awaitable[Optional[float]]]
+
+
+class ScheduledTask:
+    """One recurring strategy instance, e.g. liquidity provision on a single market."""
+    __slots__ = ("name", "step", "period", "priority", "deadline", "next_run", "running", "cancelled",
+                 "runs", "missed", "errors", "last_error")
+
+    def __init__(self, name: str, step: Step, period: float, priority: float = 0.0, deadline: Optional[float] = None):
+        self.name = name
+        self.step = step
+        self.period = period
+        self.priority = priority
+        self.deadline = deadline
+        self.next_run = time.monotonic()
+        self.running = False
+        self.cancelled = False
+        self.runs = 0
+        self.missed = 0
+        self.errors = 0
+        self.last_error: Optional[BaseException] = None
+
+    def __repr__(self):
+        return f"ScheduledTask({self.name} priority={self.priority} runs={self.runs} missed={self.missed})"
+
+
+class Scheduler:
+    """Runs many recurring tasks cooperatively on one event loop.
+
+    Tasks wait in a heap ordered by their next run time. Once due, they
+    move to a ready queue ordered by priority (highest first), then by how
+    soon their deadline expires, and at most `max_concurrency` steps run at
+    once. A task that is still queued `deadline` seconds after it fell due
+    is skipped for that cycle and counted as missed, so under load the
+    low-priority markets are shed rather than everything running late.
+
+    Tasks share whatever they close over: one client, one rate limiter and
+    one market-data stream for the whole process.
+    """
+    def __init__(self, max_concurrency: int = 8):
+        """
+        Args:
+            max_concurrency (int): Steps allowed to run at the same time.
+        """
+        self.max_concurrency = max_concurrency
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self._waiting: List[Tuple[float, int, ScheduledTask]] = []
+        self._ready: List[Tuple[float, float, int, ScheduledTask]] = []
+        self._seq = itertools.count()
+        self._wake: Optional[asyncio.Event] = None
+        self._running = False
+
+    def add(self, name: str, step: Step, period: float, priority: float = 0.0,
+            deadline: Optional[float] = None, delay: float = 0.0) -> ScheduledTask:
+        """
+        Schedules a recurring task. A task with the same name is replaced.
+
+        Args:
+            name (str): Unique task name, e.g. the market ticker.
+            step (Step): Coroutine function running one iteration.
+            period (float): Seconds between runs when the step does not say otherwise.
+            priority (float): Higher runs first when several tasks are due together.
+            deadline (Optional[float]): Seconds after falling due by which a run must start.
+            delay (float): Seconds before the first run.
+        """
+        self.remove(name)
+        task = ScheduledTask(name, step, period, priority, deadline)
+        task.next_run = time.monotonic() + delay
+        self.tasks[name] = task
+        self._push(task)
+        return task
+
+    def remove(self, name: str) -> None:
+        """Stops scheduling a task. A step already running finishes first."""
+        task = self.tasks.pop(name, None)
+        if task is not None:
+            task.cancelled = True
+
+    def set_priority(self, name: str, priority: float) -> None:
+        """Changes a task's priority from its next run on, e.g. as market volume changes."""
+        task = self.tasks.get(name)
+        if task is not None:
+            task.priority = priority
+
+    def _push(self, task: ScheduledTask) -> None:
+        heapq.heappush(self._waiting, (task.next_run, next(self._seq), task))
+        if self._wake is not None:
+            self._wake.set()
+
+    def _promote(self, now: float) -> None:
+        while self._waiting and self._waiting[0][0] <= now:
+            _, seq, task = heapq.heappop(self._waiting)
+            if task.cancelled:
+                continue
+            expires = task.next_run + task.deadline if task.deadline is not None else float("inf")
+            heapq.heappush(self._ready, (-task.priority, expires, seq, task))
+
+    async def _run_task(self, task: ScheduledTask, semaphore: asyncio.Semaphore) -> None:
+        try:
+            delay = await task.step()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            task.errors += 1
+            task.last_error = e
+            print(f"Task {task.name} failed: {e}")
+            delay = None
+        finally:
+            task.running = False
+            semaphore.release()
+            self._wake.set()
+        task.runs += 1
+        if not task.cancelled:
+            task.next_run = time.monotonic() + (task.period if delay is None else delay)
+            self._push(task)
+
+    async def run(self) -> None:
+        """Runs due tasks until stop()."""
+        self._running = True
+        self._wake = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        running = set()
+        try:
+            while self._running:
+                now = time.monotonic()
+                self._promote(now)
+                while self._ready and not semaphore.locked():
+                    _, expires, _, task = heapq.heappop(self._ready)
+                    if task.cancelled:
+                        continue
+                    if now > expires:
+                        task.missed += 1
+                        task.next_run = now + task.period
+                        self._push(task)
+                        continue
+                    await semaphore.acquire()
+                    task.running = True
+                    job = asyncio.ensure_future(self._run_task(task, semaphore))
+                    running.add(job)
+                    job.add_done_callback(running.discard)
+
+                self._wake.clear()
+                if self._ready:
+                    # Every slot is busy; a finishing step sets _wake
+                    timeout = None
+                elif self._waiting:
+                    timeout = max(self._waiting[0][0] - time.monotonic(), 0)
+                else:
+                    timeout = None
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for job in running:
+                job.cancel()
+
+    def stop(self) -> None:
+        """Makes run() return after its current wake-up."""
+        self._running = False
+        if self._wake is not None:
+            self._wake.set()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Runs, misses and errors per task."""
+        return {
+            name: {"priority": task.priority, "runs": task.runs, "missed": task.missed, "errors": task.errors}
+            for name, task in self.tasks.items()
+        }
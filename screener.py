@@ -0,0 +1,203 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from dispatch import INLINE
+from marketdata import parse_timestamp
+
+# (low, high) bounds, both inclusive; None leaves that end open
+Range = Tuple[Optional[float], Optional[float]]
+
+DEFAULT_INDEXES = ("yes_ask", "yes_bid", "volume", "volume_24h", "close_ts")
+_value = itemgetter(0)
+
+
+class SortedIndex:
+    """(value, ticker) pairs kept sorted, for range lookups on one market field."""
+    __slots__ = ("entries",)
+
+    def __init__(self):
+        self.entries: List[Tuple[float, str]] = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, value: float, ticker: str) -> None:
+        insort(self.entries, (value, ticker))
+
+    def remove(self, value: float, ticker: str) -> None:
+        i = bisect_left(self.entries, (value, ticker))
+        if i < len(self.entries) and self.entries[i] == (value, ticker):
+            del self.entries[i]
+
+    def bounds(self, bounds: Range) -> Tuple[int, int]:
+        """Slice of entries whose value lies in the range."""
+        lo, hi = bounds
+        start = 0 if lo is None else bisect_left(self.entries, lo, key=_value)
+        stop = len(self.entries) if hi is None else bisect_right(self.entries, hi, key=_value)
+        return start, max(start, stop)
+
+
+class MarketScreener:
+    """Market universe with secondary indexes, kept current from ticker updates.
+
+    Each indexed field (yes_ask, volume, close_ts, ...) has a sorted index,
+    so a query with range predicates costs a binary search per field plus
+    a walk over the markets in the narrowest range, instead of a rescan of
+    every market. load() seeds the screener from get_markets; on_ticker()
+    then moves single markets between index positions as their prices and
+    volume change.
+
+    Ticker messages carry cumulative volume but not volume_24h, so each
+    volume increase is added to volume_24h as it happens. Trades that age
+    out of the 24h window are only dropped on the next load(), which should
+    be repeated every few minutes (MarketCatalog does the same for listings).
+    """
+    def __init__(self, indexes: Iterable[str] = DEFAULT_INDEXES):
+        """
+        Args:
+            indexes (Iterable[str]): Market fields to keep sorted indexes for. 'close_ts' is
+                close_time in UNIX seconds.
+        """
+        self.markets: Dict[str, Dict[str, Any]] = {}
+        self.indexes: Dict[str, SortedIndex] = {field: SortedIndex() for field in indexes}
+        self.updates = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.markets)
+
+    def get(self, ticker: str) -> Optional[Dict[str, Any]]:
+        return self.markets.get(ticker)
+
+    def _set(self, ticker: str, fields: Dict[str, Any]) -> None:
+        market = self.markets.get(ticker)
+        if market is None:
+            market = self.markets[ticker] = {"ticker": ticker}
+        for field, value in fields.items():
+            index = self.indexes.get(field)
+            if index is not None:
+                old = market.get(field)
+                if old == value:
+                    continue
+                if old is not None:
+                    index.remove(old, ticker)
+                if value is not None:
+                    index.add(value, ticker)
+            market[field] = value
+
+    def load(self, markets: Iterable[Dict[str, Any]], replace: bool = False) -> int:
+        """
+        Adds or refreshes markets from get_markets results.
+
+        Args:
+            markets (Iterable[Dict]): Raw market dicts, e.g. client.iter_markets(status="open").
+            replace (bool): Drop markets that are not in `markets`.
+
+        Returns:
+            int: Number of markets loaded.
+        """
+        seen = set()
+        with self._lock:
+            for market in markets:
+                ticker = market["ticker"]
+                row = self.markets.setdefault(ticker, {"ticker": ticker})
+                row.update(market)
+                close_ts = parse_timestamp(market.get("close_time"))
+                row["close_ts"] = None if close_ts != close_ts else close_ts  # NaN: no close time
+                seen.add(ticker)
+            if replace:
+                for ticker in set(self.markets) - seen:
+                    del self.markets[ticker]
+            # A bulk load touches most rows, so sorting once beats moving each entry
+            for field, index in self.indexes.items():
+                index.entries = sorted(
+                    (market[field], ticker) for ticker, market in self.markets.items() if market.get(field) is not None
+                )
+        return len(seen)
+
+    def update(self, ticker: str, **fields: Any) -> None:
+        """Changes fields of one market, moving it within the affected indexes."""
+        with self._lock:
+            self._set(ticker, fields)
+
+    def on_ticker(self, message: Dict[str, Any]) -> None:
+        """Handler for the 'ticker' WebSocket channel."""
+        update = message.get("msg", message)
+        ticker = update.get("market_ticker")
+        if ticker is None:
+            return
+        with self._lock:
+            market = self.markets.get(ticker)
+            if market is None:
+                # Not loaded yet; the next load() brings its listing fields
+                return
+            fields = {field: update[field] for field in ("yes_bid", "yes_ask", "open_interest") if field in update}
+            if "price" in update:
+                fields["last_price"] = update["price"]
+            if "volume" in update:
+                traded = update["volume"] - market.get("volume", update["volume"])
+                fields["volume"] = update["volume"]
+                if traded > 0 and "volume_24h" in market:
+                    fields["volume_24h"] = market["volume_24h"] + traded
+            self._set(ticker, fields)
+            self.updates += 1
+
+    def attach(self, ws_client) -> None:
+        """Feeds the screener from a KalshiWebSocketClient's ticker channel (all markets)."""
+        ws_client.subscriptions.want("ticker")
+        ws_client.on("ticker", self.on_ticker, policy=INLINE)
+
+    def remove(self, ticker: str) -> None:
+        with self._lock:
+            self._remove(ticker)
+
+    def _remove(self, ticker: str) -> None:
+        market = self.markets.pop(ticker, None)
+        if market is None:
+            return
+        for field, index in self.indexes.items():
+            if market.get(field) is not None:
+                index.remove(market[field], ticker)
+
+    def query(self, limit: Optional[int] = None, **ranges: Range) -> List[str]:
+        """
+        Tickers of markets whose fields all lie in the given inclusive ranges.
+
+        Example: markets at 90c or more, with over 100 contracts traded in 24h,
+        closing in the next day:
+
+            screener.query(yes_ask=(90, None), volume_24h=(101, None), close_ts=(now, now + 86400))
+
+        The narrowest indexed range is walked and the other predicates are
+        checked on each market in it; results come in that index's order.
+
+        Args:
+            limit (Optional[int]): Stop after this many matches.
+            **ranges: Field name to (low, high) bounds.
+        """
+        with self._lock:
+            indexed = [field for field in ranges if field in self.indexes]
+            if indexed:
+                spans = {field: self.indexes[field].bounds(ranges[field]) for field in indexed}
+                driver = min(indexed, key=lambda field: spans[field][1] - spans[field][0])
+                start, stop = spans[driver]
+                candidates = [ticker for _, ticker in self.indexes[driver].entries[start:stop]]
+            else:
+                driver = None
+                candidates = list(self.markets)
+
+            checks = [(field, bounds) for field, bounds in ranges.items() if field != driver]
+            matches = []
+            for ticker in candidates:
+                market = self.markets[ticker]
+                for field, (lo, hi) in checks:
+                    value = market.get(field)
+                    if value is None or (lo is not None and value < lo) or (hi is not None and value > hi):
+                        break
+                else:
+                    matches.append(ticker)
+                    if limit is not None and len(matches) >= limit:
+                        break
+            return matches
@@ -0,0 +1,168 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Channel -> market tickers; None means every market on the channel
+Subscription = Tuple[str, Optional[Set[str]]]
+
+
+class SubscriptionManager:
+    """Tracks which WebSocket channels and markets we want and keeps the socket in sync.
+
+    The desired state survives disconnects: after a reconnect replay()
+    subscribes to every active channel again. Market tickers can be added to
+    and removed from a channel at runtime; live subscriptions are edited with
+    update_subscription rather than torn down.
+    """
+    def __init__(self, client):
+        """
+        Args:
+            client (KalshiWebSocketClient): Client whose socket the commands are sent on.
+        """
+        self.client = client
+        self.desired: Dict[str, Optional[Set[str]]] = {}
+        self.sids: Dict[int, Subscription] = {}
+        self.pending: Dict[int, Subscription] = {}
+        self.cancelled: Set[int] = set()
+        self.connected = False
+
+    def __len__(self) -> int:
+        return len(self.desired)
+
+    def tickers(self, channel: str) -> Optional[Set[str]]:
+        """Markets wanted on a channel (None means all markets)."""
+        return self.desired.get(channel, set())
+
+    def want(self, channel: str, market_tickers: Optional[Iterable[str]] = None) -> None:
+        """Records a subscription to be made on the next (re)connect, without sending anything."""
+        if market_tickers is None:
+            self.desired[channel] = None
+        elif self.desired.get(channel, set()) is not None:
+            self.desired[channel] = self.desired.get(channel, set()) | set(market_tickers)
+
+    async def add(self, channel: str, market_tickers: Optional[Iterable[str]] = None) -> None:
+        """Subscribes to a channel, for specific markets or (with None) for all markets."""
+        if market_tickers is None:
+            had_all = channel in self.desired and self.desired[channel] is None
+            self.desired[channel] = None
+            if self.connected and not had_all:
+                await self._drop_channel(channel)
+                await self._subscribe(channel, None)
+            return
+
+        wanted = self.desired.get(channel, set())
+        if wanted is None:
+            return  # already receiving every market
+        new = set(market_tickers) - wanted
+        if not new and channel in self.desired:
+            return
+        self.desired[channel] = wanted | new
+        if not self.connected or not new:
+            return
+
+        for sid, (sid_channel, sid_tickers) in self.sids.items():
+            if sid_channel == channel and sid_tickers is not None:
+                await self.client.send_command("update_subscription", {
+                    "sids": [sid],
+                    "market_tickers": sorted(new),
+                    "action": "add_markets",
+                })
+                sid_tickers.update(new)
+                return
+        await self._subscribe(channel, new)
+
+    async def remove(self, channel: str, market_tickers: Optional[Iterable[str]] = None) -> None:
+        """Unsubscribes specific markets from a channel, or the whole channel with None."""
+        if channel not in self.desired:
+            return
+        if market_tickers is None or self.desired[channel] is None:
+            del self.desired[channel]
+            if self.connected:
+                await self._drop_channel(channel)
+            return
+
+        removed = set(market_tickers) & self.desired[channel]
+        self.desired[channel] -= removed
+        if not self.desired[channel]:
+            del self.desired[channel]
+        if not self.connected or not removed:
+            return
+
+        for sid, (sid_channel, sid_tickers) in list(self.sids.items()):
+            if sid_channel != channel or sid_tickers is None:
+                continue
+            overlap = sid_tickers & removed
+            if not overlap:
+                continue
+            if overlap == sid_tickers:
+                await self._unsubscribe([sid])
+            else:
+                await self.client.send_command("update_subscription", {
+                    "sids": [sid],
+                    "market_tickers": sorted(overlap),
+                    "action": "delete_markets",
+                })
+                sid_tickers.difference_update(overlap)
+
+    async def resubscribe(self, sid: int) -> None:
+        """Replaces one live subscription with a fresh one (e.g. after a sequence gap)."""
+        subscription = self.sids.get(sid)
+        if subscription is None:
+            return
+        await self._unsubscribe([sid])
+        channel, market_tickers = subscription
+        if channel in self.desired:
+            await self._subscribe(channel, market_tickers)
+
+    async def replay(self) -> None:
+        """Subscribes to every desired channel on a newly opened socket."""
+        self.reset()
+        self.connected = True
+        for channel, market_tickers in self.desired.items():
+            await self._subscribe(channel, market_tickers)
+
+    def reset(self) -> None:
+        """Forgets live subscriptions after the socket closes. Desired state is kept."""
+        self.connected = False
+        self.sids.clear()
+        self.pending.clear()
+        self.cancelled.clear()
+
+    async def handle_subscribed(self, message: Dict[str, Any]) -> None:
+        """Records the sid the exchange assigned to one of our subscribe commands."""
+        message_id = message.get("id")
+        sid = message["msg"]["sid"]
+        if message_id in self.cancelled:
+            # The channel was removed while this subscribe was in flight
+            self.cancelled.discard(message_id)
+            await self.client.send_command("unsubscribe", {"sids": [sid]})
+            return
+        subscription = self.pending.pop(message_id, None)
+        if subscription is not None:
+            self.sids[sid] = subscription
+
+    def handle_error(self, message: Dict[str, Any]) -> None:
+        """Drops a pending command that the exchange rejected."""
+        self.cancelled.discard(message.get("id"))
+        subscription = self.pending.pop(message.get("id"), None)
+        print(f"Subscription command failed: {message.get('msg')} ({subscription})")
+
+    async def _subscribe(self, channel: str, market_tickers: Optional[Set[str]]) -> None:
+        params: Dict[str, Any] = {"channels": [channel]}
+        if market_tickers is not None:
+            params["market_tickers"] = sorted(market_tickers)
+        message_id = await self.client.send_command("subscribe", params)
+        self.pending[message_id] = (channel, set(market_tickers) if market_tickers is not None else None)
+
+    async def _unsubscribe(self, sids: List[int]) -> None:
+        for sid in sids:
+            self.sids.pop(sid, None)
+        await self.client.send_command("unsubscribe", {"sids": sids})
+
+    async def _drop_channel(self, channel: str) -> None:
+        sids = [sid for sid, (sid_channel, _) in self.sids.items() if sid_channel == channel]
+        # In-flight subscribes for the channel are unsubscribed as soon as their sid arrives
+        for message_id, (pending_channel, _) in list(self.pending.items()):
+            if pending_channel == channel:
+                del self.pending[message_id]
+                self.cancelled.add(message_id)
+        if sids:
+            await self._unsubscribe(sids)
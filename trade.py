@@ -0,0 +1,309 @@
+import time
+import uuid
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from requests.exceptions import HTTPError, RequestException
+
+# Error codes meaning the order no longer rests (filled, cancelled or expired)
+ORDER_GONE_CODES = ("not_found", "order_not_resting")
+
+
+def order_gone(error) -> bool:
+    """
+    Whether a failed order request failed because the order no longer rests.
+
+    Args:
+        error: An exception raised by the client, or the 'error' entry of a batched result.
+    """
+    if isinstance(error, HTTPError):
+        response = error.response
+        if response is None:
+            return False
+        if response.status_code == 404:
+            return True
+        try:
+            error = response.json().get("error")
+        except ValueError:
+            return False
+    return isinstance(error, dict) and error.get("code") in ORDER_GONE_CODES
+
+
+class Quote(NamedTuple):
+    """Target resting buy order for one side of a market. count=0 means no order."""
+    ticker: str
+    side: str      # 'yes' or 'no'
+    price: int     # cents, 1-99
+    count: int = 1
+
+
+class RestingOrder:
+    """Our view of a live order on the exchange."""
+    __slots__ = ("order_id", "client_order_id", "ticker", "side", "price", "count", "expires_at")
+
+    def __init__(self, order_id, client_order_id, ticker, side, price, count, expires_at=None):
+        self.order_id = order_id
+        self.client_order_id = client_order_id
+        self.ticker = ticker
+        self.side = side
+        self.price = price
+        self.count = count
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f"RestingOrder({self.ticker} {self.side} {self.count}@{self.price} id={self.order_id})"
+
+
+class QuoteManager:
+    """Keeps one resting buy order per (ticker, side) in line with target quotes.
+
+    Each call to update() diffs the targets against what is already resting
+    and only sends what changed: nothing if the quote is unchanged, a
+    decrease if only the size shrank, an amend if the price or size moved,
+    and a cancel if the quote was withdrawn. New quotes and cancels go
+    through the batched order endpoints. Order traffic therefore scales with
+    how often quotes change, not with how many markets are quoted.
+
+    Only an answer that the order no longer rests makes the manager stop
+    tracking it. After any other failure (rate limiting, a server error, a
+    timeout) the order may still be live, so it stays tracked and the change
+    is retried on the next update() rather than quoted a second time.
+
+    New quotes are sent one batch chunk at a time. If a chunk's request
+    fails, the exchange may or may not have accepted its orders, so they
+    are held as unconfirmed. The next update() looks them up by
+    client_order_id before quoting those markets again.
+    """
+    def __init__(self, client, ttl: Optional[int] = 60):
+        """
+        Args:
+            client (KalshiHttpClient): Client used to place and manage orders.
+            ttl (Optional[int]): Seconds a newly placed order rests before the exchange
+                expires it, as a safety net if the strategy stops. None rests until cancelled.
+        """
+        self.client = client
+        self.ttl = ttl
+        self.orders: Dict[Tuple[str, str], RestingOrder] = {}
+        # client_order_id -> (quote, expires_at) for creates whose outcome is unknown
+        self.unconfirmed: Dict[str, Tuple[Quote, Optional[int]]] = {}
+        self.counts = {"unchanged": 0, "created": 0, "amended": 0, "decreased": 0, "cancelled": 0, "failed": 0}
+
+    def resting(self, ticker: str, side: str) -> Optional[RestingOrder]:
+        """The live order for (ticker, side), or None. Orders past their expiry are forgotten."""
+        order = self.orders.get((ticker, side))
+        if order is not None and order.expires_at is not None and order.expires_at <= time.time():
+            del self.orders[(ticker, side)]
+            return None
+        return order
+
+    def forget(self, ticker: str, side: str) -> None:
+        """Drops tracking for an order that filled or was cancelled outside the manager."""
+        self.orders.pop((ticker, side), None)
+
+    def on_fill(self, ticker: str, side: str, count: int) -> None:
+        """Reduces the tracked size of our order after a fill."""
+        order = self.orders.get((ticker, side))
+        if order is not None:
+            order.count -= count
+            if order.count <= 0:
+                del self.orders[(ticker, side)]
+
+    def update(self, quotes: Iterable[Quote], cancel_missing: bool = False) -> Dict[str, int]:
+        """
+        Brings resting orders in line with the target quotes.
+
+        Args:
+            quotes (Iterable[Quote]): Target quote per (ticker, side).
+            cancel_missing (bool): Cancel resting orders for (ticker, side) pairs that
+                have no target in `quotes`.
+
+        Returns:
+            Dict[str, int]: Number of quotes left unchanged, created, amended, decreased and
+            cancelled, and of changes that failed and will be retried.
+        """
+        counts = dict.fromkeys(self.counts, 0)
+        to_create: List[Quote] = []
+        to_cancel: List[RestingOrder] = []
+        targeted = set()
+        if self.unconfirmed:
+            self.reconcile_unconfirmed()
+        unconfirmed = {(quote.ticker, quote.side) for quote, _ in self.unconfirmed.values()}
+
+        for quote in quotes:
+            key = (quote.ticker, quote.side)
+            targeted.add(key)
+            if key in unconfirmed:
+                # An order may already rest here; wait until the lookup succeeds
+                counts["failed"] += 1
+                continue
+            order = self.resting(*key)
+            if quote.count <= 0:
+                if order is not None:
+                    to_cancel.append(order)
+                continue
+            if order is None:
+                to_create.append(quote)
+            elif order.price == quote.price and order.count == quote.count:
+                counts["unchanged"] += 1
+            else:
+                if order.price == quote.price and quote.count < order.count:
+                    change, done = "decreased", self._decrease(order, quote.count)
+                else:
+                    change, done = "amended", self._amend(order, quote)
+                if done:
+                    counts[change] += 1
+                elif done is None:
+                    counts["failed"] += 1
+                else:
+                    # The order is gone (filled or expired); quote it fresh
+                    self.orders.pop(key, None)
+                    to_create.append(quote)
+
+        if cancel_missing:
+            for key in list(self.orders):
+                if key not in targeted:
+                    to_cancel.append(self.orders[key])
+
+        if to_cancel:
+            counts["cancelled"] = self._cancel(to_cancel)
+            counts["failed"] += len(to_cancel) - counts["cancelled"]
+
+        if to_create:
+            before = len(self.unconfirmed)
+            counts["created"] = self._create(to_create)
+            counts["failed"] += len(self.unconfirmed) - before
+
+        for name, value in counts.items():
+            self.counts[name] += value
+        return counts
+
+    def cancel_all(self) -> int:
+        """
+        Cancels every order the manager is tracking. Orders whose cancel failed stay tracked.
+
+        Returns:
+            int: Number of orders cancelled (or found already gone).
+        """
+        orders = list(self.orders.values())
+        cancelled = self._cancel(orders) if orders else 0
+        self.counts["cancelled"] += cancelled
+        self.counts["failed"] += len(orders) - cancelled
+        return cancelled
+
+    def _cancel(self, orders: List[RestingOrder]) -> int:
+        """Cancels orders, dropping only those the exchange no longer rests. Returns how many were dropped."""
+        try:
+            results = self.client.batch_cancel_orders([order.order_id for order in orders])
+        except RequestException as e:
+            print(f"Cancel of {len(orders)} orders failed: {e}")
+            return 0
+        dropped = 0
+        for order, result in zip(orders, results):
+            error = result.get("error")
+            if error and not order_gone(error):
+                print(f"Cancel of {order} failed: {error}")
+                continue
+            if self.orders.get((order.ticker, order.side)) is order:
+                del self.orders[(order.ticker, order.side)]
+            dropped += 1
+        return dropped
+
+    def _create(self, quotes: List[Quote]) -> int:
+        expires_at = int(time.time()) + self.ttl if self.ttl is not None else None
+        orders = [
+            dict(
+                ticker=quote.ticker,
+                client_order_id=str(uuid.uuid4()),
+                action="buy",
+                type="limit",
+                side=quote.side,
+                count=quote.count,
+                expiration_ts=expires_at,
+                **{f"{quote.side}_price": quote.price},
+            )
+            for quote in quotes
+        ]
+        created = 0
+        # Chunk here rather than in the client, so one failed request does not lose the others' results
+        chunk_size = getattr(self.client, "MAX_BATCH_SIZE", None) or len(orders)
+        for i in range(0, len(orders), chunk_size):
+            chunk_quotes, chunk_orders = quotes[i:i + chunk_size], orders[i:i + chunk_size]
+            try:
+                results = self.client.batch_create_orders(chunk_orders)
+            except RequestException as e:
+                print(f"Creating {len(chunk_orders)} quotes failed: {e}; looking them up on the next update")
+                for quote, order in zip(chunk_quotes, chunk_orders):
+                    self.unconfirmed[order["client_order_id"]] = (quote, expires_at)
+                continue
+            for quote, order, result in zip(chunk_quotes, chunk_orders, results):
+                if result.get("error") or not result.get("order"):
+                    print(f"Quote on {quote.ticker} {quote.side} rejected: {result.get('error')}")
+                    continue
+                self.orders[(quote.ticker, quote.side)] = RestingOrder(
+                    result["order"]["order_id"], order["client_order_id"],
+                    quote.ticker, quote.side, quote.price, quote.count, expires_at,
+                )
+                created += 1
+        return created
+
+    def reconcile_unconfirmed(self) -> int:
+        """
+        Looks up creates whose request failed by client_order_id, tracking those that rest.
+
+        Markets whose lookup fails stay unconfirmed and are tried again on the next call.
+
+        Returns:
+            int: Number of unconfirmed orders resolved.
+        """
+        resolved = 0
+        for ticker in {quote.ticker for quote, _ in self.unconfirmed.values()}:
+            try:
+                found = {order.get("client_order_id"): order for order in self.client.iter_orders(ticker=ticker)}
+            except RequestException as e:
+                print(f"Order lookup on {ticker} failed: {e}")
+                continue
+            for client_order_id, (quote, expires_at) in list(self.unconfirmed.items()):
+                if quote.ticker != ticker:
+                    continue
+                del self.unconfirmed[client_order_id]
+                resolved += 1
+                order = found.get(client_order_id)
+                # Not found means never created; a filled or cancelled one is reported by the fill feed
+                if order is not None and order.get("status") == "resting" and order.get("remaining_count", 0) > 0:
+                    self.orders[(ticker, quote.side)] = RestingOrder(
+                        order["order_id"], client_order_id, ticker, quote.side,
+                        quote.price, order["remaining_count"], expires_at,
+                    )
+        return resolved
+
+    def _amend(self, order: RestingOrder, quote: Quote) -> Optional[bool]:
+        """True if amended, False if the order is gone, None if it may still rest unchanged."""
+        updated_client_order_id = str(uuid.uuid4())
+        try:
+            response = self.client.amend_order(
+                order.order_id,
+                action="buy",
+                client_order_id=order.client_order_id,
+                updated_client_order_id=updated_client_order_id,
+                count=quote.count,
+                side=quote.side,
+                ticker=quote.ticker,
+                **{f"{quote.side}_price": quote.price},
+            )
+        except RequestException as e:
+            print(f"Amend of {order} failed: {e}")
+            return False if order_gone(e) else None
+        order.order_id = response.get("order", {}).get("order_id", order.order_id)
+        order.client_order_id = updated_client_order_id
+        order.price = quote.price
+        order.count = quote.count
+        return True
+
+    def _decrease(self, order: RestingOrder, count: int) -> Optional[bool]:
+        """True if decreased, False if the order is gone, None if it may still rest unchanged."""
+        try:
+            self.client.decrease_order(order.order_id, reduce_to=count)
+        except RequestException as e:
+            print(f"Decrease of {order} failed: {e}")
+            return False if order_gone(e) else None
+        order.count = count
+        return True
@@ -1,10 +1,19 @@
-import requests
+import time
 
-def get_btc_price() -> float:
-    """Fetch the live BTC price from Binance Options API."""
-    resp = requests.get("https://eapi.binance.com/eapi/v1/index?underlying=BTCUSDT")
-    resp.raise_for_status()
-    return float(resp.json()["indexPrice"])
+from pricefeed import BtcPriceFeed
+
+
+def get_btc_price(feed: BtcPriceFeed) -> float:
+    """Latest BTC options index price from the streaming feed (no request per call)."""
+    price, age = feed.latest()
+    if age > feed.max_age:
+        raise RuntimeError(f"BTC index price is stale ({age:.1f}s old)")
+    return price
 
 # Example usage
-print(get_btc_price())
+feed = BtcPriceFeed(sources=["binance_index"])
+feed.start_background()
+feed.wait_ready(timeout=10)
+for _ in range(5):
+    print(get_btc_price(feed))
+    time.sleep(1)
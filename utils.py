@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+def paginate(
+    fetch_page: Callable[[Optional[str]], Dict[str, Any]],
+    items_key: str,
+    cursor: Optional[str] = None,
+    prefetch: bool = True,
+) -> Iterator[Any]:
+    """
+    Lazily yields every item from a cursor-paginated Kalshi endpoint.
+
+    While the caller works through one page, the next page is already being
+    downloaded on a background thread, so network time overlaps processing
+    and at most two pages are held in memory.
+
+    Args:
+        fetch_page: Called with a cursor (None for the first page); returns the raw
+            response containing `items_key` and the next 'cursor'.
+        items_key (str): Response key holding the page's items (e.g. 'markets').
+        cursor (Optional[str]): Cursor to start from.
+        prefetch (bool): Fetch the next page in the background while yielding the current one.
+
+    Yields:
+        Each item of each page, in order.
+    """
+    if not prefetch:
+        while True:
+            page = fetch_page(cursor)
+            yield from page.get(items_key) or []
+            cursor = page.get("cursor")
+            if not cursor:
+                return
+
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kalshi-prefetch")
+    future = pool.submit(fetch_page, cursor)
+    try:
+        while future is not None:
+            page = future.result()
+            cursor = page.get("cursor")
+            future = pool.submit(fetch_page, cursor) if cursor else None
+            yield from page.get(items_key) or []
+    finally:
+        # Caller stopped early: don't wait on a page nobody will read
+        if future is not None:
+            future.cancel()
+        pool.shutdown(wait=False)